@@ -25,6 +25,10 @@ following commands:
  * ``drop`` - Drop database tables.
  * ``init`` - Initialize database.
  * ``destroy`` - Destroy database.
+ * ``materialize-versions`` - Write queued changes into the version tables.
+ * ``prune-versions`` - Delete versions according to the retention policies.
+ * ``template`` - Build the schema template for cloning test databases.
+ * ``upgrade-plan`` - Show pending migrations with the locks they take.
 
 and ``alembic`` command group for managing upgrade recipes:
 
@@ -35,21 +35,28 @@ def upgrade():
     metadata.bind = ctx.connection.engine
     insp = inspect(ctx.connection.engine)
 
-    for table_name in insp.get_table_names():
-        if table_name not in metadata.tables:
-            continue
+    table_names = [
+        table_name
+        for table_name in insp.get_table_names()
+        if table_name in metadata.tables
+    ]
+    # Reflect all tables at once instead of issuing queries per table.
+    multi_indexes = insp.get_multi_indexes(filter_names=table_names)
+    multi_uniques = insp.get_multi_unique_constraints(filter_names=table_names)
+    multi_fks = insp.get_multi_foreign_keys(filter_names=table_names)
 
+    for table_name in table_names:
         table = metadata.tables[table_name]
 
         ixs = {}
         uqs = {}
         fks = {}
 
-        for ix in insp.get_indexes(table_name):
+        for ix in multi_indexes.get((None, table_name), []):
             ixs[tuple(ix["column_names"])] = ix
-        for uq in insp.get_unique_constraints(table_name):
+        for uq in multi_uniques.get((None, table_name), []):
             uqs[tuple(uq["column_names"])] = uq
-        for fk in insp.get_foreign_keys(table_name):
+        for fk in multi_fks.get((None, table_name), []):
             fks[(tuple(fk["constrained_columns"]), fk["referred_table"])] = fk
 
         with op.batch_alter_table(
@@ -0,0 +1,371 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Second-level cache for reference data.
+
+Models opt in to caching with a ``__cached__`` attribute:
+
+.. code-block:: python
+
+    class Vocabulary(db.Model):
+        __cached__ = True
+
+and are read through the cache of the application:
+
+.. code-block:: python
+
+    cache = current_app.extensions["invenio-db"].query_cache
+    vocabulary = cache.get(db.session, Vocabulary, "licenses")
+    types = cache.all(db.session, sa.select(Vocabulary).where(...))
+
+The cache is enabled with the ``DB_QUERY_CACHE`` setting: ``"memory"`` for
+an in-process :class:`LRUBackend`, a ``redis://`` URL for a
+:class:`RedisBackend` shared between processes, or a backend instance.
+
+**Invalidation**
+
+Every table has a generation token which is part of the cache keys of the
+queries reading it. When a session commits changes to a cached model
+(through the unit of work or directly), detected on flush and on ORM bulk
+``UPDATE``/``DELETE`` statements, the token of its table is replaced so
+that all the entries of the table are missed from then on and expire with
+their TTL. Changes made with Core statements or by other applications are
+not detected; use :meth:`QueryCache.invalidate` for those.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import sqlalchemy as sa
+from sqlalchemy.engine.result import result_tuple
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.util import find_tables
+
+from .proxies import extension_attribute
+from .versioning import dump_snapshot_value, load_snapshot_value
+
+CACHE_TABLES_KEY = "invenio_db_cache_tables"
+"""Key in ``session.info`` of the cached tables changed in the transaction."""
+
+
+class LRUBackend:
+    """In-process cache backend evicting the least recently used entries."""
+
+    def __init__(self, maxsize=1024):
+        """Constructor.
+
+        :param maxsize: the maximum number of entries.
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Return the values of the keys (``None`` if missing)."""
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                expires, value = self._data.get(key, (None, None))
+                if expires is not None and expires <= now:
+                    del self._data[key]
+                    value = None
+                elif key in self._data:
+                    self._data.move_to_end(key)
+                values.append(value)
+        return values
+
+    def set(self, key, value, ttl=None):
+        """Set the value of a key, expiring after ``ttl`` seconds."""
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all the entries."""
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Cache backend storing the values in Redis.
+
+    Any client implementing ``mget()`` and ``set(name, value, ex=None)`` like
+    ``redis.Redis`` can be used.
+    """
+
+    def __init__(self, client, prefix="invenio-db:"):
+        """Constructor.
+
+        :param client: the Redis client.
+        :param prefix: prefix of the keys.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        """Create the backend connected to a Redis URL."""
+        import redis
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get_many(self, keys):
+        """Return the values of the keys (``None`` if missing)."""
+        return self.client.mget([self.prefix + key for key in keys])
+
+    def set(self, key, value, ttl=None):
+        """Set the value of a key, expiring after ``ttl`` seconds."""
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+
+def is_cached(model):
+    """Return if the model is cached."""
+    return bool(getattr(model, "__cached__", False))
+
+
+class QueryCache:
+    """Cache of primary key lookups and queries of cached models.
+
+    The column values of the models are cached, and a hit attaches a new
+    model built from them to the session (unless it already holds the model),
+    without querying the database.
+    """
+
+    def __init__(self, backend, ttl=300):
+        """Constructor.
+
+        :param backend: the cache backend.
+        :param ttl: the lifetime of the entries in seconds (``None`` for no
+            expiry besides the invalidation).
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _generations(self, tables):
+        """Return the generation tokens of the tables, creating missing ones."""
+        keys = [f"generation:{table}" for table in tables]
+        tokens = self.backend.get_many(keys)
+        for i, (key, token) in enumerate(zip(keys, tokens)):
+            if token is None:
+                token = uuid.uuid4().hex.encode()
+                self.backend.set(key, token)
+            tokens[i] = token.decode()
+        return tokens
+
+    def invalidate(self, *tables):
+        """Invalidate the entries reading the tables (names or tables)."""
+        for table in tables:
+            name = getattr(table, "fullname", table)
+            self.backend.set(f"generation:{name}", uuid.uuid4().hex.encode())
+
+    def _cacheable(self, session, tables):
+        """Return if the tables can be read from the cache by the session."""
+        changed = session.info.get(CACHE_TABLES_KEY, ())
+        return not any(table in changed for table in tables)
+
+    def _lookup(self, session, key, tables, load):
+        """Return the cached value of a key, or load and cache it.
+
+        The values are stored as JSON, so that a shared backend never
+        holds data executed on load; ``load`` must return JSON values.
+        """
+        tables = sorted(tables)
+        if not self._cacheable(session, tables):
+            return load()
+        key = ":".join([key, *self._generations(tables)])
+        (value,) = self.backend.get_many([key])
+        if value is not None:
+            self.hits += 1
+            return json.loads(value)
+        self.misses += 1
+        value = load()
+        self.backend.set(key, json.dumps(value).encode(), self.ttl)
+        return value
+
+    def get(self, session, model, pk):
+        """Return a model by primary key, as ``Session.get`` does.
+
+        :returns: the model attached to the session, or ``None``.
+        """
+        if not is_cached(model):
+            raise ValueError(f"{model.__name__} is not a cached model.")
+        mapper = sa.inspect(model)
+        identity = mapper.identity_key_from_primary_key(
+            pk if isinstance(pk, (tuple, list)) else (pk,)
+        )
+        instance = session.identity_map.get(identity)
+        if instance is not None:
+            return instance
+
+        def load():
+            # A list so that a missing row is cached too.
+            return [_dump(session.get(model, pk))]
+
+        tables = {table.fullname for table in mapper.tables}
+        key = f"get:{mapper.class_.__name__}:{identity[1]!r}"
+        (values,) = self._lookup(session, key, tables, load)
+        return _restore(session, mapper, values)
+
+    def all(self, session, query):
+        """Return all the results of a ``select()`` of cached models.
+
+        :returns: a list of models for a query of a single model, of rows
+            otherwise.
+        """
+        cached_tables = set()
+        for description in query.column_descriptions:
+            entity = description["entity"]
+            if entity is not None and is_cached(entity):
+                cached_tables.update(sa.inspect(entity).tables)
+        tables = set(find_tables(query, include_joins=True))
+        if not tables or not tables <= cached_tables:
+            raise ValueError(f"The query {query} reads uncached tables.")
+
+        entity = None
+        if len(query.column_descriptions) == 1:
+            description = query.column_descriptions[0]
+            if description["expr"] is description["entity"]:
+                entity = sa.inspect(description["entity"])
+        compiled = query.compile(dialect=session.get_bind().dialect)
+        digest = hashlib.sha1(
+            repr((str(compiled), sorted(compiled.params.items()))).encode()
+        ).hexdigest()
+
+        def load():
+            result = session.execute(query)
+            if entity is None:
+                return [[dump_snapshot_value(value) for value in row] for row in result]
+            return [_dump(instance) for instance in result.scalars()]
+
+        results = self._lookup(
+            session, f"all:{digest}", {table.fullname for table in tables}, load
+        )
+        if entity is None:
+            columns = query.selected_columns
+            make_row = result_tuple([column.key for column in columns])
+            return [
+                make_row(
+                    [
+                        load_snapshot_value(column.type, value)
+                        for column, value in zip(columns, row)
+                    ]
+                )
+                for row in results
+            ]
+        return [_restore(session, entity, values) for values in results]
+
+
+def _dump(instance):
+    """Return the loaded column values of a model as JSON values."""
+    if instance is None:
+        return None
+    state = sa.inspect(instance)
+    values = {
+        prop.key: dump_snapshot_value(state.dict[prop.key])
+        for prop in state.mapper.column_attrs
+        if prop.key in state.dict
+    }
+    return state.mapper.polymorphic_identity, values
+
+
+def _restore(session, mapper, dump):
+    """Return the model of dumped values, attached to the session."""
+    if dump is None:
+        return None
+    polymorphic_identity, values = dump
+    if polymorphic_identity is not None:
+        mapper = mapper.polymorphic_map.get(polymorphic_identity, mapper)
+    values = {
+        key: load_snapshot_value(mapper.attrs[key].columns[0].type, value)
+        for key, value in values.items()
+    }
+    identity = mapper.identity_key_from_primary_key(
+        [values[mapper.get_property_by_column(c).key] for c in mapper.primary_key]
+    )
+    instance = session.identity_map.get(identity)
+    if instance is not None:
+        return instance
+
+    instance = mapper.class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(instance, key, value)
+    make_transient_to_detached(instance)
+    session.add(instance)
+    return instance
+
+
+def _changed_tables(session, mapper):
+    """Record the tables of a changed mapper to invalidate on commit."""
+    if is_cached(mapper.class_):
+        tables = session.info.setdefault(CACHE_TABLES_KEY, set())
+        tables.update(table.fullname for table in mapper.tables)
+
+
+def _after_flush(session, flush_context):
+    """Collect the cached tables changed by the flush."""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        _changed_tables(session, sa.inspect(instance).mapper)
+
+
+def _do_orm_execute(orm_execute_state):
+    """Collect the cached tables changed by ORM bulk statements."""
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _changed_tables(orm_execute_state.session, mapper)
+
+
+def _after_commit(session):
+    """Invalidate the cached tables changed by the transaction."""
+    tables = session.info.pop(CACHE_TABLES_KEY, None)
+    cache = extension_attribute("query_cache")
+    if tables and cache is not None:
+        cache.invalidate(*tables)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    """Forget the changes of a rolled back transaction."""
+    if previous_transaction.parent is None:
+        session.info.pop(CACHE_TABLES_KEY, None)
+
+
+_LISTENERS = {
+    "after_flush": _after_flush,
+    "do_orm_execute": _do_orm_execute,
+    "after_commit": _after_commit,
+    "after_soft_rollback": _after_soft_rollback,
+}
+
+
+def register_listeners(session):
+    """Register the invalidation listeners on a session (or its factory)."""
+    for name, listener in _LISTENERS.items():
+        if not sa.event.contains(session, name, listener):
+            sa.event.listen(session, name, listener)
+
+
+def remove_listeners(session):
+    """Remove the invalidation listeners from a session (or its factory)."""
+    for name, listener in _LISTENERS.items():
+        if sa.event.contains(session, name, listener):
+            sa.event.remove(session, name, listener)
+
+
+def create_backend(value, maxsize=1024):
+    """Create a cache backend from the ``DB_QUERY_CACHE`` setting."""
+    if value == "memory":
+        return LRUBackend(maxsize=maxsize)
+    if isinstance(value, str) and value.startswith(("redis://", "rediss://")):
+        return RedisBackend.from_url(value)
+    return value
@@ -0,0 +1,321 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Opt-in tracking of the committed changes of models.
+
+Flask-SQLAlchemy's ``SQLALCHEMY_TRACK_MODIFICATIONS`` records every object
+of every flush to send the ``models_committed`` signal, which all writes pay
+for even when nothing listens. Instead, consumers subscribe to the models
+they are interested in and receive the changes of each commit in one call:
+
+.. code-block:: python
+
+    tracker = current_app.extensions["invenio-db"].change_tracker
+
+    @tracker.subscribe(RecordMetadata)
+    def reindex(changes):
+        ids = [change.pk[0] for change in changes if change.operation != "delete"]
+        ...
+
+Only the flushes of a session with subscriptions do any work, and only for
+the subscribed models (and their subclasses). The callbacks run after the
+commit and receive :class:`Change` tuples, not the models, so that they do
+not trigger any load of expired attributes. Changes made in rolled back
+transactions or savepoints are discarded. ORM bulk ``UPDATE``/``DELETE``
+statements and Core statements are not tracked.
+"""
+
+import json
+from collections import namedtuple
+
+import sqlalchemy as sa
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+CHANGES_KEY = "invenio_db_changes"
+"""Key in ``session.info`` of the changes recorded in the transaction."""
+
+Change = namedtuple("Change", ["model", "pk", "operation", "columns"])
+"""A committed change of a model.
+
+``pk`` is the primary key tuple and ``columns`` the names of the column
+attributes set (for inserts) or changed (for updates).
+"""
+
+
+def merge_changes(records):
+    """Merge successive changes of the same models into one change each.
+
+    :param records: changes in the order they were flushed.
+    :returns: a list of changes in the order the models were first changed.
+    """
+    merged = {}
+    for change in records:
+        key = (change.model, change.pk)
+        previous = merged.get(key)
+        if previous is None:
+            merged[key] = change
+        elif change.operation == DELETE:
+            if previous.operation == INSERT:
+                del merged[key]
+            else:
+                merged[key] = change
+        elif previous.operation == DELETE:
+            # Deleted then inserted again in the same transaction.
+            merged[key] = change._replace(operation=UPDATE)
+        else:
+            merged[key] = previous._replace(columns=previous.columns | change.columns)
+    return list(merged.values())
+
+
+def flushed_changes(session, include=None):
+    """Return the changes of the objects being flushed.
+
+    Must be called from an ``after_flush`` listener, while the session still
+    holds the pre-flush state and attribute history.
+
+    :param include: function telling if the changes of a mapper are tracked.
+    """
+    changes = []
+    for instances, operation in (
+        (session.new, INSERT),
+        (session.dirty, UPDATE),
+        (session.deleted, DELETE),
+    ):
+        for instance in instances:
+            state = sa.inspect(instance)
+            mapper = state.mapper
+            if include is not None and not include(mapper):
+                continue
+            if operation == UPDATE:
+                columns = frozenset(
+                    prop.key
+                    for prop in mapper.column_attrs
+                    if state.attrs[prop.key].history.has_changes()
+                )
+                if not columns:
+                    continue
+            elif operation == INSERT:
+                columns = frozenset(
+                    prop.key for prop in mapper.column_attrs if prop.key in state.dict
+                )
+            else:
+                columns = frozenset()
+            pk = tuple(mapper.primary_key_from_instance(instance))
+            changes.append(Change(mapper.class_, pk, operation, columns))
+    return changes
+
+
+class ChangeTracker:
+    """Deliver the committed changes of models to their subscribers."""
+
+    def __init__(self, session):
+        """Constructor.
+
+        :param session: the session (or scoped session/session factory) to
+            track the changes of.
+        """
+        self.session = session
+        self._subscriptions = {}
+        self._tracked = {}
+
+    def subscribe(self, model, callback=None):
+        """Call ``callback(changes)`` after every commit changing the model.
+
+        Can be used as a decorator.
+        """
+        if callback is None:
+            return lambda callback: self.subscribe(model, callback)
+        if not self._subscriptions:
+            self._listen()
+        self._subscriptions.setdefault(model, []).append(callback)
+        self._tracked.clear()
+        return callback
+
+    def unsubscribe(self, model, callback):
+        """Remove a subscription."""
+        callbacks = self._subscriptions.get(model, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._subscriptions.pop(model, None)
+        self._tracked.clear()
+        if not self._subscriptions:
+            self._remove()
+
+    def _callbacks(self, mapper):
+        """Return the callbacks of a mapper and its parent classes."""
+        callbacks = self._tracked.get(mapper)
+        if callbacks is None:
+            callbacks = self._tracked[mapper] = [
+                callback
+                for parent in mapper.iterate_to_root()
+                for callback in self._subscriptions.get(parent.class_, ())
+            ]
+        return callbacks
+
+    def _after_flush(self, session, flush_context):
+        """Record the changes of the subscribed models."""
+        changes = flushed_changes(session, include=self._callbacks)
+        if changes:
+            transaction = session.get_nested_transaction()
+            session.info.setdefault(CHANGES_KEY, []).extend(
+                (transaction, change) for change in changes
+            )
+
+    def _after_soft_rollback(self, session, previous_transaction):
+        """Discard the changes of a rolled back transaction or savepoint."""
+        records = session.info.get(CHANGES_KEY)
+        if not records:
+            return
+        if not previous_transaction.nested:
+            del session.info[CHANGES_KEY]
+            return
+
+        def rolled_back(transaction):
+            while transaction is not None:
+                if transaction is previous_transaction:
+                    return True
+                transaction = transaction.parent
+            return False
+
+        records[:] = [record for record in records if not rolled_back(record[0])]
+
+    def _after_commit(self, session):
+        """Deliver the changes of the transaction to the subscribers."""
+        records = session.info.pop(CHANGES_KEY, None)
+        if not records:
+            return
+        batches = {}
+        for change in merge_changes([change for _, change in records]):
+            for callback in self._callbacks(sa.inspect(change.model)):
+                batches.setdefault(callback, []).append(change)
+        for callback, changes in batches.items():
+            callback(changes)
+
+    def _listeners(self):
+        """Return the session listeners."""
+        return {
+            "after_flush": self._after_flush,
+            "after_soft_rollback": self._after_soft_rollback,
+            "after_commit": self._after_commit,
+        }
+
+    def _listen(self):
+        """Register the session listeners."""
+        for name, listener in self._listeners().items():
+            sa.event.listen(self.session, name, listener)
+
+    def _remove(self):
+        """Remove the session listeners."""
+        for name, listener in self._listeners().items():
+            if sa.event.contains(self.session, name, listener):
+                sa.event.remove(self.session, name, listener)
+
+
+UOW_STACK_KEY = "invenio_db_uow_stack"
+"""Key in ``session.info`` of the units of work collecting changes."""
+
+
+def serialize_changes(changes):
+    """Serialize changes to JSON.
+
+    The models are identified by their table name.
+    """
+    return json.dumps(
+        [
+            {
+                "table": sa.inspect(change.model).local_table.fullname,
+                "pk": list(change.pk),
+                "operation": change.operation,
+                "columns": sorted(change.columns),
+            }
+            for change in changes
+        ],
+        default=str,
+    )
+
+
+class ChangeFeed:
+    """Publish the changes of each unit of work once it is committed.
+
+    The :class:`~invenio_db.uow.UnitOfWork` collects the changes of its
+    flushes (only when the feed has subscribers) and, after the commit,
+    calls every subscriber once with all the changes of the models it
+    subscribed to:
+
+    .. code-block:: python
+
+        feed = current_app.extensions["invenio-db"].change_feed
+
+        @feed.subscribe(models=[RecordMetadata])
+        def bulk_reindex(changes):
+            ...
+
+        # Or serialize the change sets to a local queue.
+        feed.subscribe_queue(queue)
+    """
+
+    def __init__(self):
+        """Constructor."""
+        self._subscribers = []
+
+    @property
+    def active(self):
+        """Return if the feed has subscribers."""
+        return bool(self._subscribers)
+
+    def subscribe(self, callback=None, models=None):
+        """Call ``callback(changes)`` after each unit of work commit.
+
+        Can be used as a decorator.
+
+        :param models: the models (and their subclasses) to receive the
+            changes of (default all).
+        """
+        if callback is None:
+            return lambda callback: self.subscribe(callback, models=models)
+        models = tuple(models) if models is not None else None
+        self._subscribers.append((callback, models))
+        return callback
+
+    def subscribe_queue(self, queue, models=None):
+        """Put the change sets serialized to JSON on a queue.
+
+        :param queue: any object with a ``put()`` method, e.g. a
+            :class:`queue.Queue`.
+        """
+        return self.subscribe(
+            lambda changes: queue.put(serialize_changes(changes)), models=models
+        )
+
+    def unsubscribe(self, callback):
+        """Remove a subscriber."""
+        self._subscribers = [
+            subscriber for subscriber in self._subscribers if subscriber[0] != callback
+        ]
+
+    def publish(self, changes):
+        """Deliver changes to the subscribers, one call each."""
+        for callback, models in self._subscribers:
+            if models is not None:
+                selected = [c for c in changes if issubclass(c.model, models)]
+            else:
+                selected = changes
+            if selected:
+                callback(selected)
+
+
+def _collect_uow_changes(session, flush_context):
+    """Record the changes of a flush in the innermost unit of work."""
+    stack = session.info.get(UOW_STACK_KEY)
+    if stack:
+        stack[-1]._changes.extend(flushed_changes(session))
+
+
+def collect_uow_changes(session):
+    """Register the listener collecting the changes of the units of work."""
+    if not sa.event.contains(session, "after_flush", _collect_uow_changes):
+        sa.event.listen(session, "after_flush", _collect_uow_changes)
@@ -5,12 +5,38 @@
 
 """Click command-line interface for database management."""
 
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import click
+from flask import current_app
 from flask.cli import with_appcontext
-from sqlalchemy_utils.functions import create_database, database_exists, drop_database
+from sqlalchemy import create_mock_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy_utils.functions import (
+    create_database,
+    database_exists,
+    drop_database,
+    get_class_by_table,
+)
 
+from .indexes import advise_indexes, unused_indexes
+from .partitioning import maintain_partitions, partitioned_tables
 from .proxies import current_db
-from .utils import create_alembic_version_table, drop_alembic_version_table
+from .templates import current_template
+from .utils import (
+    create_alembic_version_table,
+    drop_alembic_version_table,
+    get_existing_tables,
+    render_alembic_version_table,
+    table_creation_waves,
+)
+from .versioning import (
+    ensure_version_tables,
+    materialize_versions,
+    prune_orphan_transactions,
+    prune_versions,
+)
 
 
 def abort_if_false(ctx, param, value):
@@ -32,18 +58,104 @@ def db():
     """Database commands."""
 
 
+def _create_tables(bind, tables, bar, verbose, checkfirst=False):
+    """Create tables one after the other on an engine or connection.
+
+    The tables are known to be missing, unless ``checkfirst`` is set.
+    """
+    for table in tables:
+        if verbose:
+            click.echo(" Creating table {0}".format(table))
+        table.create(bind=bind, checkfirst=checkfirst)
+        bar.update(1)
+
+
+def _create_tables_in_waves(engine, tables, workers, bar, verbose):
+    """Create tables in dependency waves, in parallel within a wave."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for wave in table_creation_waves(tables):
+            futures = {
+                executor.submit(table.create, bind=engine, checkfirst=False): table
+                for table in wave
+            }
+            failed = []
+            for future in as_completed(futures):
+                table = futures[future]
+                try:
+                    future.result()
+                except DBAPIError:
+                    # e.g. a deadlock on a shared parent table; retried below.
+                    failed.append(table)
+                    continue
+                if verbose:
+                    click.echo(" Created table {0}".format(table))
+                bar.update(1)
+            failed.sort(key=wave.index)
+            _create_tables(engine, failed, bar, verbose, checkfirst=True)
+
+
+def _echo_ddl(sql, *multiparams, **params):
+    """Echo a DDL statement compiled for the current database."""
+    click.echo(
+        "{0};\n".format(str(sql.compile(dialect=current_db.engine.dialect)).strip())
+    )
+
+
 @db.command()
 @click.option("-v", "--verbose", is_flag=True, default=False)
+@click.option(
+    "--sql",
+    is_flag=True,
+    default=False,
+    help="Print the DDL script instead of executing it.",
+)
+@click.option(
+    "--transactional",
+    is_flag=True,
+    default=False,
+    help="Create all tables in a single transaction (PostgreSQL only).",
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of tables created in parallel (not on SQLite).",
+)
 @with_appcontext
-def create(verbose):
+def create(verbose, sql, transactional, workers):
     """Create tables."""
+    ensure_version_tables()
+    engine = current_db.engine
+    tables = current_db.metadata.sorted_tables
+
+    if sql:
+        mock_engine = create_mock_engine(engine.url, _echo_ddl)
+        current_db.metadata.create_all(mock_engine, checkfirst=False)
+        render_alembic_version_table(engine.dialect.name, sys.stdout)
+        return
+
+    if transactional and engine.dialect.name != "postgresql":
+        raise click.UsageError("--transactional requires PostgreSQL.")
+    if workers > 1 and (transactional or engine.dialect.name == "sqlite"):
+        click.secho("Tables are created sequentially.", fg="yellow")
+        workers = 1
+
     click.secho("Creating all tables!", fg="yellow", bold=True)
-    with click.progressbar(current_db.metadata.sorted_tables) as bar:
-        for table in bar:
-            if verbose:
-                click.echo(" Creating table {0}".format(table))
-            table.create(bind=current_db.engine, checkfirst=True)
-    create_alembic_version_table()
+    existing = get_existing_tables(engine, tables)
+    tables = [table for table in tables if table.key not in existing]
+    with click.progressbar(length=len(tables)) as bar:
+        if transactional:
+            with engine.begin() as connection:
+                _create_tables(connection, tables, bar, verbose)
+                create_alembic_version_table(connection)
+        else:
+            if workers > 1:
+                _create_tables_in_waves(engine, tables, workers, bar, verbose)
+            else:
+                _create_tables(engine, tables, bar, verbose)
+            create_alembic_version_table()
     click.secho("Created all tables!", fg="green")
 
 
@@ -59,9 +171,14 @@ def create(verbose):
 @with_appcontext
 def drop(verbose):
     """Drop tables."""
+    ensure_version_tables()
     click.secho("Dropping all tables!", fg="red", bold=True)
-    with click.progressbar(reversed(current_db.metadata.sorted_tables)) as bar:
+    tables = current_db.metadata.sorted_tables
+    existing = get_existing_tables(current_db.engine, tables)
+    with click.progressbar(reversed(tables)) as bar:
         for table in bar:
+            if table.key not in existing:
+                continue
             if verbose:
                 click.echo(" Dropping table {0}".format(table))
             table.drop(bind=current_db.engine, checkfirst=True)
@@ -102,3 +219,172 @@ def destroy():
     else:
         current_db.engine.dispose()
         drop_database(plain_url)
+
+
+@db.command()
+@with_appcontext
+def template():
+    """Build the schema template used to clone test databases."""
+    name = current_template().ensure()
+    click.secho(f"Schema template: {name}", fg="green")
+
+
+@db.command("prune-versions")
+@click.option(
+    "-t",
+    "--table",
+    "tables",
+    multiple=True,
+    help="Only prune the versions of this table (default: all configured).",
+)
+@click.option("--batch-size", type=click.IntRange(min=1), default=1000)
+@click.option("--sleep", type=float, default=0, help="Pause between batches.")
+@click.option("--orphans/--no-orphans", default=True, help="Prune transactions.")
+@click.option("--dry-run", is_flag=True, default=False)
+@with_appcontext
+def prune_versions_command(tables, batch_size, sleep, orphans, dry_run):
+    """Delete versions according to the retention policies."""
+    if not current_app.config.get("DB_VERSIONING"):
+        raise click.UsageError("Versioning is not enabled.")
+    manager = current_app.extensions["invenio-db"].versioning_manager
+    policies = current_app.config["DB_VERSIONING_RETENTION"]
+    kwargs = dict(batch_size=batch_size, sleep=sleep, dry_run=dry_run)
+    verb = "Would delete" if dry_run else "Deleted"
+
+    for table_name in tables or policies:
+        if table_name not in policies:
+            raise click.BadParameter(f"No retention policy for {table_name}.")
+        model = get_class_by_table(
+            current_db.Model, current_db.metadata.tables[table_name]
+        )
+        count = prune_versions(
+            current_db.session, manager, model, policies[table_name], **kwargs
+        )
+        click.secho(f"{verb} {count} versions of {table_name}.", fg="green")
+
+    if orphans:
+        count = prune_orphan_transactions(current_db.session, manager, **kwargs)
+        click.secho(f"{verb} {count} orphaned transactions.", fg="green")
+
+
+@db.command("materialize-versions")
+@click.option("--batch-size", type=click.IntRange(min=1), default=1000)
+@click.option("--sleep", type=float, default=0, help="Pause between batches.")
+@with_appcontext
+def materialize_versions_command(batch_size, sleep):
+    """Write the queued changes into the version tables."""
+    if not current_app.config.get("DB_VERSIONING_ASYNC"):
+        raise click.UsageError("Asynchronous versioning is not enabled.")
+    manager = current_app.extensions["invenio-db"].versioning_manager
+    count = materialize_versions(
+        current_db.session,
+        manager,
+        batch_size=batch_size,
+        sleep=sleep,
+        skip_locked=True,
+    )
+    click.secho(f"Materialized {count} changes.", fg="green")
+
+
+@db.command("maintain-partitions")
+@click.option(
+    "-t",
+    "--table",
+    "tables",
+    multiple=True,
+    help="Only maintain the partitions of this table (default: all).",
+)
+@click.option(
+    "--detach-only",
+    is_flag=True,
+    default=False,
+    help="Detach the expired partitions without dropping them.",
+)
+@click.option("--dry-run", is_flag=True, default=False)
+@with_appcontext
+def maintain_partitions_command(tables, detach_only, dry_run):
+    """Create the future and drop the expired partitions."""
+    if current_db.engine.dialect.name != "postgresql":
+        raise click.UsageError("Partitioning requires PostgreSQL.")
+    partitioned = {
+        table.name: table for table in partitioned_tables(current_db.metadata)
+    }
+    for table_name in tables:
+        if table_name not in partitioned:
+            raise click.BadParameter(f"{table_name} is not partitioned.")
+    created_verb = "Would create" if dry_run else "Created"
+    removed_verb = "Would remove" if dry_run else "Removed"
+
+    for table_name, table in partitioned.items():
+        if tables and table_name not in tables:
+            continue
+        # One transaction per table: the partition changes lock the parent
+        # table until the commit.
+        with current_db.engine.begin() as connection:
+            created, removed = maintain_partitions(
+                connection, table, detach_only=detach_only, dry_run=dry_run
+            )
+        for partition in created:
+            click.secho(f"{created_verb} partition {partition.name}.", fg="green")
+        for partition in removed:
+            click.secho(f"{removed_verb} partition {partition.name}.", fg="yellow")
+
+
+@db.command("advise-indexes")
+@click.option(
+    "-s",
+    "--sort-column",
+    "sort_columns",
+    multiple=True,
+    default=["updated"],
+    show_default=True,
+    help="Name of the columns used to sort the rows.",
+)
+@click.option(
+    "--usage",
+    is_flag=True,
+    default=False,
+    help="Also report the indexes never scanned (PostgreSQL only).",
+)
+@click.option("--sql", is_flag=True, default=False, help="Print the statements.")
+@with_appcontext
+def advise_indexes_command(sort_columns, usage, sql):
+    """Report the missing and redundant indexes."""
+    if usage and current_db.engine.dialect.name != "postgresql":
+        raise click.UsageError("--usage requires PostgreSQL.")
+    ensure_version_tables()
+    advices = advise_indexes(current_db.metadata, sort_columns=sort_columns)
+    if usage:
+        with current_db.engine.connect() as connection:
+            advices += unused_indexes(connection, current_db.metadata)
+
+    for advice in advices:
+        if sql:
+            click.echo(f"-- {advice.table}: {advice.message}\n{advice.sql};")
+        else:
+            click.secho(f"{advice.table}: {advice.message}", fg="yellow")
+    if not sql:
+        click.secho(f"{len(advices)} index advices.", fg="green")
+
+
+@db.command("upgrade-plan")
+@click.argument("target", default="heads")
+@with_appcontext
+def upgrade_plan(target):
+    """Show the SQL of pending migrations and the locks they take."""
+    lock_timeout = current_app.config.get("DB_MIGRATION_LOCK_TIMEOUT", "1s")
+    click.echo(f"-- lock_timeout: {lock_timeout}")
+    revision = None
+    alembic = current_app.extensions["invenio-db"].alembic
+    for statement in alembic.plan(target):
+        if statement.revision != revision:
+            revision = statement.revision
+            click.secho(f"\n-- Revision {revision}", fg="yellow", bold=True)
+        if statement.lock:
+            annotation = f"-- lock: {statement.lock}"
+            if statement.table:
+                annotation += f" on {statement.table}"
+            if statement.rewrite:
+                annotation += " (rewrites table)"
+            click.secho(annotation, fg="red" if statement.rewrite else "cyan")
+        click.echo(f"{statement.sql};")
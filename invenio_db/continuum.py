@@ -0,0 +1,185 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""SQLAlchemy-Continuum integration.
+
+This module imports SQLAlchemy-Continuum and must only be imported when
+versioning is enabled.
+"""
+
+import threading
+from copy import copy
+
+import sqlalchemy as sa
+from sqlalchemy_continuum.builder import Builder
+from sqlalchemy_continuum.operation import Operations
+from sqlalchemy_continuum.unit_of_work import UnitOfWork
+from sqlalchemy_continuum.utils import version_class, versioned_column_properties
+
+from .proxies import extension_attribute
+from .versioning import (
+    dump_snapshot_value,
+    is_versioning_enabled,
+)
+
+
+class VersioningUnitOfWork(UnitOfWork):
+    """Continuum unit of work honouring the per-session versioning switch."""
+
+    def process_before_flush(self, session):
+        """Skip creating the transaction if versioning is disabled."""
+        if not is_versioning_enabled(session):
+            return
+        if session != self.version_session and self.is_modified(session):
+            ensure_lazy_versioning(self.manager)
+        super().process_before_flush(session)
+
+    def process_after_flush(self, session):
+        """Discard the tracked operations if versioning is disabled."""
+        if not is_versioning_enabled(session):
+            self.operations = Operations()
+            self.pending_statements = []
+            return
+        super().process_after_flush(session)
+
+    def create_version_objects(self, session):
+        """Queue snapshots in the change log instead, if enabled."""
+        change_log = extension_attribute("change_log")
+        if change_log is None:
+            return super().create_version_objects(session)
+        manager = self.manager
+        if not manager.options["versioning"] or manager.options["native_versioning"]:
+            return
+
+        rows = []
+        for _key, operation in copy(self.operations).items():
+            if operation.processed:
+                continue
+            if not self.current_transaction:
+                raise Exception("Current transaction not available.")
+            target = operation.target
+            data = {}
+            for prop in versioned_column_properties(target):
+                try:
+                    value = getattr(target, prop.key)
+                except sa.orm.exc.ObjectDeletedError:
+                    value = None
+                data[prop.key] = dump_snapshot_value(value)
+            tx_id = self.current_transaction.id
+            data[manager.option(target, "transaction_column_name")] = tx_id
+            data[manager.option(target, "operation_type_column_name")] = operation.type
+            rows.append(
+                {
+                    "version_class": version_class(target.__class__).__name__,
+                    "transaction_id": tx_id,
+                    "data": data,
+                }
+            )
+            operation.processed = True
+        if rows:
+            session.connection().execute(change_log.insert(), rows)
+
+
+class _LazyVersions:
+    """Placeholder of the ``versions`` relationship building it on access."""
+
+    def __init__(self, builder):
+        self.builder = builder
+
+    def __get__(self, obj, cls):
+        self.builder.build_versioned_classes()
+        return getattr(cls if obj is None else obj, "versions")
+
+
+class LazyBuilder(Builder):
+    """Continuum builder building the version classes on first use.
+
+    Continuum builds the version tables, classes and mappers of all versioned
+    models when the mappers are configured. Instead, the version tables are
+    built then (or on first use if ``precompute_tables`` is false) and the
+    version classes on the first versioned flush, the first access of
+    ``Model.versions`` or through
+    :func:`~invenio_db.versioning.ensure_versioned_classes`.
+    """
+
+    def __init__(self, precompute_tables=True):
+        """Initialize the builder."""
+        super().__init__()
+        self.precompute_tables = precompute_tables
+        self.tables_built = set()
+        self.placeholders = []
+        self._lock = threading.RLock()
+
+    def install(self, manager):
+        """Replace the builder of ``manager``.
+
+        Must be called before ``make_versioned()``.
+        """
+        self.manager = manager
+        manager.builder = self
+        manager.class_config_listeners = {
+            "instrument_class": self.instrument_versioned_classes,
+            "after_configured": self.configure_versioned_classes,
+        }
+
+    def configure_versioned_classes(self):
+        """Prepare the pending classes for lazy building."""
+        if self.precompute_tables:
+            self.build_version_tables()
+        for cls in self.manager.pending_classes:
+            # Mark the class as versioned so that flushes are detected.
+            type.__setattr__(cls, "__versioning_manager__", self.manager)
+            if not any("versions" in vars(base) for base in cls.__mro__):
+                type.__setattr__(cls, "versions", _LazyVersions(self))
+                self.placeholders.append(cls)
+
+    def build_version_tables(self):
+        """Build the version tables of the pending classes."""
+        manager = self.manager
+        if not manager.options["versioning"]:
+            return
+        with self._lock:
+            pending = [c for c in manager.pending_classes if c not in self.tables_built]
+            if not pending:
+                return
+            classes, manager.pending_classes = manager.pending_classes, pending
+            try:
+                self.build_triggers()
+                self.build_tables()
+                self.build_transaction_class()
+            finally:
+                manager.pending_classes = classes
+            self.tables_built.update(pending)
+
+    def build_versioned_classes(self):
+        """Build the version classes of the pending classes."""
+        manager = self.manager
+        if not manager.options["versioning"]:
+            return
+        with self._lock:
+            if not manager.pending_classes:
+                return
+            self.build_version_tables()
+            for cls in self.placeholders:
+                type.__delattr__(cls, "versions")
+            self.placeholders = []
+            if not manager.options["create_models"]:
+                manager.pending_classes = []
+                return
+            self.build_models()
+            pending = copy(manager.pending_classes)
+            manager.pending_classes = []
+            self.build_relationships(pending)
+            self.enable_active_history(pending)
+            self.create_column_aliases(pending)
+
+
+def ensure_lazy_versioning(manager, tables_only=False):
+    """Build the lazily versioned classes (or only tables) of a manager."""
+    builder = manager.builder
+    if not isinstance(builder, LazyBuilder):
+        return
+    if tables_only:
+        builder.build_version_tables()
+    else:
+        builder.build_versioned_classes()
@@ -16,15 +16,23 @@ from importlib.metadata import version as package_version
 from importlib.resources import files
 
 import sqlalchemy as sa
+from alembic.operations import Operations
+from alembic.runtime.environment import EnvironmentContext
+from alembic.script import ScriptDirectory
 from flask import current_app
 from flask_alembic import Alembic
 from invenio_base.utils import entry_points
 from sqlalchemy.exc import OperationalError
 from sqlalchemy_utils.functions import get_class_by_table
 
+from .cache import QueryCache, create_backend, register_listeners
+from .changes import ChangeFeed, ChangeTracker, collect_uow_changes
 from .cli import db as db_cmd
-from .shared import db
+from .plan import StatementCollector
+from .revisions import enable_revision_cache
+from .shared import db, json_dumps, json_loads
 from .utils import versioning_models_registered
+from .versioning import add_history_indexes, change_log_table, ensure_version_tables
 
 logger = logging.getLogger(__name__)
 
@@ -46,12 +54,27 @@ class InvenioAlembic(Alembic):
       (default ``"1s"``). Set to ``"0"`` to disable.
     - ``DB_MIGRATION_LOCK_TIMEOUT_RETRIES``: number of retries on lock
       timeout (default ``5``).
+    - ``DB_ALEMBIC_REVISION_CACHE``: path of the file caching the parsed
+      revision graph (default ``<instance_path>/alembic-revisions.json``).
+      Set to ``None`` to disable.
     """
 
     def __init__(self, *args, **kwargs):
         """Initialize InvenioAlembic."""
         super().__init__(*args, **kwargs)
 
+    @property
+    def script_directory(self):
+        """Get the Alembic script directory, backed by the revision cache."""
+        cache = self._get_cache()
+        if cache.script is None:
+            script = ScriptDirectory.from_config(self.config)
+            cache_path = current_app.config.get("DB_ALEMBIC_REVISION_CACHE")
+            if cache_path:
+                enable_revision_cache(script, cache_path)
+            cache.script = script
+        return cache.script
+
     def _set_lock_timeout(self):
         """Set lock_timeout on all PostgreSQL migration connections."""
         for ctx in self.migration_contexts.values():
@@ -91,6 +114,52 @@ class InvenioAlembic(Alembic):
                 # Next access to migration_contexts creates fresh connections.
                 self._get_cache().clear()
 
+    def _prepare_targets(self):
+        """Build lazily versioned tables before exposing the metadata."""
+        ensure_version_tables()
+        return super()._prepare_targets()
+
+    def plan(self, target="heads"):
+        """Render the pending upgrade migrations without executing them.
+
+        The current revisions are read from the database, then the migrations
+        up to ``target`` are rendered in offline mode and each statement is
+        annotated with the PostgreSQL lock it takes.
+
+        :param target: Revision to go up to.
+        :returns: List of :class:`~invenio_db.plan.PlannedStatement`.
+        """
+        target_arg = self._simplify_rev(target, handle_int=True)
+        if len(target_arg) == 1:
+            target_arg = target_arg[0]
+
+        current_heads = self.migration_context.get_current_heads()
+        dialect_name = self.migration_context.dialect.name
+        _, metadatas = self._prepare_targets()
+
+        collector = StatementCollector()
+        env = EnvironmentContext(self.config, self.script_directory)
+        env.configure(
+            dialect_name=dialect_name,
+            as_sql=True,
+            literal_binds=True,
+            output_buffer=collector,
+            starting_rev=list(current_heads) or None,
+            target_metadata=metadatas["default"],
+            **current_app.config["ALEMBIC_CONTEXT"],
+        )
+        context = env.get_context()
+
+        def do_upgrade(revision, context):
+            return self.script_directory._upgrade_revs(target_arg, revision)
+
+        context._migrations_fn = do_upgrade
+        with Operations.context(context):
+            with context.begin_transaction():
+                context.run_migrations()
+
+        return collector.statements()
+
 
 class InvenioDB(object):
     """Invenio database extension."""
@@ -98,6 +167,10 @@ class InvenioDB(object):
     def __init__(self, app=None, **kwargs):
         """Extension initialization."""
         self.alembic = InvenioAlembic(run_mkdir=False, command_name="alembic")
+        self.change_log = None
+        self.query_cache = None
+        self.change_tracker = None
+        self.change_feed = None
         if app:
             self.init_app(app, **kwargs)
 
@@ -136,6 +209,11 @@ class InvenioDB(object):
             },
         )
 
+        app.config.setdefault(
+            "DB_ALEMBIC_REVISION_CACHE",
+            os.path.join(app.instance_path, "alembic-revisions.json"),
+        )
+
         self.alembic.init_app(app)
         app.extensions["invenio-db"] = self
         app.cli.add_command(db_cmd)
@@ -148,8 +226,9 @@ class InvenioDB(object):
             "sqlite:///" + os.path.join(app.instance_path, app.name + ".db"),
         )
         app.config.setdefault("SQLALCHEMY_ECHO", False)
-        # Needed for before/after_flush/commit/rollback events
-        app.config.setdefault("SQLALCHEMY_TRACK_MODIFICATIONS", True)
+        # Flask-SQLAlchemy's modification signals record every flushed model;
+        # use the opt-in ``change_tracker`` instead.
+        app.config.setdefault("SQLALCHEMY_TRACK_MODIFICATIONS", False)
 
         # Check if the DB is PostgreSQL. We don't include the `://` since the driver name
         # usually follows the `postgres` (e.g. `postgres+psycopg2`), and we don't know 100%
@@ -181,6 +260,15 @@ class InvenioDB(object):
                         "timezone, please change this before continuing to avoid unexpected behaviour."
                     )
 
+        # Serialize JSON columns with orjson when it is installed.
+        app.config.setdefault("DB_FAST_JSON", True)
+        if app.config["DB_FAST_JSON"]:
+            app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+                "json_serializer": json_dumps,
+                "json_deserializer": json_loads,
+                **(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}),
+            }
+
         # Initialize Flask-SQLAlchemy extension.
         database = kwargs.get("db", db)
         database.init_app(app)
@@ -188,6 +276,13 @@ class InvenioDB(object):
         # Initialize versioning support.
         self.init_versioning(app, database, kwargs.get("versioning_manager"))
 
+        self.change_tracker = ChangeTracker(database.session)
+        self.change_feed = ChangeFeed()
+        collect_uow_changes(database.session)
+
+        # Initialize the second-level cache.
+        self.init_query_cache(app, database)
+
         # Initialize model bases
         if entry_point_group:
             for base_entry in entry_points(group=entry_point_group):
@@ -199,12 +294,32 @@ class InvenioDB(object):
         if app.config["DB_VERSIONING"]:
             manager = self.versioning_manager
             if manager.pending_classes:
-                if not versioning_models_registered(manager, database.Model):
+                if app.config["DB_VERSIONING_LAZY"]:
+                    manager.builder.configure_versioned_classes()
+                elif not versioning_models_registered(manager, database.Model):
                     manager.builder.configure_versioned_classes()
             elif "transaction" not in database.metadata.tables:
                 manager.declarative_base = database.Model
                 manager.create_transaction_model()
                 manager.plugins.after_build_tx_class(manager)
+            if app.config["DB_VERSIONING_HISTORY_INDEXES"]:
+                ensure_version_tables(manager)
+                add_history_indexes(manager)
+
+    def init_query_cache(self, app, database):
+        """Initialize the second-level cache of the cached models."""
+        app.config.setdefault("DB_QUERY_CACHE", None)
+        app.config.setdefault("DB_QUERY_CACHE_TTL", 300)
+        app.config.setdefault("DB_QUERY_CACHE_SIZE", 1024)
+
+        if not app.config["DB_QUERY_CACHE"]:
+            return
+
+        backend = create_backend(
+            app.config["DB_QUERY_CACHE"], maxsize=app.config["DB_QUERY_CACHE_SIZE"]
+        )
+        self.query_cache = QueryCache(backend, ttl=app.config["DB_QUERY_CACHE_TTL"])
+        register_listeners(database.session)
 
     def init_versioning(self, app, database, versioning_manager=None):
         """Initialize the versioning support using SQLAlchemy-Continuum."""
@@ -216,6 +331,11 @@ class InvenioDB(object):
             default_versioning = True
 
         app.config.setdefault("DB_VERSIONING", default_versioning)
+        app.config.setdefault("DB_VERSIONING_RETENTION", {})
+        app.config.setdefault("DB_VERSIONING_HISTORY_INDEXES", False)
+        app.config.setdefault("DB_VERSIONING_LAZY", False)
+        app.config.setdefault("DB_VERSIONING_PRECOMPUTE_TABLES", True)
+        app.config.setdefault("DB_VERSIONING_ASYNC", False)
 
         if not app.config["DB_VERSIONING"]:
             return
@@ -230,6 +350,7 @@ class InvenioDB(object):
         from sqlalchemy_continuum import make_versioned
         from sqlalchemy_continuum import versioning_manager as default_vm
         from sqlalchemy_continuum.plugins import FlaskPlugin
+        from sqlalchemy_continuum.unit_of_work import UnitOfWork
 
         # Try to guess user model class:
         if "DB_VERSIONING_USER_MODEL" not in app.config:  # pragma: no cover
@@ -244,8 +365,22 @@ class InvenioDB(object):
 
         plugins = [FlaskPlugin()] if user_cls else []
 
+        from .continuum import LazyBuilder, VersioningUnitOfWork
+
+        if app.config["DB_VERSIONING_ASYNC"]:
+            self.change_log = change_log_table(database.metadata)
+
         # Call make_versioned() before your models are defined.
         self.versioning_manager = versioning_manager or default_vm
+        if self.versioning_manager.uow_class is UnitOfWork:
+            # Support disabling versioning per session.
+            self.versioning_manager.uow_class = VersioningUnitOfWork
+        if app.config["DB_VERSIONING_LAZY"] and not isinstance(
+            self.versioning_manager.builder, LazyBuilder
+        ):
+            LazyBuilder(
+                precompute_tables=app.config["DB_VERSIONING_PRECOMPUTE_TABLES"]
+            ).install(self.versioning_manager)
         make_versioned(
             user_cls=user_cls,
             manager=self.versioning_manager,
@@ -0,0 +1,213 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Static analysis of the indexes declared in the metadata.
+
+:func:`advise_indexes` reports:
+
+* the foreign keys without an index starting with their columns, which make
+  every delete of a referenced row (and its cascades) scan the referencing
+  table while holding its locks;
+* the indexes whose columns are a prefix of another index, primary key or
+  unique constraint of the table, which only slow down the writes;
+* the sort columns (``updated`` by default, as added by
+  :class:`~invenio_db.shared.Timestamp`) without an index starting with them.
+
+On PostgreSQL, :func:`unused_indexes` reports the indexes never scanned
+since the statistics were last reset. Both are shown by
+``invenio db advise-indexes``.
+
+Expression and partial indexes are ignored.
+"""
+
+import hashlib
+from collections import namedtuple
+
+import sqlalchemy as sa
+
+UNINDEXED_FOREIGN_KEY = "unindexed-foreign-key"
+REDUNDANT_INDEX = "redundant-index"
+UNINDEXED_SORT_COLUMN = "unindexed-sort-column"
+UNUSED_INDEX = "unused-index"
+
+Advice = namedtuple("Advice", ["kind", "table", "columns", "message", "sql"])
+"""An index advice on a table, with the statement applying it."""
+
+
+def _column_names(index):
+    """Return the column names of a plain index, or ``None``."""
+    if any(
+        key.endswith("_where") and value is not None
+        for key, value in index.dialect_kwargs.items()
+    ):
+        return None
+    names = []
+    for expression in index.expressions:
+        if not isinstance(expression, sa.Column):
+            return None
+        names.append(expression.name)
+    return tuple(names)
+
+
+def _indexes(table):
+    """Return the column names of the indexes of a table by name.
+
+    The primary key and the unique constraints, which are backed by an
+    index, are included.
+    """
+    indexes = {}
+    for index in table.indexes:
+        columns = _column_names(index)
+        if columns:
+            indexes[index.name] = (columns, index)
+    for constraint in table.constraints:
+        if isinstance(constraint, (sa.PrimaryKeyConstraint, sa.UniqueConstraint)):
+            columns = tuple(column.name for column in constraint.columns)
+            if columns:
+                indexes[constraint.name or f"{table.name} key"] = (columns, None)
+    return indexes
+
+
+def _starts_with(columns, leading):
+    """Return if an index on columns can look up the leading columns."""
+    return set(columns[: len(leading)]) == set(leading)
+
+
+def _index_name(table, columns):
+    """Return the name of a new index on columns.
+
+    All the columns are part of the name, so that it does not collide with
+    an index on a prefix of them. Long names are truncated to PostgreSQL's
+    63 characters with a hash of the full name, like the naming convention.
+    """
+    name = "_".join(["ix", table.name, *columns])
+    if len(name) > 63:
+        digest = hashlib.md5(name.encode()).hexdigest()[:4]
+        name = f"{name[:58]}_{digest}"
+    return name
+
+
+def _create_index_sql(table, columns):
+    """Return the statement creating an index on columns."""
+    name = _index_name(table, columns)
+    return f"CREATE INDEX {name} ON {table.fullname} ({', '.join(columns)})"
+
+
+def unindexed_foreign_keys(metadata):
+    """Return the advices on the foreign keys without an index."""
+    advices = []
+    for table in metadata.sorted_tables:
+        indexes = [columns for columns, _ in _indexes(table).values()]
+        for constraint in table.foreign_key_constraints:
+            columns = tuple(column.name for column in constraint.columns)
+            if any(_starts_with(index, columns) for index in indexes):
+                continue
+            advices.append(
+                Advice(
+                    UNINDEXED_FOREIGN_KEY,
+                    table.fullname,
+                    columns,
+                    f"Foreign key ({', '.join(columns)}) to "
+                    f"{constraint.referred_table.fullname} has no index.",
+                    _create_index_sql(table, columns),
+                )
+            )
+    return advices
+
+
+def redundant_indexes(metadata):
+    """Return the advices on the indexes covered by another index."""
+    advices = []
+    for table in metadata.sorted_tables:
+        indexes = _indexes(table)
+        for name, (columns, index) in indexes.items():
+            if index is None:
+                continue
+            for other_name, (other_columns, other_index) in indexes.items():
+                if other_name == name or other_columns[: len(columns)] != columns:
+                    continue
+                if index.unique and other_columns != columns:
+                    # A unique index is not redundant with a wider index.
+                    continue
+                if other_columns == columns and other_index is not None:
+                    # Report only one of two identical indexes.
+                    if index.unique > other_index.unique or (
+                        index.unique == other_index.unique and name < other_name
+                    ):
+                        continue
+                advices.append(
+                    Advice(
+                        REDUNDANT_INDEX,
+                        table.fullname,
+                        columns,
+                        f"Index {name} is covered by {other_name}.",
+                        f"DROP INDEX {name}",
+                    )
+                )
+                break
+    return advices
+
+
+def unindexed_sort_columns(metadata, names=("updated",)):
+    """Return the advices on the sort columns without an index.
+
+    :param names: the names of the columns used to sort the rows.
+    """
+    advices = []
+    for table in metadata.sorted_tables:
+        indexes = [columns for columns, _ in _indexes(table).values()]
+        for name in names:
+            if name not in table.columns:
+                continue
+            if any(index[0] == name for index in indexes):
+                continue
+            advices.append(
+                Advice(
+                    UNINDEXED_SORT_COLUMN,
+                    table.fullname,
+                    (name,),
+                    f"Sort column {name} has no index.",
+                    _create_index_sql(table, (name,)),
+                )
+            )
+    return advices
+
+
+def advise_indexes(metadata, sort_columns=("updated",)):
+    """Return all the advices on the indexes of a metadata."""
+    return [
+        *unindexed_foreign_keys(metadata),
+        *redundant_indexes(metadata),
+        *unindexed_sort_columns(metadata, sort_columns),
+    ]
+
+
+def unused_indexes(connection, metadata=None):
+    """Return the advices on the indexes never scanned (PostgreSQL only).
+
+    The unique and primary key indexes, which enforce constraints, are
+    excluded.
+
+    :param metadata: only report the indexes of its tables.
+    """
+    rows = connection.execute(
+        sa.text(
+            "SELECT s.relname, s.indexrelname "
+            "FROM pg_stat_user_indexes s "
+            "JOIN pg_index i ON i.indexrelid = s.indexrelid "
+            "WHERE s.idx_scan = 0 AND NOT i.indisunique "
+            "ORDER BY s.relname, s.indexrelname"
+        )
+    )
+    tables = set(metadata.tables) if metadata is not None else None
+    return [
+        Advice(
+            UNUSED_INDEX,
+            table_name,
+            (),
+            f"Index {index_name} has never been scanned.",
+            f"DROP INDEX {index_name}",
+        )
+        for table_name, index_name in rows
+        if tables is None or table_name in tables
+    ]
@@ -0,0 +1,168 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Request-scoped memoization of primary key lookups.
+
+``Session.get`` only avoids a query while the model is in the identity map,
+which holds its models weakly and is emptied by ``expunge_all()``. The
+:class:`LookupMemo` keeps the models it loaded for the lifetime of a request
+and loads the lookups of the same model together with a single ``IN``
+query:
+
+.. code-block:: python
+
+    from invenio_db.proxies import current_lookups
+
+    # Dataloader style: declare the lookups, then resolve them.
+    owners = [current_lookups.defer(User, record.owner_id) for record in records]
+    for record, owner in zip(records, owners):
+        serialize(record, owner.get())  # a single query for all the owners
+
+    # Or load many models at once.
+    users = current_lookups.get_many(User, user_ids)
+
+Deferred lookups are resolved on first access; :meth:`LookupMemo.dispatch`
+resolves all of them at once. Missing rows are not memoized.
+"""
+
+from collections import defaultdict
+
+import sqlalchemy as sa
+from flask import current_app, g
+
+MEMO_KEY = "invenio_db_lookup_memo"
+"""Attribute of ``flask.g`` holding the memo of the current request."""
+
+
+class Deferred:
+    """A pending primary key lookup."""
+
+    def __init__(self, memo, mapper, identity):
+        """Constructor."""
+        self._memo = memo
+        self._mapper = mapper
+        self._identity = identity
+
+    def get(self):
+        """Return the model, loading the pending lookups of its class."""
+        self._memo._load(self._mapper)
+        return self._memo._cached(self._identity)
+
+
+class LookupMemo:
+    """Memo of the models looked up by primary key."""
+
+    def __init__(self, session, chunk_size=500):
+        """Constructor.
+
+        :param session: the database session.
+        :param chunk_size: the maximum number of keys per ``IN`` query.
+        """
+        self.session = session
+        self.chunk_size = chunk_size
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+        self._instances = {}
+        self._pending = defaultdict(set)
+
+    def _identity(self, mapper, pk):
+        """Return the identity key of a primary key."""
+        return mapper.identity_key_from_primary_key(
+            pk if isinstance(pk, (tuple, list)) else (pk,)
+        )
+
+    def _cached(self, identity):
+        """Return the memoized model of an identity, attached to the session.
+
+        Expired models (e.g. by a commit) are not returned, so that they are
+        reloaded with the other pending lookups instead of one at a time on
+        attribute access, and a deleted row is not returned either.
+        """
+        instance = self.session.identity_map.get(identity)
+        if instance is not None:
+            if sa.inspect(instance).expired_attributes:
+                self._instances.pop(identity, None)
+                return None
+            self._instances[identity] = instance
+            return instance
+
+        instance = self._instances.get(identity)
+        if instance is None:
+            return None
+        state = sa.inspect(instance)
+        if state.detached and not state.was_deleted and not state.expired_attributes:
+            # Expunged or from a previous session: attach it again.
+            self.session.add(instance)
+            return instance
+        del self._instances[identity]
+        return None
+
+    def _load(self, mapper):
+        """Load the pending lookups of a class in ``IN`` queries."""
+        identities = [
+            identity
+            for identity in self._pending.pop(mapper, ())
+            if self._cached(identity) is None
+        ]
+        pk_columns = list(mapper.primary_key)
+        for i in range(0, len(identities), self.chunk_size):
+            keys = [identity[1] for identity in identities[i : i + self.chunk_size]]
+            if len(pk_columns) == 1:
+                criteria = pk_columns[0].in_([key[0] for key in keys])
+            else:
+                criteria = sa.tuple_(*pk_columns).in_(keys)
+            self.queries += 1
+            for instance in self.session.scalars(sa.select(mapper).where(criteria)):
+                self._instances[sa.inspect(instance).identity_key] = instance
+
+    def defer(self, model, pk):
+        """Declare the lookup of a model, loaded with the other pending ones.
+
+        :returns: a :class:`Deferred` lookup.
+        """
+        mapper = sa.inspect(model)
+        identity = self._identity(mapper, pk)
+        if identity in self._pending[mapper] or self._cached(identity) is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._pending[mapper].add(identity)
+        return Deferred(self, mapper, identity)
+
+    def dispatch(self):
+        """Load all the pending lookups."""
+        for mapper in list(self._pending):
+            self._load(mapper)
+
+    def get(self, model, pk):
+        """Return a model by primary key, or ``None`` if it does not exist."""
+        return self.defer(model, pk).get()
+
+    def get_many(self, model, pks):
+        """Return the models of the primary keys, loading the missing ones at once.
+
+        :returns: a list in the order of the keys, with ``None`` for the
+            missing rows.
+        """
+        deferred = [self.defer(model, pk) for pk in pks]
+        return [lookup.get() for lookup in deferred]
+
+    def clear(self):
+        """Forget the memoized models."""
+        self._instances.clear()
+        self._pending.clear()
+
+    @property
+    def stats(self):
+        """Return the hit, miss and query counters."""
+        return {"hits": self.hits, "misses": self.misses, "queries": self.queries}
+
+
+def lookup_memo(session=None):
+    """Return the lookup memo of the current request (or app context)."""
+    memo = g.get(MEMO_KEY)
+    if memo is None:
+        memo = LookupMemo(session or current_app.extensions["sqlalchemy"].session)
+        setattr(g, MEMO_KEY, memo)
+    return memo
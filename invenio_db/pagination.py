@@ -0,0 +1,214 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Iteration over large tables.
+
+``OFFSET`` pagination gets slower with every page since the database has to
+skip all the preceding rows, and ``.all()`` loads the whole result in memory.
+This module provides the alternatives to use in batch jobs:
+
+- :func:`keyset_pages` and :func:`keyset_iter` paginate on the ordering keys
+  (seek method): every page continues after the last row of the previous
+  one, which is an index range scan whatever the position in the table.
+- :func:`stream` iterates over a single query with a server-side cursor.
+  The transaction stays open during the whole iteration.
+- :func:`split_range` and :func:`parallel_ranges` divide a numeric primary
+  key range across workers, each with its own session.
+
+.. code-block:: python
+
+    from invenio_db.pagination import keyset_iter
+
+    query = sa.select(RecordMetadata).where(RecordMetadata.is_deleted.is_(False))
+    for record in keyset_iter(db.session, query, [RecordMetadata.id]):
+        ...
+
+The ordering keys must identify the rows uniquely (add the primary key as
+the last key otherwise), or rows with the same key values on a page
+boundary are skipped.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy.sql import operators
+
+
+def _order_key(key):
+    """Return the expression of an ordering key and if it is descending."""
+    if isinstance(key, sa.UnaryExpression):
+        if key.modifier is operators.desc_op:
+            return key.element, True
+        if key.modifier is operators.asc_op:
+            return key.element, False
+    return key, False
+
+
+def _is_entity_query(query):
+    """Return if the query selects a single model."""
+    descriptions = query.column_descriptions
+    if len(descriptions) != 1:
+        return False
+    # Columns of plain tables have no entity.
+    entity = descriptions[0].get("entity")
+    return entity is not None and descriptions[0]["expr"] is entity
+
+
+def _key_getter(query, expression):
+    """Return a function reading the value of a key from a result row."""
+    if hasattr(expression, "__clause_element__"):
+        expression = expression.__clause_element__()
+
+    if _is_entity_query(query):
+        mapper = sa.inspect(query.column_descriptions[0]["entity"])
+        key = mapper.get_property_by_column(expression).key
+        return lambda row: getattr(row, key)
+
+    for column in query.selected_columns:
+        if column.compare(expression):
+            return lambda row: row._mapping[column]
+    raise ValueError(f"The ordering key {expression} is not selected by the query.")
+
+
+def _seek(keys, values):
+    """Return the criteria selecting the rows after the given key values."""
+    if len({descending for _, descending in keys}) == 1:
+        expressions = [expression for expression, _ in keys]
+        if len(expressions) == 1:
+            left, right = expressions[0], values[0]
+        else:
+            left, right = sa.tuple_(*expressions), sa.tuple_(*values)
+        return left < right if keys[0][1] else left > right
+
+    # Mixed directions cannot be compared as a row value.
+    criteria = []
+    for i, ((expression, descending), value) in enumerate(zip(keys, values)):
+        equal = [keys[j][0] == values[j] for j in range(i)]
+        after = expression < value if descending else expression > value
+        criteria.append(sa.and_(*equal, after))
+    return sa.or_(*criteria)
+
+
+def keyset_pages(session, query, keys, size=1000, after=None):
+    """Yield the pages of a query using keyset pagination.
+
+    :param session: the database session.
+    :param query: a ``select()`` of a single model or of columns; its
+        ordering is replaced by the keys.
+    :param keys: the ordering keys, e.g. ``[Model.created, Model.id.desc()]``.
+        They must be selected by the query.
+    :param size: the number of rows per page.
+    :param after: the key values to start after (e.g. from a previous run).
+    :returns: lists of models (or of rows for column queries).
+    """
+    keys = [_order_key(key) for key in keys]
+    getters = [_key_getter(query, expression) for expression, _ in keys]
+    entities = _is_entity_query(query)
+    query = query.order_by(None).order_by(
+        *[expression.desc() if desc else expression.asc() for expression, desc in keys]
+    )
+    query = query.limit(size)
+
+    while True:
+        page_query = query if after is None else query.where(_seek(keys, after))
+        result = session.execute(page_query)
+        page = (result.scalars() if entities else result).all()
+        if not page:
+            return
+        # Read the keys before the caller commits or expunges the models.
+        after = [getter(page[-1]) for getter in getters]
+        yield page
+        if len(page) < size:
+            return
+
+
+def keyset_iter(session, query, keys, size=1000, after=None):
+    """Iterate over the rows of a query using keyset pagination.
+
+    See :func:`keyset_pages`.
+    """
+    for page in keyset_pages(session, query, keys, size=size, after=after):
+        yield from page
+
+
+def stream(session, query, yield_per=1000):
+    """Iterate over the rows of a query with a server-side cursor.
+
+    The rows are fetched ``yield_per`` at a time and ORM objects are built
+    in batches of the same size. The query runs in a single transaction, so
+    prefer :func:`keyset_iter` for very long iterations.
+
+    :returns: models for a query of a single model, rows otherwise.
+    """
+    result = session.execute(
+        query.execution_options(yield_per=yield_per, stream_results=True)
+    )
+    try:
+        yield from result.scalars() if _is_entity_query(query) else result
+    finally:
+        result.close()
+
+
+def split_range(session, column, parts, *where):
+    """Divide the range of values of a numeric column in equal ranges.
+
+    :param column: the column (usually an integer primary key).
+    :param parts: the number of ranges.
+    :param where: criteria restricting the rows considered.
+    :returns: a list of ``(low, high)`` tuples, to be used as
+        ``column >= low`` and ``column < high``.
+    """
+    low, high = session.execute(
+        sa.select(sa.func.min(column), sa.func.max(column)).where(*where)
+    ).one()
+    if low is None:
+        return []
+    high += 1
+    step = -(-(high - low) // parts)
+    return [(start, min(start + step, high)) for start in range(low, high, step)]
+
+
+def parallel_ranges(column, worker, *where, parts=4, session=None, executor=None):
+    """Run a worker over each range of a numeric column in parallel.
+
+    By default every range is processed in a thread with its own application
+    context, and thus its own ``db.session`` (removed once the worker is
+    done). With another executor, e.g. a ``ProcessPoolExecutor``, the worker
+    must be picklable and set up its application and session itself.
+
+    .. code-block:: python
+
+        def reindex(low, high):
+            query = sa.select(RecordMetadata).where(
+                RecordMetadata.id >= low, RecordMetadata.id < high
+            )
+            for record in keyset_iter(db.session, query, [RecordMetadata.id]):
+                ...
+
+        parallel_ranges(RecordMetadata.id, reindex, parts=8)
+
+    :param worker: called with the ``low`` and ``high`` bounds of a range.
+    :param where: criteria restricting the rows considered.
+    :param parts: the number of ranges.
+    :param session: the session used to compute the ranges.
+    :param executor: the executor running the workers (default threads).
+    :returns: the results of the workers in range order.
+    """
+    db = current_app.extensions["sqlalchemy"]
+    ranges = split_range(session or db.session, column, parts, *where)
+    if executor is not None:
+        futures = [executor.submit(worker, low, high) for low, high in ranges]
+        return [future.result() for future in futures]
+
+    app = current_app._get_current_object()
+
+    def run(bounds):
+        with app.app_context():
+            try:
+                return worker(*bounds)
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(max_workers=max(len(ranges), 1)) as pool:
+        return list(pool.map(run, ranges))
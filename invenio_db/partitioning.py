@@ -0,0 +1,302 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""PostgreSQL declarative partitioning of append-heavy tables.
+
+Tables are declared partitioned in their model with :func:`partition_by`:
+
+.. code-block:: python
+
+    class StatsEvent(db.Model):
+        __tablename__ = "stats_event"
+        __table_args__ = partition_by(
+            "range", "created", interval="month", ahead=3, retention=12
+        )
+        id = db.Column(db.Integer, primary_key=True)
+        created = db.Column(db.UTCDateTime, primary_key=True)
+
+PostgreSQL requires the partition key to be part of the primary key and of
+the unique constraints. When the table is created, its partitions are
+created too: the hash partitions, the range partitions of the current
+period and of the ``ahead`` following ones, or the ``DEFAULT`` partition
+of a list partitioned table (e.g. ``stats_event_default``), to which the
+list partitions created afterwards take over their values. Range
+partitions are named after the start of their period (e.g.
+``stats_event_p202601``).
+
+``invenio db maintain-partitions`` then periodically creates the future
+partitions and, for tables with a ``retention`` (number of past periods to
+keep), detaches and drops the older partitions, which is instant compared
+to deleting the rows. Every table is maintained in its own transaction, so
+its locks are released before the next table; ``--table`` restricts the
+run to some tables. Tables created by Alembic revisions can use the same
+functions with ``op.get_bind()`` and
+:func:`alembic.op.create_table` with the ``postgresql_partition_by``
+argument returned by :func:`partition_by`.
+
+On other databases, the tables are created unpartitioned and the
+maintenance does nothing.
+"""
+
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+import sqlalchemy as sa
+
+PARTITIONING_KEY = "invenio_db_partitioning"
+"""Key in ``Table.info`` of the partitioning settings."""
+
+INTERVALS = {"day": "%Y%m%d", "month": "%Y%m", "year": "%Y"}
+"""Name suffix formats of the range partitions by interval."""
+
+Partition = namedtuple("Partition", ["name", "start", "end"])
+"""A range partition covering ``[start, end)``."""
+
+
+def partition_by(
+    strategy,
+    *columns,
+    interval="month",
+    ahead=3,
+    retention=None,
+    modulus=8,
+    **table_kwargs,
+):
+    """Return the table arguments of a partitioned table.
+
+    :param strategy: ``"range"``, ``"list"`` or ``"hash"``.
+    :param columns: the partition key columns.
+    :param interval: the period of the range partitions (``"day"``,
+        ``"month"`` or ``"year"``).
+    :param ahead: the number of future range partitions to keep created.
+    :param retention: the number of past range partitions to keep (default
+        all).
+    :param modulus: the number of hash partitions.
+    :param table_kwargs: other table arguments.
+    :returns: the table arguments, including the listener creating the
+        partitions along with the table.
+    """
+    strategy = strategy.lower()
+    if strategy not in ("range", "list", "hash"):
+        raise ValueError(f"Unknown partitioning strategy: {strategy}")
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown partition interval: {interval}")
+    info = dict(table_kwargs.pop("info", {}))
+    info[PARTITIONING_KEY] = {
+        "strategy": strategy,
+        "columns": columns,
+        "interval": interval,
+        "ahead": ahead,
+        "retention": retention,
+        "modulus": modulus,
+    }
+    listeners = [
+        *table_kwargs.pop("listeners", ()),
+        ("after_create", _create_initial_partitions),
+    ]
+    return {
+        "postgresql_partition_by": f"{strategy.upper()} ({', '.join(columns)})",
+        "info": info,
+        "listeners": listeners,
+        **table_kwargs,
+    }
+
+
+def period_start(value, interval):
+    """Return the start of the period containing a date."""
+    value = date(value.year, value.month, value.day)
+    if interval == "month":
+        return value.replace(day=1)
+    if interval == "year":
+        return value.replace(month=1, day=1)
+    return value
+
+
+def add_periods(start, interval, count):
+    """Return the start of the period ``count`` periods after ``start``."""
+    if interval == "day":
+        return start + timedelta(days=count)
+    if interval == "year":
+        return start.replace(year=start.year + count)
+    month = start.month - 1 + count
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+
+def partition_name(table_name, start, interval):
+    """Return the name of the range partition starting at a date."""
+    return f"{table_name}_p{start.strftime(INTERVALS[interval])}"[:63]
+
+
+def range_partition(table_name, start, interval):
+    """Return the range partition of the period starting at a date."""
+    return Partition(
+        partition_name(table_name, start, interval),
+        start,
+        add_periods(start, interval, 1),
+    )
+
+
+def parse_partition_name(table_name, name, interval):
+    """Return the range partition of a partition name, or ``None``."""
+    prefix = f"{table_name}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        start = datetime.strptime(name[len(prefix) :], INTERVALS[interval]).date()
+    except ValueError:
+        return None
+    return range_partition(table_name, start, interval)
+
+
+def create_range_partition_ddl(table_name, partition):
+    """Return the statement creating a range partition."""
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition.name}" PARTITION OF '
+        f"\"{table_name}\" FOR VALUES FROM ('{partition.start.isoformat()}') "
+        f"TO ('{partition.end.isoformat()}')"
+    )
+
+
+def create_hash_partitions_ddl(table_name, modulus):
+    """Return the statements creating the hash partitions of a table."""
+    return [
+        f'CREATE TABLE IF NOT EXISTS "{table_name}_h{remainder}" PARTITION OF '
+        f'"{table_name}" FOR VALUES WITH (MODULUS {modulus}, '
+        f"REMAINDER {remainder})"
+        for remainder in range(modulus)
+    ]
+
+
+def create_default_partition_ddl(table_name):
+    """Return the statement creating the default partition of a table."""
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{table_name}_default" PARTITION OF '
+        f'"{table_name}" DEFAULT'
+    )
+
+
+def detach_partition_ddl(table_name, name, concurrently=False):
+    """Return the statement detaching a partition.
+
+    ``CONCURRENTLY`` cannot run in a transaction block.
+    """
+    suffix = " CONCURRENTLY" if concurrently else ""
+    return f'ALTER TABLE "{table_name}" DETACH PARTITION "{name}"{suffix}'
+
+
+def list_partitions(connection, table_name):
+    """Return the names of the partitions of a table."""
+    return (
+        connection.execute(
+            sa.text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+                "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+                "WHERE parent.relname = :table ORDER BY child.relname"
+            ),
+            {"table": table_name},
+        )
+        .scalars()
+        .all()
+    )
+
+
+def create_range_partitions(
+    connection, table_name, start, end, interval="month", dry_run=False
+):
+    """Create the missing range partitions of the periods from start to end.
+
+    :returns: the created partitions.
+    """
+    existing = set(list_partitions(connection, table_name))
+    created = []
+    period = period_start(start, interval)
+    while period < end:
+        partition = range_partition(table_name, period, interval)
+        if partition.name not in existing:
+            if not dry_run:
+                connection.execute(
+                    sa.text(create_range_partition_ddl(table_name, partition))
+                )
+            created.append(partition)
+        period = partition.end
+    return created
+
+
+def drop_range_partitions(
+    connection, table_name, before, interval="month", detach_only=False, dry_run=False
+):
+    """Detach and drop the range partitions ending before a date.
+
+    Only the partitions named by :func:`partition_name` are considered.
+
+    :param detach_only: keep the detached tables (e.g. to archive them).
+    :returns: the removed partitions.
+    """
+    removed = []
+    for name in list_partitions(connection, table_name):
+        partition = parse_partition_name(table_name, name, interval)
+        if partition is None or partition.end > before:
+            continue
+        if not dry_run:
+            connection.execute(sa.text(detach_partition_ddl(table_name, name)))
+            if not detach_only:
+                connection.execute(sa.text(f'DROP TABLE "{name}"'))
+        removed.append(partition)
+    return removed
+
+
+def maintain_partitions(connection, table, now=None, detach_only=False, dry_run=False):
+    """Create the future and remove the expired range partitions of a table.
+
+    Creating, detaching and dropping partitions lock the whole table (the
+    detach takes an ``ACCESS EXCLUSIVE`` lock) until the transaction ends:
+    commit after each table rather than maintaining many tables in one
+    transaction, as ``invenio db maintain-partitions`` does.
+
+    :param table: a table declared with :func:`partition_by`.
+    :returns: the created and the removed partitions.
+    """
+    settings = table.info[PARTITIONING_KEY]
+    if settings["strategy"] != "range":
+        return [], []
+    interval = settings["interval"]
+    current = period_start(now or datetime.now(tz=timezone.utc), interval)
+    created = create_range_partitions(
+        connection,
+        table.name,
+        current,
+        add_periods(current, interval, settings["ahead"] + 1),
+        interval,
+        dry_run=dry_run,
+    )
+    removed = []
+    if settings["retention"] is not None:
+        removed = drop_range_partitions(
+            connection,
+            table.name,
+            add_periods(current, interval, -settings["retention"]),
+            interval,
+            detach_only=detach_only,
+            dry_run=dry_run,
+        )
+    return created, removed
+
+
+def partitioned_tables(metadata):
+    """Return the tables of a metadata declared with :func:`partition_by`."""
+    return [table for table in metadata.sorted_tables if PARTITIONING_KEY in table.info]
+
+
+def _create_initial_partitions(table, connection, **kw):
+    """Create the partitions of a new partitioned table."""
+    if connection.dialect.name != "postgresql":
+        return
+    settings = table.info[PARTITIONING_KEY]
+    if settings["strategy"] == "hash":
+        for statement in create_hash_partitions_ddl(table.name, settings["modulus"]):
+            connection.execute(sa.text(statement))
+    elif settings["strategy"] == "list":
+        connection.execute(sa.text(create_default_partition_ddl(table.name)))
+    else:
+        maintain_partitions(connection, table)
@@ -0,0 +1,188 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Migration plan with PostgreSQL lock analysis.
+
+Pending migrations are rendered to SQL in Alembic's offline mode (nothing is
+executed) and each statement is annotated with the table-level lock that
+PostgreSQL will take and whether it rewrites the table. This is meant as a
+pre-flight check before migrating large databases, together with the
+``DB_MIGRATION_LOCK_TIMEOUT`` setting of
+:class:`~invenio_db.ext.InvenioAlembic`.
+
+The analysis is heuristic: it inspects the statement text, so e.g. a
+``USING`` clause that makes an ``ALTER COLUMN ... TYPE`` binary compatible
+is not detected. Revisions that inspect the live database (e.g. through
+``op.get_bind()``) cannot be rendered offline.
+
+See https://www.postgresql.org/docs/current/explicit-locking.html
+"""
+
+import re
+from collections import namedtuple
+
+ACCESS_SHARE = "ACCESS SHARE"
+ROW_EXCLUSIVE = "ROW EXCLUSIVE"
+SHARE_UPDATE_EXCLUSIVE = "SHARE UPDATE EXCLUSIVE"
+SHARE = "SHARE"
+SHARE_ROW_EXCLUSIVE = "SHARE ROW EXCLUSIVE"
+ACCESS_EXCLUSIVE = "ACCESS EXCLUSIVE"
+
+PlannedStatement = namedtuple(
+    "PlannedStatement", ["revision", "sql", "lock", "table", "rewrite"]
+)
+"""A rendered migration statement and the lock it takes."""
+
+_NAME = r'((?:"[^"]+"|[\w$]+)(?:\.(?:"[^"]+"|[\w$]+))?)'
+
+_VOLATILE_DEFAULT = re.compile(
+    r"\bDEFAULT\b.*\b(clock_timestamp|random|gen_random_uuid|uuid_generate_v\d|"
+    r"nextval|timeofday)\s*\(",
+    re.I | re.S,
+)
+
+_LOCK_RULES = [
+    # (pattern, lock, rewrite); the first matching rule wins.
+    (
+        r"^LOCK\s+(?:TABLE\s+)?(?:ONLY\s+)?" + _NAME + r"\s+IN\s+([\w ]+?)\s+MODE",
+        None,
+        False,
+    ),
+    (
+        r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\b.*?\bON\s+(?:ONLY\s+)?" + _NAME,
+        SHARE_UPDATE_EXCLUSIVE,
+        False,
+    ),
+    (r"^CREATE\s+(?:UNIQUE\s+)?INDEX\b.*?\bON\s+(?:ONLY\s+)?" + _NAME, SHARE, False),
+    (r"^DROP\s+INDEX\s+CONCURRENTLY\b", SHARE_UPDATE_EXCLUSIVE, False),
+    (r"^REINDEX\b.*?\bCONCURRENTLY\b", SHARE_UPDATE_EXCLUSIVE, False),
+    (r"^REINDEX\s+(?:TABLE|INDEX)\s+" + _NAME, SHARE, False),
+    (r"^(?:VACUUM\s+FULL|CLUSTER)\b\s*" + _NAME + "?", ACCESS_EXCLUSIVE, True),
+    (r"^(?:VACUUM|ANALYZE)\b\s*" + _NAME + "?", SHARE_UPDATE_EXCLUSIVE, False),
+    (
+        r"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?"
+        + _NAME
+        + r".*\bVALIDATE\s+CONSTRAINT\b",
+        SHARE_UPDATE_EXCLUSIVE,
+        False,
+    ),
+    (
+        r"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?"
+        + _NAME
+        + r"\s+ADD\s+(?:CONSTRAINT\s+\S+\s+)?FOREIGN\s+KEY\b",
+        SHARE_ROW_EXCLUSIVE,
+        False,
+    ),
+    (
+        r"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?"
+        + _NAME
+        + r".*\b(?:ALTER\s+(?:COLUMN\s+)?\S+\s+(?:SET\s+DATA\s+)?TYPE|SET\s+(?:LOGGED|UNLOGGED|TABLESPACE)|SET\s+WITHOUT\s+OIDS)\b",
+        ACCESS_EXCLUSIVE,
+        True,
+    ),
+    (
+        r"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?"
+        + _NAME
+        + r".*\bSET\s+STATISTICS\b",
+        SHARE_UPDATE_EXCLUSIVE,
+        False,
+    ),
+    (
+        r"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?" + _NAME,
+        ACCESS_EXCLUSIVE,
+        False,
+    ),
+    (r"^ALTER\s+TYPE\s+" + _NAME, ACCESS_EXCLUSIVE, False),
+    (r"^ALTER\s+INDEX\s+(?:IF\s+EXISTS\s+)?" + _NAME, SHARE_UPDATE_EXCLUSIVE, False),
+    (
+        r"^CREATE\s+(?:UNLOGGED\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?" + _NAME,
+        ACCESS_EXCLUSIVE,
+        False,
+    ),
+    (
+        r"^(?:DROP\s+(?:TABLE|INDEX|MATERIALIZED\s+VIEW)|TRUNCATE)\s+(?:TABLE\s+)?(?:IF\s+EXISTS\s+)?"
+        + _NAME,
+        ACCESS_EXCLUSIVE,
+        False,
+    ),
+    (
+        r"^CREATE\s+(?:OR\s+REPLACE\s+)?TRIGGER\b.*?\bON\s+" + _NAME,
+        SHARE_ROW_EXCLUSIVE,
+        False,
+    ),
+    (r"^DROP\s+TRIGGER\b.*?\bON\s+" + _NAME, ACCESS_EXCLUSIVE, False),
+    (
+        r"^REFRESH\s+MATERIALIZED\s+VIEW\s+CONCURRENTLY\s+" + _NAME,
+        SHARE_UPDATE_EXCLUSIVE,
+        False,
+    ),
+    (r"^REFRESH\s+MATERIALIZED\s+VIEW\s+" + _NAME, ACCESS_EXCLUSIVE, False),
+    (
+        r"^(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(?:ONLY\s+)?" + _NAME,
+        ROW_EXCLUSIVE,
+        False,
+    ),
+    (r"^SELECT\b", ACCESS_SHARE, False),
+]
+_LOCK_RULES = [(re.compile(p, re.I | re.S), lock, rw) for p, lock, rw in _LOCK_RULES]
+
+_REVISION_COMMENT = re.compile(r"^--\s*Running\s+\w+\s+(?:.*?)\s*->\s*(\S+)")
+
+
+def analyze_statement(sql):
+    """Return ``(lock, table, rewrite)`` for a single SQL statement.
+
+    ``lock`` is ``None`` for statements that do not lock any existing table
+    (e.g. ``CREATE SEQUENCE`` or transaction control).
+    """
+    statement = sql.strip()
+    for pattern, lock, rewrite in _LOCK_RULES:
+        match = pattern.search(statement)
+        if not match:
+            continue
+        table = match.group(1) if match.groups() else None
+        if lock is None:
+            # Explicit LOCK TABLE statement.
+            return match.group(2).upper(), table, False
+        if (
+            lock == ACCESS_EXCLUSIVE
+            and re.match(r"^ALTER\s+TABLE\b", statement, re.I)
+            and re.search(r"\bADD\s+(?:COLUMN\s+)?", statement, re.I)
+            and _VOLATILE_DEFAULT.search(statement)
+        ):
+            rewrite = True
+        return lock, table, rewrite
+    return None, None, False
+
+
+class StatementCollector:
+    """File-like object collecting Alembic's offline SQL output."""
+
+    def __init__(self):
+        """Initialize the collector."""
+        self.chunks = []
+
+    def write(self, text):
+        """Collect a chunk of output (one statement per write)."""
+        self.chunks.append(text)
+
+    def flush(self):
+        """Flush the output (no-op)."""
+
+    def statements(self):
+        """Return the collected statements as :class:`PlannedStatement`."""
+        revision = None
+        planned = []
+        for chunk in self.chunks:
+            sql = chunk.strip()
+            if not sql:
+                continue
+            if sql.startswith("--"):
+                match = _REVISION_COMMENT.match(sql)
+                if match:
+                    revision = match.group(1)
+                continue
+            sql = sql.rstrip(";").rstrip()
+            lock, table, rewrite = analyze_statement(sql)
+            planned.append(PlannedStatement(revision, sql, lock, table, rewrite))
+        return planned
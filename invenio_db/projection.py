@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Column projections of models without ORM loading.
+
+Loading models costs an identity map lookup, the instrumentation of every
+attribute and the result processing of every value. Listing and export
+code that only reads a few columns can instead use a :class:`Projection`,
+which runs a Core query on the columns and returns plain tuples, dicts or
+lightweight records:
+
+.. code-block:: python
+
+    from invenio_db.projection import Projection
+
+    titles = Projection(RecordMetadata, "id", "created", as_="dict")
+    query = titles.select().where(RecordMetadata.is_deleted.is_(False))
+    for row in titles.iter(db.session, query):
+        ...
+
+The values of the types with a registered batch converter (see
+:data:`BATCH_CONVERTERS`), like
+:class:`~invenio_db.shared.UTCDateTime`, are converted one column of a
+chunk at a time instead of through the per-value result processor of the
+type.
+"""
+
+from collections import namedtuple
+from datetime import timezone
+
+import sqlalchemy as sa
+
+from .shared import UTCDateTime
+
+
+def _utc_datetimes(values):
+    """Convert the values of a ``UTCDateTime`` column."""
+    utc = timezone.utc
+    return [
+        (
+            value
+            if value is None or value.tzinfo is utc
+            else (
+                value.replace(tzinfo=utc)
+                if value.tzinfo is None
+                else value.astimezone(utc)
+            )
+        )
+        for value in values
+    ]
+
+
+BATCH_CONVERTERS = {UTCDateTime: _utc_datetimes}
+"""Batch converters of type decorators, by type.
+
+A converter receives the list of the values of a column (as returned by the
+implementation type) and returns the list of converted values.
+"""
+
+
+class Projection:
+    """Column projection of a model."""
+
+    def __init__(self, model, *attributes, as_="record"):
+        """Constructor.
+
+        :param model: the model.
+        :param attributes: the column attributes (names or attributes) to
+            select, by default all of them.
+        :param as_: the type of the results: ``"tuple"``, ``"dict"`` or
+            ``"record"`` (a named tuple class with ``__slots__``).
+        """
+        if as_ not in ("tuple", "dict", "record"):
+            raise ValueError(f"Unknown result type: {as_}")
+        mapper = sa.inspect(model)
+        if attributes:
+            keys = [getattr(attribute, "key", attribute) for attribute in attributes]
+        else:
+            keys = [prop.key for prop in mapper.column_attrs]
+
+        self.model = model
+        self.keys = keys
+        self.as_ = as_
+        self.columns = []
+        self.converters = []
+        for i, key in enumerate(keys):
+            column = mapper.column_attrs[key].columns[0]
+            converter = BATCH_CONVERTERS.get(type(column.type))
+            if converter is not None:
+                # Skip the result processing of the type decorator.
+                column = sa.type_coerce(column, column.type.impl)
+                self.converters.append((i, converter))
+            self.columns.append(column.label(key))
+        self.record_class = namedtuple(f"{model.__name__}Record", keys)
+
+    def select(self):
+        """Return the query of the columns, to refine with criteria."""
+        return sa.select(*self.columns)
+
+    def _convert(self, rows):
+        """Convert a chunk of rows to results."""
+        if self.converters and rows:
+            columns = list(zip(*rows))
+            for i, converter in self.converters:
+                columns[i] = converter(columns[i])
+            rows = zip(*columns)
+        if self.as_ == "record":
+            return list(map(self.record_class._make, rows))
+        if self.as_ == "dict":
+            keys = self.keys
+            return [dict(zip(keys, row)) for row in rows]
+        return [tuple(row) for row in rows]
+
+    def iter(self, session, query=None, chunk_size=10000):
+        """Iterate over the results, fetched and converted by chunks.
+
+        :param query: the query, by default :meth:`select`.
+        """
+        query = self.select() if query is None else query
+        result = session.execute(query.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
+            yield from self._convert(rows)
+
+    def all(self, session, query=None):
+        """Return all the results.
+
+        :param query: the query, by default :meth:`select`.
+        """
+        query = self.select() if query is None else query
+        return self._convert(session.execute(query).all())
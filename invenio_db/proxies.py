@@ -3,7 +3,21 @@
 
 """Helper proxy to the state object."""
 
-from flask import current_app
+from flask import current_app, has_app_context
 from werkzeug.local import LocalProxy
 
+from .memo import lookup_memo
+
 current_db = LocalProxy(lambda: current_app.extensions["sqlalchemy"])
+
+current_lookups = LocalProxy(lookup_memo)
+
+
+def extension_attribute(name):
+    """Return an attribute of the current application's extension.
+
+    :returns: the attribute, or ``None`` outside of an application context or
+        if the extension is not initialized.
+    """
+    if has_app_context():
+        return getattr(current_app.extensions.get("invenio-db"), name, None)
@@ -0,0 +1,170 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Persistent cache of the Alembic revision graph.
+
+Building the Alembic revision map imports every revision file of every
+package registered in the ``invenio_db.alembic`` entry point group. For CLI
+commands such as ``alembic current`` or ``db create`` only the graph (revision
+identifiers, parents, dependencies and branch labels) is needed, so importing
+hundreds of modules dominates the startup time.
+
+The revision graph is therefore stored in a small JSON file keyed on the path,
+modification time and size of each revision file. On the next run unchanged
+files are not imported; their :class:`CachedScript` only loads the Python
+module when it is actually needed (e.g. to run ``upgrade()``).
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from alembic import util
+from alembic.script import Script
+from alembic.script.revision import Revision, RevisionMap
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+"""Version of the on-disk cache format."""
+
+
+class CachedScript(Script):
+    """Revision script restored from the cache.
+
+    The Python module is only imported on first access of :attr:`module`.
+    """
+
+    def __init__(self, entry, path):
+        """Initialize the script from a cache entry."""
+        self.path = str(path)
+        self._longdoc = entry["doc"]
+        Revision.__init__(
+            self,
+            entry["revision"],
+            _to_tuple(entry["down_revision"]),
+            dependencies=_to_tuple(entry["dependencies"]),
+            branch_labels=tuple(entry["branch_labels"]),
+        )
+
+    @util.memoized_property
+    def module(self):
+        """Import the revision module on demand."""
+        path = Path(self.path)
+        return util.load_python_file(path.parent, path.name)
+
+    @property
+    def longdoc(self):
+        """Return the cached docstring of the script."""
+        return self._longdoc
+
+
+def _to_tuple(value):
+    """Convert a JSON value back to an Alembic revision value."""
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def _from_tuple(value):
+    """Convert an Alembic revision value to a JSON value."""
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def _file_key(path):
+    """Return the key used to detect changes of a revision file."""
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _script_entry(script):
+    """Serialize a freshly loaded script."""
+    return {
+        "revision": script.revision,
+        "down_revision": _from_tuple(script.down_revision),
+        "dependencies": _from_tuple(script.dependencies),
+        "branch_labels": list(script._orig_branch_labels),
+        "doc": script.longdoc,
+    }
+
+
+def load_cache(cache_path):
+    """Load the cache entries from ``cache_path``."""
+    try:
+        with open(cache_path) as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+    if data.get("format") != CACHE_FORMAT:
+        return {}
+    return data.get("files", {})
+
+
+def save_cache(cache_path, entries):
+    """Atomically write the cache entries to ``cache_path``."""
+    directory = os.path.dirname(cache_path) or "."
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError as e:
+        logger.debug("Cannot write Alembic revision cache %s: %s", cache_path, e)
+        return
+    try:
+        with os.fdopen(fd, "w") as fp:
+            json.dump({"format": CACHE_FORMAT, "files": entries}, fp)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:  # pragma: no cover
+        logger.debug("Cannot write Alembic revision cache %s: %s", cache_path, e)
+        os.unlink(tmp_path)
+
+
+def load_revisions(script_directory, cache_path):
+    """Yield the revisions of ``script_directory`` using the cache.
+
+    Mirrors :meth:`alembic.script.ScriptDirectory._load_revisions`, but
+    files whose modification time and size match the cache are restored as
+    :class:`CachedScript` instances without importing them.
+    """
+    cached = load_cache(cache_path)
+    entries = {}
+    seen = set()
+
+    for location in script_directory._version_locations:
+        if not location.exists():
+            continue
+        for file_path in Script._list_py_dir(script_directory, location):
+            real_path = file_path.resolve()
+            if real_path in seen:
+                util.warn(
+                    f"File {real_path} loaded twice! ignoring. "
+                    "Please ensure version_locations is unique."
+                )
+                continue
+            seen.add(real_path)
+
+            name = str(real_path)
+            key = _file_key(real_path)
+            entry = cached.get(name)
+            if entry is None or entry["key"] != key:
+                script = Script._from_path(script_directory, real_path)
+                entry = {"key": key, "script": script and _script_entry(script)}
+            else:
+                script = entry["script"] and CachedScript(entry["script"], real_path)
+            entries[name] = entry
+
+            if script is not None:
+                yield script
+
+    if entries != cached:
+        save_cache(cache_path, entries)
+
+
+def enable_revision_cache(script_directory, cache_path):
+    """Make ``script_directory`` build its revision map through the cache."""
+    script_directory.revision_map = RevisionMap(
+        lambda: load_revisions(script_directory, cache_path)
+    )
+    return script_directory
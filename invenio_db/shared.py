@@ -4,11 +4,24 @@
 
 """Shared database object for Invenio."""
 
+import json
+import math
+import secrets
+import threading
+import time
+import uuid
+import zlib
 from datetime import datetime, timezone
 
 from flask_sqlalchemy import SQLAlchemy as FlaskSQLAlchemy
-from sqlalchemy import Column, MetaData, event, util
-from sqlalchemy.types import DateTime, TypeDecorator
+from sqlalchemy import DDL, Column, FetchedValue, MetaData, event, func, util
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import JSON, DateTime, LargeBinary, TypeDecorator, Uuid
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 NAMING_CONVENTION = util.immutabledict(
     {
@@ -68,6 +81,293 @@ class UTCDateTime(TypeDecorator):
         return value.astimezone(timezone.utc)
 
 
+def _has_non_finite(value):
+    """Return if a value contains a NaN or infinite float."""
+    # Iterative and skipping the common scalars first: this runs for every
+    # document holding a null.
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        kind = type(item)
+        if kind is str or kind is int or kind is bool or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, float) and not math.isfinite(item):
+            return True
+    return False
+
+
+def json_dumps(value):
+    """Serialize a value to JSON, with orjson if it is installed.
+
+    Falls back to :func:`json.dumps` for the values orjson does not support
+    (e.g. integers larger than 64 bits or non-string keys) and for the NaN
+    and infinite floats, which orjson writes as ``null``.
+    """
+    if orjson is not None:
+        try:
+            serialized = orjson.dumps(value)
+        except TypeError:
+            pass
+        else:
+            # Non-finite floats are written as null, so only look for them
+            # when there is one.
+            if b"null" not in serialized or not _has_non_finite(value):
+                return serialized.decode()
+    return json.dumps(value)
+
+
+def json_loads(value):
+    """Deserialize JSON (``str`` or ``bytes``), with orjson if it is installed.
+
+    Falls back to :func:`json.loads` for the documents orjson rejects (e.g.
+    ``NaN`` and ``Infinity``).
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(value)
+
+
+COMPRESSION_NONE = 0
+"""Header byte of uncompressed payloads."""
+
+COMPRESSION_ZLIB = 1
+"""Header byte of zlib compressed payloads."""
+
+COMPRESSION_ZSTD = 2
+"""Header byte of Zstandard compressed payloads."""
+
+
+def _zstd():
+    """Return the Zstandard compression and decompression functions."""
+    try:
+        from compression import zstd
+
+        return zstd.compress, zstd.decompress
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return (
+        lambda data: zstandard.ZstdCompressor().compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+
+
+def compress_payload(data, threshold=1024, algorithm="zlib"):
+    """Prefix data with a format header, compressing it above a threshold.
+
+    :param threshold: the size from which the data is compressed (``None``
+        to never compress).
+    :param algorithm: ``"zlib"`` or ``"zstd"`` (requires Python 3.14 or the
+        ``zstandard`` package).
+    """
+    if threshold is None or len(data) < threshold:
+        return bytes([COMPRESSION_NONE]) + data
+    if algorithm == "zlib":
+        return bytes([COMPRESSION_ZLIB]) + zlib.compress(data)
+    if algorithm == "zstd":
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError("Zstandard compression is not available.")
+        return bytes([COMPRESSION_ZSTD]) + zstd[0](data)
+    raise ValueError(f"Unknown compression algorithm: {algorithm}")
+
+
+def decompress_payload(payload):
+    """Return the data of a payload created by :func:`compress_payload`."""
+    payload = bytes(payload)
+    header, data = payload[0], payload[1:]
+    if header == COMPRESSION_NONE:
+        return data
+    if header == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if header == COMPRESSION_ZSTD:
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError("Zstandard compression is not available.")
+        return zstd[1](data)
+    raise ValueError(f"Unknown payload format: {header}")
+
+
+class Compressed(TypeDecorator):
+    """Binary column transparently compressing large values.
+
+    Values from ``threshold`` bytes are compressed, and every value is stored
+    with a one byte header telling its format, so that the algorithm can be
+    changed without rewriting the existing rows. Text columns store ``str``
+    values (encoded as UTF-8), binary ones ``bytes``.
+
+    ::
+
+        from invenio_db import db
+        class SomeModel(Base):
+            __tablename__ = "somemodel"
+            body = sa.Column(db.Compressed(threshold=512))
+
+    Existing columns can be converted with
+    :func:`invenio_db.utils.compress_column`.
+    """
+
+    impl = LargeBinary
+
+    cache_ok = True
+
+    def __init__(self, threshold=1024, algorithm="zlib", binary=False):
+        """Constructor.
+
+        :param threshold: the size from which values are compressed.
+        :param algorithm: ``"zlib"`` or ``"zstd"``.
+        :param binary: store ``bytes`` instead of ``str`` values.
+        """
+        super().__init__()
+        self.threshold = threshold
+        self.algorithm = algorithm
+        self.binary = binary
+
+    def process_bind_param(self, value, dialect):
+        """Compress the value."""
+        if value is None:
+            return None
+        if not self.binary:
+            value = value.encode("utf-8")
+        return compress_payload(value, self.threshold, self.algorithm)
+
+    def process_result_value(self, value, dialect):
+        """Decompress the value."""
+        if value is None:
+            return None
+        value = decompress_payload(value)
+        return value if self.binary else value.decode("utf-8")
+
+
+class CompactJSON(TypeDecorator):
+    """JSON type stored as JSONB on PostgreSQL.
+
+    On other databases, documents are stored as JSON, or, if a
+    ``compress_threshold`` is given, in a binary column where the documents
+    from that size (in bytes) are compressed. Compressed documents cannot be
+    queried with the JSON operators of the database.
+
+    ::
+
+        from invenio_db import db
+        class SomeModel(Base):
+            __tablename__ = "somemodel"
+            json = sa.Column(db.CompactJSON(compress_threshold=4096))
+    """
+
+    impl = JSON
+
+    cache_ok = True
+
+    def __init__(self, compress_threshold=None, none_as_null=True):
+        """Constructor.
+
+        :param compress_threshold: the size from which documents are compressed
+            on databases other than PostgreSQL (default not compressed).
+        :param none_as_null: store ``None`` as SQL ``NULL``.
+        """
+        super().__init__(none_as_null=none_as_null)
+        self.compress_threshold = compress_threshold
+        self.none_as_null = none_as_null
+
+    def _compressed(self, dialect):
+        """Return if the documents are compressed on a dialect."""
+        return self.compress_threshold is not None and dialect.name != "postgresql"
+
+    def load_dialect_impl(self, dialect):
+        """Use JSONB on PostgreSQL and a binary column when compressing."""
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(
+                postgresql.JSONB(none_as_null=self.none_as_null)
+            )
+        if self._compressed(dialect):
+            return dialect.type_descriptor(LargeBinary())
+        return dialect.type_descriptor(JSON(none_as_null=self.none_as_null))
+
+    def process_bind_param(self, value, dialect):
+        """Serialize and compress the document if needed."""
+        if value is None or not self._compressed(dialect):
+            return value
+        return compress_payload(json_dumps(value).encode(), self.compress_threshold)
+
+    def process_result_value(self, value, dialect):
+        """Decompress and deserialize the document if needed."""
+        if value is None or not self._compressed(dialect):
+            return value
+        return json_loads(decompress_payload(value))
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_last = [0, 0]
+
+
+def uuid7():
+    """Return a time-ordered UUID (version 7, RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds, so that new keys
+    are appended at the end of the primary key index instead of at random
+    positions. Within the same millisecond, the 12 following bits are a
+    counter (starting at a random value), which keeps the UUIDs generated
+    by a process strictly increasing.
+    """
+    with _uuid7_lock:
+        timestamp = time.time_ns() // 1_000_000
+        last_timestamp, counter = _uuid7_last
+        if timestamp <= last_timestamp:
+            timestamp, counter = last_timestamp, counter + 1
+            if counter > 0xFFF:
+                timestamp, counter = timestamp + 1, 0
+        else:
+            counter = secrets.randbits(11)
+        _uuid7_last[:] = [timestamp, counter]
+
+    value = (timestamp & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76 | counter << 64
+    value |= 0b10 << 62 | secrets.randbits(62)
+    return uuid.UUID(int=value)
+
+
+def uuid7_datetime(value):
+    """Return the creation time of a UUID generated by :func:`uuid7`."""
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=timezone.utc)
+
+
+class UUID7(TypeDecorator):
+    """UUID primary key type, to use with the :func:`uuid7` generator.
+
+    Stored as ``UUID`` on PostgreSQL and as a hexadecimal ``CHAR(32)``
+    elsewhere, which both sort in creation order. Values can be given as
+    :class:`uuid.UUID` or strings.
+
+    ::
+
+        from invenio_db import db
+        class SomeModel(Base, db.Timestamp):
+            __tablename__ = "somemodel"
+            id = sa.Column(db.UUID7, primary_key=True, default=db.uuid7)
+    """
+
+    impl = Uuid
+
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        """Accept strings."""
+        if isinstance(value, str):
+            return uuid.UUID(value)
+        return value
+
+
 class Timestamp:
     """Adds `created` and `updated` columns to a derived declarative model.
 
@@ -105,6 +405,91 @@ def timestamp_before_update(mapper, connection, target):
     target.updated = datetime.now(tz=timezone.utc)
 
 
+class ServerTimestamp:
+    """Adds `created` and `updated` columns maintained by the database.
+
+    Both columns default to ``now()`` on the server, and a trigger sets
+    `updated` on every update that does not set it explicitly. Unlike
+    :class:`Timestamp`, bulk updates (e.g. ``query.update()``) keep `updated`
+    correct and no Python listener runs per row. The trigger is created with
+    the table; for existing tables, use
+    :func:`invenio_db.utils.create_timestamp_trigger` in a migration.
+
+    The trigger is supported on PostgreSQL and SQLite.
+
+    ::
+
+        from invenio_db import db
+        class SomeModel(Base, db.ServerTimestamp):
+            __tablename__ = "somemodel"
+            id = sa.Column(sa.Integer, primary_key=True)
+    """
+
+    created = Column(UTCDateTime, server_default=func.now(), nullable=False)
+    updated = Column(
+        UTCDateTime,
+        server_default=func.now(),
+        server_onupdate=FetchedValue(),
+        nullable=False,
+    )
+
+
+def timestamp_trigger_ddl(dialect_name, table_name, column="updated"):
+    """Return the statements creating the trigger maintaining ``column``."""
+    trigger = f"trg_{table_name}_{column}"[:63]
+    if dialect_name == "postgresql":
+        function = f"invenio_db_set_{column}"
+        return [
+            f"CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$\n"
+            "BEGIN\n"
+            f"    IF NEW.{column} IS NOT DISTINCT FROM OLD.{column} THEN\n"
+            f"        NEW.{column} = now();\n"
+            "    END IF;\n"
+            "    RETURN NEW;\n"
+            "END;\n"
+            "$$ LANGUAGE plpgsql",
+            f'CREATE TRIGGER "{trigger}" BEFORE UPDATE ON "{table_name}" '
+            f"FOR EACH ROW EXECUTE FUNCTION {function}()",
+        ]
+    if dialect_name == "sqlite":
+        return [
+            f'CREATE TRIGGER "{trigger}" AFTER UPDATE ON "{table_name}" '
+            f"FOR EACH ROW WHEN NEW.{column} IS OLD.{column} BEGIN "
+            f'UPDATE "{table_name}" '
+            f"SET {column} = strftime('%Y-%m-%d %H:%M:%f', 'now') "
+            "WHERE rowid = NEW.rowid; END",
+        ]
+    raise NotImplementedError(
+        f"Timestamp triggers are not supported on {dialect_name}."
+    )
+
+
+def drop_timestamp_trigger_ddl(dialect_name, table_name, column="updated"):
+    """Return the statements dropping the trigger maintaining ``column``."""
+    trigger = f"trg_{table_name}_{column}"[:63]
+    if dialect_name == "postgresql":
+        return [f'DROP TRIGGER IF EXISTS "{trigger}" ON "{table_name}"']
+    return [f'DROP TRIGGER IF EXISTS "{trigger}"']
+
+
+@event.listens_for(ServerTimestamp, "instrument_class", propagate=True)
+def server_timestamp_instrument_class(mapper, class_):
+    """Create the timestamp trigger together with the table."""
+    table = mapper.local_table
+    if table is None or table.info.get("invenio_db_timestamp_trigger"):
+        return
+    table.info["invenio_db_timestamp_trigger"] = True
+
+    def create_trigger(target, connection, **kw):
+        dialect_name = connection.dialect.name
+        if dialect_name not in ("postgresql", "sqlite"):
+            return
+        for statement in timestamp_trigger_ddl(dialect_name, target.name):
+            connection.execute(DDL(statement.replace("%", "%%")))
+
+    event.listen(table, "after_create", create_trigger)
+
+
 class SQLAlchemy(FlaskSQLAlchemy):
     """Implement or overide extension methods."""
 
@@ -116,6 +501,21 @@ class SQLAlchemy(FlaskSQLAlchemy):
         if name == "Timestamp":
             return Timestamp
 
+        if name == "ServerTimestamp":
+            return ServerTimestamp
+
+        if name == "CompactJSON":
+            return CompactJSON
+
+        if name == "Compressed":
+            return Compressed
+
+        if name == "UUID7":
+            return UUID7
+
+        if name == "uuid7":
+            return uuid7
+
         return super().__getattr__(name)
 
 
@@ -0,0 +1,256 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Template databases for fast test database setup.
+
+Creating the full schema from ``db.metadata`` for every test session is slow.
+A :class:`DatabaseTemplate` builds the schema once and then clones it:
+
+* PostgreSQL: the schema is built in a separate database which is used with
+  ``CREATE DATABASE ... TEMPLATE``.
+* SQLite files: the schema is built in a template file which is copied.
+* SQLite in-memory: the schema is built in an in-process database which is
+  copied with :meth:`sqlite3.Connection.backup`.
+
+Templates are named after a fingerprint of the schema DDL and the Alembic
+heads, so a changed model or a new revision automatically yields a new
+template. Stale templates are not removed.
+
+The template can be built ahead of time with ``invenio db template``.
+Example of ``conftest.py`` fixtures cloning one database per xdist worker:
+
+.. code-block:: python
+
+    @pytest.fixture(scope="module")
+    def app_config(app_config, worker_id):
+        app_config["SQLALCHEMY_DATABASE_URI"] = f"{DATABASE_URI}_{worker_id}"
+        return app_config
+
+    @pytest.fixture(scope="module")
+    def database(appctx):
+        from invenio_db import db
+        from invenio_db.templates import clone_from_template
+
+        clone_from_template()
+        yield db
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy.pool import NullPool, StaticPool
+
+from .proxies import current_db
+from .utils import create_alembic_version_table
+from .versioning import ensure_version_tables
+
+_memory_templates = {}
+"""In-memory SQLite templates by fingerprint."""
+
+
+def schema_fingerprint(metadata, dialect, heads=()):
+    """Return a hash of the schema DDL and the Alembic heads."""
+    statements = []
+
+    def executor(sql, *multiparams, **params):
+        statements.append(str(sql.compile(dialect=dialect)))
+
+    engine = sa.create_mock_engine(sa.engine.URL.create(dialect.name), executor)
+    metadata.create_all(engine, checkfirst=False)
+
+    digest = hashlib.sha256()
+    for text in statements + sorted(heads):
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DatabaseTemplate:
+    """Schema template that can be cloned into test databases."""
+
+    def __init__(self, engine, metadata, heads=(), populate=None):
+        """Initialize the template.
+
+        :param engine: engine of the database the template is derived from.
+        :param metadata: metadata of the schema.
+        :param heads: Alembic heads the schema corresponds to.
+        :param populate: callable receiving a connection to the template
+            database, creating the schema. Defaults to
+            ``metadata.create_all``.
+        """
+        self.url = engine.url
+        self.dialect = engine.dialect
+        self.metadata = metadata
+        self.fingerprint = schema_fingerprint(metadata, engine.dialect, heads)
+        self.populate = populate or (lambda conn: metadata.create_all(conn))
+
+    @property
+    def is_memory(self):
+        """Whether the template is an in-memory SQLite database."""
+        return self.dialect.name == "sqlite" and self.url.database in (
+            None,
+            "",
+            ":memory:",
+        )
+
+    @property
+    def name(self):
+        """Name of the template database or path of the template file."""
+        suffix = self.fingerprint[:12]
+        if self.is_memory:
+            return f":memory:{suffix}"
+        if self.dialect.name == "sqlite":
+            return f"{self.url.database}.{suffix}.template"
+        suffix = f"_tpl_{suffix}"
+        # Keep the fingerprint within PostgreSQL's 63 characters limit.
+        return self.url.database[: 63 - len(suffix)] + suffix
+
+    def _admin_engine(self):
+        """Engine connected to the maintenance database in autocommit mode."""
+        return sa.create_engine(
+            self.url.set(database="postgres"),
+            isolation_level="AUTOCOMMIT",
+            poolclass=NullPool,
+        )
+
+    def _quote(self, name):
+        return self.dialect.identifier_preparer.quote(name)
+
+    def ensure(self):
+        """Build the template unless it already exists.
+
+        :returns: the name of the template.
+        """
+        if self.is_memory:
+            self._ensure_memory()
+        elif self.dialect.name == "sqlite":
+            self._ensure_sqlite()
+        elif self.dialect.name == "postgresql":
+            self._ensure_postgresql()
+        else:
+            raise NotImplementedError(
+                f"Database templates are not supported on {self.dialect.name}."
+            )
+        return self.name
+
+    def _ensure_memory(self):
+        if self.fingerprint in _memory_templates:
+            return
+        connection = sqlite3.connect(":memory:", check_same_thread=False)
+        engine = sa.create_engine(
+            "sqlite://", creator=lambda: connection, poolclass=StaticPool
+        )
+        with engine.begin() as conn:
+            self.populate(conn)
+        _memory_templates[self.fingerprint] = connection
+
+    def _ensure_sqlite(self):
+        if os.path.exists(self.name):
+            return
+        # Build in a temporary file so concurrent workers never see a
+        # half-built template.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.name) or ".")
+        os.close(fd)
+        try:
+            engine = sa.create_engine(
+                self.url.set(database=tmp_path), poolclass=NullPool
+            )
+            with engine.begin() as conn:
+                self.populate(conn)
+            engine.dispose()
+            os.replace(tmp_path, self.name)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _ensure_postgresql(self):
+        engine = self._admin_engine()
+        with engine.connect() as conn:
+            # Serialize concurrent builds of the same template.
+            key = int(self.fingerprint[:15], 16)
+            conn.execute(sa.text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            try:
+                exists = conn.execute(
+                    sa.text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                    {"name": self.name},
+                ).scalar()
+                if not exists:
+                    conn.execute(sa.text(f"CREATE DATABASE {self._quote(self.name)}"))
+                    template_engine = sa.create_engine(
+                        self.url.set(database=self.name), poolclass=NullPool
+                    )
+                    try:
+                        with template_engine.begin() as template_conn:
+                            self.populate(template_conn)
+                    except BaseException:
+                        template_engine.dispose()
+                        conn.execute(sa.text(f"DROP DATABASE {self._quote(self.name)}"))
+                        raise
+                    template_engine.dispose()
+            finally:
+                conn.execute(sa.text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+        engine.dispose()
+
+    def clone(self, target_engine):
+        """Replace the database of ``target_engine`` with a copy of the template.
+
+        The template is built first if needed. Connections of
+        ``target_engine`` are disposed.
+        """
+        self.ensure()
+        if self.is_memory:
+            with target_engine.connect() as conn:
+                _memory_templates[self.fingerprint].backup(
+                    conn.connection.dbapi_connection
+                )
+            return
+
+        target_engine.dispose()
+        database = target_engine.url.database
+        if self.dialect.name == "sqlite":
+            shutil.copyfile(self.name, database)
+            return
+
+        engine = self._admin_engine()
+        with engine.connect() as conn:
+            conn.execute(sa.text(f"DROP DATABASE IF EXISTS {self._quote(database)}"))
+            conn.execute(
+                sa.text(
+                    f"CREATE DATABASE {self._quote(database)} "
+                    f"TEMPLATE {self._quote(self.name)}"
+                )
+            )
+        engine.dispose()
+
+
+def current_template():
+    """Return the template of the current application's schema.
+
+    The template includes the ``alembic_version`` table stamped with the
+    current heads, like ``db create``.
+    """
+    ensure_version_tables()
+    alembic = current_app.extensions["invenio-db"].alembic
+    heads = tuple(alembic.script_directory.revision_map._real_heads)
+
+    def populate(connection):
+        current_db.metadata.create_all(connection)
+        create_alembic_version_table(connection, heads=heads)
+
+    return DatabaseTemplate(
+        current_db.engine, current_db.metadata, heads=heads, populate=populate
+    )
+
+
+def clone_from_template(engine=None):
+    """Clone the current application's schema template into a database.
+
+    :param engine: engine of the target database. Defaults to the engine of
+        the current application.
+    """
+    current_template().clone(engine if engine is not None else current_db.engine)
@@ -80,11 +80,36 @@ class and implementing the desired methods:
     class BulkIndexOp(Operation):
         def on_commit(self, uow):
             # ... executed after the database transaction commit ...
+
+**How to process many rows?**
+
+Long running jobs (reindexing, data migrations) should not keep every
+processed model in the session. Use :meth:`UnitOfWork.chunked` to get the
+models in batches, each one in its own unit of work that is committed and
+released before the next batch is loaded:
+
+.. code-block:: python
+
+    chunks = UnitOfWork.chunked(sa.select(RecordMetadata), size=500)
+    for uow, records in chunks:
+        for record in records:
+            # ...
+            uow.register(ModelCommitOp(record))
+
+Leaving the loop early, with ``break`` or an exception, rolls back the
+current chunk. Call ``uow.commit()`` before ``break`` to keep it.
 """
 
+import time
 from functools import wraps
 
+import sqlalchemy as sa
+
+from .changes import UOW_STACK_KEY, merge_changes
+from .pagination import keyset_pages
+from .proxies import extension_attribute
 from .shared import db
+from .versioning import versioning_disabled
 
 
 #
@@ -156,28 +181,64 @@ class UnitOfWork:
     is needed.
     """
 
-    def __init__(self, session=None):
-        """Initialize unit of work context."""
+    def __init__(self, session=None, versioning=True):
+        """Initialize unit of work context.
+
+        :param session: the database session (default ``db.session``).
+        :param versioning: set to ``False`` to not create versions of the
+            changes made within this unit of work (e.g. for bulk jobs).
+        """
         self._session = session or db.session
         self._operations = []
         self._dirty = False
+        self._versioning = versioning
+        self._versioning_ctx = None
+        self._changes = []
+        self._feed = None
 
     def __enter__(self):
         """Entering the context."""
+        if not self._versioning:
+            self._versioning_ctx = versioning_disabled(self.session)
+            self._versioning_ctx.__enter__()
+        feed = extension_attribute("change_feed")
+        if feed is not None and feed.active:
+            self._feed = feed
+            self.session.info.setdefault(UOW_STACK_KEY, []).append(self)
         self.session.begin_nested()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Rollback on exception."""
-        if exc_type is not None:
-            self.rollback(exception=exc_value)
-            self._mark_dirty()
+        try:
+            if exc_type is not None:
+                self.rollback(exception=exc_value)
+                self._mark_dirty()
+        finally:
+            if self._feed is not None:
+                self.session.info[UOW_STACK_KEY].remove(self)
+            if self._versioning_ctx is not None:
+                self._versioning_ctx.__exit__(None, None, None)
+                self._versioning_ctx = None
 
     @property
     def session(self):
         """The SQLAlchemy database session associated with this UoW."""
         return self._session
 
+    @property
+    def dirty(self):
+        """Whether the unit of work was committed or rolled back on error."""
+        return self._dirty
+
+    @property
+    def changes(self):
+        """The changes flushed so far, merged per model.
+
+        Only collected while the change feed has subscribers.
+        """
+        return merge_changes(self._changes)
+
     def _mark_dirty(self):
         """Mark the unit of work as dirty."""
         if self._dirty:
@@ -187,6 +248,12 @@ class UnitOfWork:
     def commit(self):
         """Commit the unit of work."""
         self.session.commit()
+        # Publish the change set
+        if self._feed is not None:
+            changes = merge_changes(self._changes)
+            self._changes = []
+            if changes:
+                self._feed.publish(changes)
         # Run commit operations
         for op in self._operations:
             op.on_commit(self)
@@ -198,6 +265,7 @@ class UnitOfWork:
     def rollback(self, exception=None):
         """Rollback the database session."""
         self.session.rollback()
+        self._changes = []
 
         # Run exception operations
         if exception:
@@ -221,6 +289,137 @@ class UnitOfWork:
         # Append to list of operations.
         self._operations.append(op)
 
+    @classmethod
+    def chunked(
+        cls,
+        query,
+        size=1000,
+        session=None,
+        versioning=True,
+        callback=None,
+    ):
+        """Iterate over the models of a query in committed chunks.
+
+        See :class:`ChunkedUnitOfWork`.
+        """
+        return ChunkedUnitOfWork(
+            query,
+            size=size,
+            session=session,
+            versioning=versioning,
+            callback=callback,
+        )
+
+
+def _max_rss():
+    """Return the peak resident memory of the process in kilobytes."""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ChunkStats:
+    """Progress of a :class:`ChunkedUnitOfWork`."""
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self.chunks = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.identity_map = 0
+        self.max_rss = None
+
+    @property
+    def rows_per_second(self):
+        """Return the throughput."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        """Return the statistics as a string."""
+        return (
+            f"<ChunkStats chunks={self.chunks} rows={self.rows} "
+            f"rows/s={self.rows_per_second:.1f} identity_map={self.identity_map} "
+            f"max_rss={self.max_rss}>"
+        )
+
+
+class ChunkedUnitOfWork:
+    """Iterate over the models of a query in committed chunks.
+
+    The rows are loaded with keyset pagination on the primary key, so the
+    query must select a single model and its ordering is replaced. Each
+    chunk is yielded together with its own :class:`UnitOfWork`, which is
+    committed once the loop body is done with it (unless it was already
+    committed or rolled back). When the loop is left early, with ``break``
+    or an exception, the chunk is rolled back unless the loop body
+    committed it. The models of the chunk are then expunged and the
+    registered operations released, so the session does not grow with the
+    number of processed rows.
+    """
+
+    def __init__(
+        self,
+        query,
+        size=1000,
+        session=None,
+        versioning=True,
+        callback=None,
+    ):
+        """Constructor.
+
+        :param query: a ``select()`` of a single model.
+        :param size: the number of models per chunk.
+        :param session: the database session (default ``db.session``).
+        :param versioning: passed to the units of work.
+        :param callback: called with the :class:`ChunkStats` after each chunk.
+        """
+        self.query = query
+        self.size = size
+        self.session = session or db.session
+        self.versioning = versioning
+        self.callback = callback
+        self.stats = ChunkStats()
+
+    def _chunks(self):
+        """Load the models chunk by chunk."""
+        model = self.query.column_descriptions[0]["entity"]
+        pk_columns = list(sa.inspect(model).primary_key)
+        return keyset_pages(self.session, self.query, pk_columns, size=self.size)
+
+    def __iter__(self):
+        """Yield a unit of work and the models of each chunk."""
+        started = time.perf_counter()
+        for models in self._chunks():
+            closed = False
+            with UnitOfWork(self.session, versioning=self.versioning) as uow:
+                try:
+                    yield uow, models
+                except GeneratorExit:
+                    # The loop was left early, possibly in the middle of the
+                    # chunk: only keep what the loop body committed itself.
+                    closed = True
+                if not uow.dirty:
+                    if closed:
+                        uow.rollback()
+                    else:
+                        uow.commit()
+            for model in models:
+                if model in self.session:
+                    self.session.expunge(model)
+            uow._operations.clear()
+
+            self.stats.chunks += 1
+            self.stats.rows += len(models)
+            self.stats.seconds = time.perf_counter() - started
+            self.stats.identity_map = len(self.session.identity_map)
+            self.stats.max_rss = _max_rss()
+            if self.callback is not None:
+                self.callback(self.stats)
+            if closed:
+                return
+
 
 def unit_of_work(**kwargs):
     """Decorator to auto-inject a unit of work if not provided.
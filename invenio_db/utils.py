@@ -6,15 +6,35 @@
 
 """Invenio-DB utility functions."""
 
+from datetime import datetime, timezone
 from functools import partial
 
+import sqlalchemy as sa
 from alembic import op
 from alembic.migration import MigrationContext
 from flask import current_app
 from sqlalchemy import inspect
 
+from .pagination import keyset_pages
 from .proxies import current_db
+from .shared import (
+    Compressed,
+    Timestamp,
+)
 from .shared import db as _db
+from .shared import (
+    drop_timestamp_trigger_ddl,
+    json_dumps,
+    json_loads,
+    timestamp_trigger_ddl,
+)
+from .versioning import (
+    CHANGE_LOG_TABLE,
+    change_log_columns,
+    history_index_name,
+    insert_versions,
+    is_versioning_enabled,
+)
 
 
 def rebuild_encrypted_properties(old_key, model, properties, db=_db):
@@ -61,16 +81,131 @@ def rebuild_encrypted_properties(old_key, model, properties, db=_db):
     db.session.commit()
 
 
-def create_alembic_version_table():
-    """Create alembic_version table."""
+def bulk_update(session, model, values, *where, chunk_size=1000, commit=True):
+    """Update many rows set-based, keeping timestamps and versions correct.
+
+    Unlike ``query.update()``, ``updated`` is set for
+    :class:`~invenio_db.shared.Timestamp` models and, if the model is
+    versioned, a version of every updated row is written with
+    :func:`~invenio_db.versioning.insert_versions`. Rows are updated in
+    chunks of ``chunk_size`` in primary key order, one transaction each.
+
+    .. code-block:: python
+
+        bulk_update(
+            db.session,
+            RecordMetadata,
+            {"json": RecordMetadata.json + {"access": "open"}},
+            RecordMetadata.json["access"].astext == "public",
+        )
+
+    :param values: dictionary of the new values (or SQL expressions) by
+        attribute.
+    :param where: criteria selecting the rows to update.
+    :param commit: commit after each chunk.
+    :returns: the number of updated rows.
+    """
+    pk_columns = list(inspect(model).primary_key)
+    values = dict(values)
+    if issubclass(model, Timestamp) and "updated" not in values:
+        values["updated"] = datetime.now(tz=timezone.utc)
+    versioned = (
+        current_app.config.get("DB_VERSIONING")
+        and hasattr(model, "__versioned__")
+        and is_versioning_enabled(session)
+    )
+    if versioned:
+        manager = current_app.extensions["invenio-db"].versioning_manager
+
+    updated = 0
+    query = sa.select(*pk_columns).where(*where)
+    for page in keyset_pages(session, query, pk_columns, size=chunk_size):
+        keys = [tuple(row) for row in page]
+        if len(pk_columns) == 1:
+            condition = pk_columns[0].in_([key[0] for key in keys])
+        else:
+            condition = sa.tuple_(*pk_columns).in_(keys)
+        session.execute(
+            sa.update(model)
+            .where(condition)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        if versioned:
+            insert_versions(session, manager, model, keys)
+        updated += len(keys)
+        if commit:
+            session.commit()
+    return updated
+
+
+def create_alembic_version_table(connection=None, heads=None):
+    """Create alembic_version table.
+
+    :param connection: connection to use; by default a new transaction is
+        started on the engine.
+    :param heads: the heads to stamp; by default all the heads of the
+        revision map.
+    """
+    if connection is None:
+        db = current_app.extensions["sqlalchemy"]
+        with db.engine.begin() as connection:
+            return create_alembic_version_table(heads=heads, connection=connection)
+
     alembic = current_app.extensions["invenio-db"].alembic
-    db = current_app.extensions["sqlalchemy"]
-    with db.engine.begin() as connection:
-        context = MigrationContext.configure(connection)
-        if not context._has_version_table():
-            context._ensure_version_table()
-            all_heads = alembic.script_directory.revision_map._real_heads
-            context.stamp(alembic.script_directory, tuple(all_heads))
+    context = MigrationContext.configure(connection)
+    if not context._has_version_table():
+        context._ensure_version_table()
+        if heads is None:
+            heads = alembic.script_directory.revision_map._real_heads
+        context.stamp(alembic.script_directory, tuple(heads))
+
+
+def render_alembic_version_table(dialect_name, output_buffer):
+    """Render the SQL creating and stamping the alembic_version table."""
+    alembic = current_app.extensions["invenio-db"].alembic
+    context = MigrationContext.configure(
+        dialect_name=dialect_name,
+        opts={"as_sql": True, "output_buffer": output_buffer},
+    )
+    context._ensure_version_table()
+    all_heads = alembic.script_directory.revision_map._real_heads
+    context.stamp(alembic.script_directory, tuple(all_heads))
+
+
+def table_creation_waves(tables):
+    """Group tables into waves that can be created concurrently.
+
+    Every table only references tables of earlier waves (self references and
+    ``use_alter`` foreign keys are ignored). Tables that are part of a
+    dependency cycle are put in a final wave of their own.
+
+    :param tables: list of :class:`sqlalchemy.Table` sorted by dependency.
+    :returns: list of lists of tables.
+    """
+    keys = {table.key for table in tables}
+    depends = {
+        table.key: {
+            fk.column.table.key
+            for fkc in table.foreign_key_constraints
+            if not fkc.use_alter
+            for fk in fkc.elements
+            if fk.column.table is not table and fk.column.table.key in keys
+        }
+        for table in tables
+    }
+    waves = []
+    created = set()
+    remaining = list(tables)
+    while remaining:
+        wave = [t for t in remaining if depends[t.key] <= created]
+        if not wave:
+            waves.append(remaining)
+            break
+        waves.append(wave)
+        created.update(t.key for t in wave)
+        remaining = [t for t in remaining if t.key not in created]
+    return waves
 
 
 def drop_alembic_version_table():
@@ -141,6 +276,264 @@ def has_table(engine, table):
         return engine.has_table(table)
 
 
+def get_existing_tables(engine, tables):
+    """Return the names of ``tables`` that exist in the database.
+
+    The table names of each schema are reflected once, instead of issuing an
+    existence query per table.
+
+    :param engine: the engine to inspect.
+    :param tables: iterable of :class:`sqlalchemy.Table`.
+    :returns: set of table keys (``schema.name`` or ``name``).
+    """
+    inspector = inspect(engine)
+    existing = set()
+    for schema in {table.schema for table in tables}:
+        for name in inspector.get_table_names(schema=schema):
+            existing.add(name if schema is None else f"{schema}.{name}")
+    return existing
+
+
+def _history_indexes(
+    version_tables, primary_key, end_transaction_column, transaction_table
+):
+    """Yield ``(name, table, columns)`` of the history indexes."""
+    for table in version_tables:
+        columns = [*primary_key, end_transaction_column]
+        yield history_index_name(table, columns), table, columns
+    if transaction_table:
+        columns = ["issued_at"]
+        yield history_index_name(transaction_table, columns), transaction_table, columns
+
+
+def create_history_indexes(
+    *version_tables,
+    primary_key=("id",),
+    end_transaction_column="end_transaction_id",
+    transaction_table="transaction",
+    **kwargs,
+):
+    """Create the indexes used by the versioning history queries.
+
+    Meant to be called from an Alembic migration, e.g.:
+
+    .. code-block:: python
+
+        def upgrade():
+            with op.get_context().autocommit_block():
+                create_history_indexes(
+                    "records_metadata_version", postgresql_concurrently=True
+                )
+
+    :param version_tables: names of the version tables.
+    :param primary_key: primary key columns of the versioned tables.
+    :param transaction_table: name of the transaction table, or ``None`` to
+        skip the index on ``issued_at``.
+    :param kwargs: passed to :func:`alembic.op.create_index`.
+    """
+    for name, table, columns in _history_indexes(
+        version_tables, primary_key, end_transaction_column, transaction_table
+    ):
+        op.create_index(name, table, columns, **kwargs)
+
+
+def drop_history_indexes(
+    *version_tables,
+    primary_key=("id",),
+    end_transaction_column="end_transaction_id",
+    transaction_table="transaction",
+    **kwargs,
+):
+    """Drop the indexes created by :func:`create_history_indexes`."""
+    for name, table, columns in _history_indexes(
+        version_tables, primary_key, end_transaction_column, transaction_table
+    ):
+        op.drop_index(name, table_name=table, **kwargs)
+
+
+def create_timestamp_trigger(table_name, column="updated", server_defaults=True):
+    """Maintain the timestamps of an existing table in the database.
+
+    Creates the trigger of :class:`~invenio_db.shared.ServerTimestamp` and,
+    with ``server_defaults``, sets ``now()`` as server default of the
+    ``created`` and ``updated`` columns.
+    """
+    dialect_name = op.get_context().dialect.name
+    if server_defaults:
+        for name in ("created", column):
+            op.alter_column(table_name, name, server_default=sa.func.now())
+    for statement in timestamp_trigger_ddl(dialect_name, table_name, column):
+        op.execute(statement)
+
+
+def drop_timestamp_trigger(table_name, column="updated", server_defaults=True):
+    """Revert :func:`create_timestamp_trigger`."""
+    dialect_name = op.get_context().dialect.name
+    for statement in drop_timestamp_trigger_ddl(dialect_name, table_name, column):
+        op.execute(statement)
+    if server_defaults:
+        for name in ("created", column):
+            op.alter_column(table_name, name, server_default=None)
+
+
+def create_change_log_table():
+    """Create the change log table of ``DB_VERSIONING_ASYNC`` in a migration."""
+    op.create_table(CHANGE_LOG_TABLE, *change_log_columns())
+
+
+def drop_change_log_table():
+    """Drop the change log table of ``DB_VERSIONING_ASYNC`` in a migration."""
+    op.drop_table(CHANGE_LOG_TABLE)
+
+
+def _check_rewritable(connection, table_name, column_name):
+    """Refuse to rewrite a column whose schema would be lost.
+
+    The new column is a plain nullable column, so the constraints, the
+    indexes and the server default of the column would silently disappear.
+    """
+    inspector = sa.inspect(connection)
+    column = next(
+        c for c in inspector.get_columns(table_name) if c["name"] == column_name
+    )
+    found = []
+    if not column["nullable"]:
+        found.append("NOT NULL")
+    if column.get("default") is not None:
+        found.append("a server default")
+    if column_name in inspector.get_pk_constraint(table_name)["constrained_columns"]:
+        found.append("the primary key")
+    for key, kind in (
+        ("get_indexes", "index"),
+        ("get_unique_constraints", "unique constraint"),
+    ):
+        for item in getattr(inspector, key)(table_name):
+            if column_name in item["column_names"]:
+                found.append(f"{kind} {item['name']}")
+    for foreign_key in inspector.get_foreign_keys(table_name):
+        if column_name in foreign_key["constrained_columns"]:
+            found.append(f"foreign key {foreign_key['name']}")
+    try:
+        checks = inspector.get_check_constraints(table_name)
+    except NotImplementedError:  # pragma: no cover
+        checks = []
+    for check in checks:
+        if column_name in check["sqltext"]:
+            found.append(f"check constraint {check['name']}")
+    if found:
+        raise ValueError(
+            f"Cannot rewrite {table_name}.{column_name} which has "
+            f"{', '.join(found)}; drop them first and recreate them after."
+        )
+
+
+def _rewrite_column(
+    table_name, column_name, primary_key, new_type, convert, batch_size
+):
+    """Replace a column by a column of another type, converting in batches."""
+    connection = op.get_bind()
+    _check_rewritable(connection, table_name, column_name)
+
+    new_name = f"{column_name}_new"
+    op.add_column(table_name, sa.Column(new_name, new_type))
+    pk_columns = [sa.column(name) for name in primary_key]
+    table = sa.table(
+        table_name, *pk_columns, sa.column(column_name), sa.column(new_name)
+    )
+    update = (
+        table.update()
+        .where(*[c == sa.bindparam(f"pk_{c.name}") for c in pk_columns])
+        .values({new_name: sa.bindparam("value", type_=new_type)})
+    )
+    last_key = None
+    while True:
+        query = (
+            sa.select(*pk_columns, table.c[column_name])
+            .where(table.c[column_name].is_not(None))
+            .order_by(*pk_columns)
+            .limit(batch_size)
+        )
+        if last_key is not None:
+            query = query.where(sa.tuple_(*pk_columns) > sa.tuple_(*last_key))
+        rows = connection.execute(query).all()
+        if not rows:
+            break
+        last_key = tuple(rows[-1][: len(pk_columns)])
+        connection.execute(
+            update,
+            [
+                {
+                    **{f"pk_{c.name}": v for c, v in zip(pk_columns, row)},
+                    "value": convert(row[-1]),
+                }
+                for row in rows
+            ],
+        )
+
+    op.drop_column(table_name, column_name)
+    op.alter_column(table_name, new_name, new_column_name=column_name)
+
+
+def compress_column(
+    table_name,
+    column_name,
+    primary_key=("id",),
+    threshold=1024,
+    algorithm="zlib",
+    binary=False,
+    batch_size=1000,
+):
+    """Convert a text or binary column to :class:`~invenio_db.shared.Compressed`.
+
+    Meant to be called from an Alembic migration. The values are copied to
+    a new binary column in batches of ``batch_size`` rows, then the new
+    column replaces the old one (and is nullable). Values of JSON columns
+    are stored as their serialized text.
+
+    Columns which are not nullable or have a server default, an index or a
+    constraint are refused, since the new column would not have them.
+
+    :param primary_key: primary key columns of the table.
+    :param binary: the column holds ``bytes`` instead of text.
+    """
+    compressed = Compressed(threshold=threshold, algorithm=algorithm, binary=binary)
+
+    def convert(value):
+        if isinstance(value, (dict, list)):
+            value = json_dumps(value)
+        return value
+
+    _rewrite_column(
+        table_name, column_name, primary_key, compressed, convert, batch_size
+    )
+
+
+def decompress_column(
+    table_name,
+    column_name,
+    to_type,
+    primary_key=("id",),
+    binary=False,
+    batch_size=1000,
+):
+    """Revert :func:`compress_column`.
+
+    :param to_type: the type of the decompressed column, e.g. ``sa.Text()``.
+        For a JSON type, the decompressed text is parsed into the document.
+    """
+    compressed = Compressed(binary=binary)
+    to_type = sa.types.to_instance(to_type)
+
+    def convert(value):
+        value = compressed.process_result_value(value, None)
+        if isinstance(to_type, sa.JSON) and value is not None:
+            # The JSON type serializes the document itself.
+            value = json_loads(value)
+        return value
+
+    _rewrite_column(table_name, column_name, primary_key, to_type, convert, batch_size)
+
+
 def update_table_columns_column_type(
     table_name, column_name, to_type=None, existing_type=None, existing_nullable=None
 ):
@@ -0,0 +1,830 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Helpers for SQLAlchemy-Continuum versioning.
+
+Lazy version classes
+~~~~~~~~~~~~~~~~~~~~
+
+Building the version classes and mappers of all versioned models takes time
+and memory on startup, although most processes never touch the history. With
+``DB_VERSIONING_LAZY``, they are built on the first versioned flush, the
+first access of ``Model.versions``, or by :func:`ensure_versioned_classes`.
+The version tables are still built on startup unless
+``DB_VERSIONING_PRECOMPUTE_TABLES`` is disabled, in which case
+``invenio db create``/``drop``, the Alembic commands and
+:func:`ensure_version_tables` build them on demand.
+
+Asynchronous versions
+~~~~~~~~~~~~~~~~~~~~~
+
+By default, the version rows are written (and the previous versions closed)
+in the same flush as the change. With ``DB_VERSIONING_ASYNC``, the flush only
+appends a snapshot per changed object to the ``versioning_change_log`` table;
+:func:`materialize_versions`, run periodically with
+``invenio db materialize-versions``, writes them into the version tables.
+Until then, the history (``Model.versions`` and the helpers of this module)
+does not include the queued changes; reads never materialize them, as it
+locks the queued rows. The snapshots are stored as JSON, with dates, UUIDs,
+decimals, bytes and enums encoded as strings. Continuum plugins hooking into
+the creation of version objects are not called for queued changes.
+
+Disabling versioning
+~~~~~~~~~~~~~~~~~~~~
+
+Bulk maintenance jobs (e.g. reindexing or data fixes) do not need history.
+Versioning can be switched off for a single session with
+:func:`versioning_disabled` or for a unit of work with
+``UnitOfWork(versioning=False)``.
+
+Transaction ids
+~~~~~~~~~~~~~~~
+
+Every versioned write draws an id from ``transaction_id_seq``. The validity
+strategy of SQLAlchemy-Continuum finds the previous version of an object as
+the one with the greatest lower transaction id, so the ids must increase over
+time: they are neither allocated ahead in the application nor cached by the
+sequence. Bulk jobs should rather share one transaction between many objects
+with :func:`insert_versions`.
+
+Retention
+~~~~~~~~~
+
+Every update of a ``__versioned__`` model appends a row to its ``*_version``
+table and to the shared ``transaction`` table. Retention policies bound this
+growth. They are configured per versioned table in
+``DB_VERSIONING_RETENTION`` and applied with ``invenio db prune-versions``:
+
+.. code-block:: python
+
+    DB_VERSIONING_RETENTION = {
+        "records_metadata": {
+            "keep_last": 10,
+            "keep_newer_than": timedelta(days=90),
+            "daily_after": timedelta(days=30),
+        },
+    }
+
+A version is kept if any of the rules keeps it, and the latest version of an
+object is always kept. With the default ``validity`` strategy, the
+``end_transaction_id`` of the remaining versions is adjusted so that the
+history stays contiguous.
+
+History
+~~~~~~~
+
+Loading ``obj.versions`` fetches every version of an object. For audit pages
+and point-in-time reads, use :func:`version_history` (keyset pagination,
+newest first) and :func:`version_at` / :func:`versions_at`, which fetch the
+version valid at a transaction or timestamp in a single query:
+
+.. code-block:: python
+
+    page = version_history(db.session, manager, Record, record_id, limit=20)
+    older = version_history(
+        db.session, manager, Record, record_id, before=page[-1].transaction_id
+    )
+    snapshot = versions_at(db.session, manager, Record, ids, timestamp=ts)
+
+The version table's primary key ``(id, transaction_id)`` serves the listing.
+As-of queries additionally benefit from an index on ``(id,
+end_transaction_id)`` and, for timestamps, on ``transaction.issued_at``.
+Setting ``DB_VERSIONING_HISTORY_INDEXES`` adds them to the metadata, so that
+``invenio db create`` creates them; existing databases can add them with
+:func:`invenio_db.utils.create_history_indexes` in a migration.
+"""
+
+import base64
+import enum
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from datetime import time as time_
+from datetime import timedelta, timezone
+from decimal import Decimal
+
+import sqlalchemy as sa
+from flask import current_app
+
+from .pagination import keyset_pages
+from .proxies import extension_attribute
+
+SESSION_VERSIONING_KEY = "invenio_db.versioning"
+"""Key of the versioning switch in ``Session.info``."""
+
+_DELETE = 2
+"""Operation type of the versions recording a deletion."""
+
+
+def is_versioning_enabled(session):
+    """Return whether versioning is enabled for the given session."""
+    return session.info.get(SESSION_VERSIONING_KEY, True)
+
+
+@contextmanager
+def versioning_disabled(session):
+    """Disable versioning for the given session only.
+
+    Writes flushed within the block create neither versions nor a
+    transaction row; other sessions (e.g. concurrent requests) are not
+    affected.
+
+    .. code-block:: python
+
+        with versioning_disabled(db.session):
+            for record in records:
+                record.json = fix(record.json)
+            db.session.commit()
+    """
+    info = session.info
+    previous = info.get(SESSION_VERSIONING_KEY)
+    info[SESSION_VERSIONING_KEY] = False
+    try:
+        yield session
+    finally:
+        if previous is None:
+            info.pop(SESSION_VERSIONING_KEY, None)
+        else:
+            info[SESSION_VERSIONING_KEY] = previous
+
+
+def _ensure(manager, tables_only):
+    if manager is None:
+        if not current_app.config.get("DB_VERSIONING"):
+            return
+        manager = current_app.extensions["invenio-db"].versioning_manager
+    from .continuum import ensure_lazy_versioning
+
+    ensure_lazy_versioning(manager, tables_only=tables_only)
+
+
+def ensure_version_tables(manager=None):
+    """Build the version tables of lazily versioned models.
+
+    :param manager: the versioning manager. Defaults to the manager of the
+        current application, if versioning is enabled.
+    """
+    _ensure(manager, tables_only=True)
+
+
+def ensure_versioned_classes(manager=None):
+    """Build the version classes of lazily versioned models.
+
+    Needed before using e.g. :func:`sqlalchemy_continuum.version_class`
+    directly with ``DB_VERSIONING_LAZY``.
+    """
+    _ensure(manager, tables_only=False)
+
+
+class RetentionPolicy:
+    """Retention policy for the versions of a model.
+
+    :param keep_last: keep the last N versions of each object.
+    :param keep_newer_than: keep all versions newer than this
+        :class:`~datetime.timedelta`.
+    :param daily_after: keep all versions newer than this
+        :class:`~datetime.timedelta` and only the last version per day of
+        older ones.
+    """
+
+    def __init__(self, keep_last=None, keep_newer_than=None, daily_after=None):
+        """Initialize the policy."""
+        self.keep_last = keep_last
+        self.keep_newer_than = keep_newer_than
+        self.daily_after = daily_after
+
+    @classmethod
+    def create(cls, policy):
+        """Create a policy from a configuration value."""
+        if isinstance(policy, cls):
+            return policy
+        return cls(**policy)
+
+    def select(self, versions, now):
+        """Return the indices of the versions to keep.
+
+        :param versions: list of ``(transaction_id, issued_at)`` of the
+            versions of a single object in ascending order.
+        :param now: the current time (UTC).
+        """
+        if not versions:
+            return set()
+        if not (self.keep_last or self.keep_newer_than or self.daily_after):
+            return set(range(len(versions)))
+
+        keep = {len(versions) - 1}
+        if self.keep_last:
+            keep.update(range(max(0, len(versions) - self.keep_last), len(versions)))
+
+        def is_newer(issued_at, delta):
+            return issued_at is not None and _utc(issued_at) >= now - delta
+
+        if self.keep_newer_than:
+            keep.update(
+                i
+                for i, (_, issued_at) in enumerate(versions)
+                if is_newer(issued_at, self.keep_newer_than)
+            )
+        if self.daily_after:
+            last_per_day = {}
+            for i, (_, issued_at) in enumerate(versions):
+                if is_newer(issued_at, self.daily_after):
+                    keep.add(i)
+                else:
+                    day = issued_at and _utc(issued_at).date()
+                    last_per_day[day] = i
+            keep.update(last_per_day.values())
+        return keep
+
+
+def _utc(value):
+    """Return the naive or aware datetime ``value`` as aware UTC datetime."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _pk_filter(columns, keys):
+    """Return a filter matching the (possibly composite) keys."""
+    if len(columns) == 1:
+        return columns[0].in_([key[0] for key in keys])
+    return sa.tuple_(*columns).in_(keys)
+
+
+def prune_versions(
+    session,
+    manager,
+    model,
+    policy,
+    batch_size=1000,
+    sleep=0,
+    dry_run=False,
+    now=None,
+):
+    """Delete the versions of ``model`` not retained by ``policy``.
+
+    Objects are processed in keyset batches of ``batch_size``; each batch is
+    committed separately, followed by a pause of ``sleep`` seconds.
+
+    :returns: the number of deleted versions.
+    """
+    from sqlalchemy_continuum import version_class
+
+    ensure_versioned_classes(manager)
+    policy = RetentionPolicy.create(policy)
+    now = now or datetime.now(timezone.utc)
+    version_table = version_class(model).__table__
+    transaction_table = manager.transaction_cls.__table__
+    tx_column = version_table.c[manager.option(model, "transaction_column_name")]
+    end_tx_name = manager.option(model, "end_transaction_column_name")
+    end_tx_column = version_table.c.get(end_tx_name)
+    pk_columns = [
+        version_table.c[column.key] for column in sa.inspect(model).primary_key
+    ]
+
+    deleted = 0
+    pages = keyset_pages(
+        session, sa.select(*pk_columns).distinct(), pk_columns, size=batch_size
+    )
+    for page in pages:
+        keys = [tuple(row) for row in page]
+        rows = session.execute(
+            sa.select(*pk_columns, tx_column, transaction_table.c.issued_at)
+            .select_from(
+                version_table.outerjoin(
+                    transaction_table, transaction_table.c.id == tx_column
+                )
+            )
+            .where(_pk_filter(pk_columns, keys))
+            .order_by(*pk_columns, tx_column)
+        )
+        versions = {}
+        for row in rows:
+            key = tuple(row[: len(pk_columns)])
+            versions.setdefault(key, []).append(tuple(row[len(pk_columns) :]))
+
+        to_delete = []
+        to_update = []
+        for key, object_versions in versions.items():
+            keep = sorted(policy.select(object_versions, now))
+            to_delete.extend(
+                key + (tx_id,)
+                for i, (tx_id, _) in enumerate(object_versions)
+                if i not in keep
+            )
+            if end_tx_column is not None:
+                # Close the gaps left by deleted versions.
+                for i, j in zip(keep, keep[1:]):
+                    if j != i + 1:
+                        to_update.append(
+                            key + (object_versions[i][0], object_versions[j][0])
+                        )
+
+        deleted += len(to_delete)
+        if not dry_run and to_delete:
+            for start in range(0, len(to_delete), batch_size):
+                chunk = to_delete[start : start + batch_size]
+                session.execute(
+                    version_table.delete().where(
+                        sa.tuple_(*pk_columns, tx_column).in_(chunk)
+                    )
+                )
+            if to_update:
+                params = [
+                    dict(
+                        {f"b_{c.key}": v for c, v in zip(pk_columns, values)},
+                        b_tx=values[-2],
+                        b_end_tx=values[-1],
+                    )
+                    for values in to_update
+                ]
+                session.execute(
+                    version_table.update()
+                    .where(
+                        *[c == sa.bindparam(f"b_{c.key}") for c in pk_columns],
+                        tx_column == sa.bindparam("b_tx"),
+                    )
+                    .values({end_tx_name: sa.bindparam("b_end_tx")}),
+                    params,
+                )
+            session.commit()
+            if sleep:
+                time.sleep(sleep)
+    return deleted
+
+
+def prune_orphan_transactions(
+    session, manager, batch_size=1000, sleep=0, dry_run=False
+):
+    """Delete transactions that no version refers to anymore.
+
+    Transactions with changes still queued by ``DB_VERSIONING_ASYNC`` are
+    kept.
+
+    :returns: the number of deleted transactions.
+    """
+    ensure_versioned_classes(manager)
+    transaction_table = manager.transaction_cls.__table__
+    references = []
+    for model, version_cls in manager.version_class_map.items():
+        version_table = version_cls.__table__
+        for name in ("transaction_column_name", "end_transaction_column_name"):
+            column = version_table.c.get(manager.option(model, name))
+            if column is not None:
+                references.append(sa.exists().where(column == transaction_table.c.id))
+    change_log = extension_attribute("change_log")
+    if change_log is not None:
+        references.append(
+            sa.exists().where(change_log.c.transaction_id == transaction_table.c.id)
+        )
+    condition = sa.and_(*[~reference for reference in references])
+
+    deleted = 0
+    id_column = transaction_table.c.id
+    pages = keyset_pages(session, sa.select(id_column), [id_column], size=batch_size)
+    for page in pages:
+        ids = [row[0] for row in page]
+        orphans = transaction_table.c.id.in_(ids) & condition
+        if dry_run:
+            deleted += session.execute(
+                sa.select(sa.func.count()).where(orphans)
+            ).scalar()
+        else:
+            deleted += session.execute(
+                transaction_table.delete().where(orphans)
+            ).rowcount
+            session.commit()
+            if sleep:
+                time.sleep(sleep)
+    return deleted
+
+
+def insert_versions(session, manager, model, keys, operation_type=1):
+    """Record the current state of many objects as new versions.
+
+    Creates one ``transaction`` row and copies the rows of the objects into
+    the version table with a single ``INSERT ... SELECT``, closing all their
+    open versions first, whatever their transaction id (ids are not
+    guaranteed to follow the commit order). This is the set-based equivalent
+    of what Continuum does per object on flush; Continuum plugins are not
+    called.
+
+    :param keys: the primary keys of the objects (tuples if composite).
+    :param operation_type: the operation recorded (1 is an update).
+    :returns: the id of the created transaction.
+    """
+    from sqlalchemy_continuum import version_class
+    from sqlalchemy_continuum.transaction import utc_now
+    from sqlalchemy_continuum.utils import versioned_column_properties
+
+    ensure_versioned_classes(manager)
+    version_table = version_class(model).__table__
+    transaction_table = manager.transaction_cls.__table__
+    tx_name = manager.option(model, "transaction_column_name")
+    end_tx_name = manager.option(model, "end_transaction_column_name")
+    operation_name = manager.option(model, "operation_type_column_name")
+
+    tx_id = session.execute(
+        transaction_table.insert().values(issued_at=utc_now())
+    ).inserted_primary_key[0]
+
+    mapper = sa.inspect(model)
+    pk_columns = [version_table.c[column.key] for column in mapper.primary_key]
+    keys = [key if isinstance(key, tuple) else (key,) for key in keys]
+    if end_tx_name in version_table.c and (
+        manager.option(model, "strategy") == "validity"
+    ):
+        session.execute(
+            version_table.update()
+            .where(
+                _pk_filter(pk_columns, keys),
+                version_table.c[end_tx_name].is_(None),
+            )
+            .values({end_tx_name: tx_id})
+        )
+
+    columns = [prop.columns[0] for prop in versioned_column_properties(model)]
+    select = sa.select(
+        *columns,
+        sa.literal(tx_id, sa.BigInteger),
+        sa.literal(operation_type, sa.SmallInteger),
+    ).where(_pk_filter(list(mapper.primary_key), keys))
+    session.execute(
+        version_table.insert().from_select(
+            [column.key for column in columns] + [tx_name, operation_name], select
+        )
+    )
+    return tx_id
+
+
+def history_index_name(table_name, columns):
+    """Return the name of a history index."""
+    return "_".join(["ix", table_name, *columns])[:63]
+
+
+def add_history_indexes(manager):
+    """Add the indexes used by the history queries to the metadata.
+
+    Adds an index on ``(id, end_transaction_id)`` to every version table
+    using the ``validity`` strategy and an index on ``transaction.issued_at``.
+    Indexes that already exist in the metadata are skipped.
+
+    :returns: the list of added :class:`sqlalchemy.Index`.
+    """
+    definitions = []
+    for model, table in manager.tables.items():
+        end_tx = table.c.get(manager.option(model, "end_transaction_column_name"))
+        if end_tx is None:
+            continue
+        pk_columns = [table.c[column.key] for column in sa.inspect(model).primary_key]
+        definitions.append((table, pk_columns + [end_tx]))
+    table = getattr(manager.transaction_cls, "__table__", None)
+    if table is not None:
+        definitions.append((table, [table.c.issued_at]))
+
+    added = []
+    for table, columns in definitions:
+        name = history_index_name(table.name, [column.name for column in columns])
+        if any(index.name == name for index in table.indexes):
+            continue
+        added.append(sa.Index(name, *columns))
+    return added
+
+
+class _History:
+    """Columns of a version table used by the history queries."""
+
+    def __init__(self, manager, model):
+        from sqlalchemy_continuum import version_class
+
+        ensure_versioned_classes(manager)
+        self.version_cls = version_class(model)
+        table = self.version_cls.__table__
+        self.table = table
+        self.tx = table.c[manager.option(model, "transaction_column_name")]
+        self.end_tx = table.c.get(manager.option(model, "end_transaction_column_name"))
+        self.operation = table.c[manager.option(model, "operation_type_column_name")]
+        self.pk = [table.c[column.key] for column in sa.inspect(model).primary_key]
+        self.transaction_table = manager.transaction_cls.__table__
+
+    def key(self, value):
+        """Return a primary key value as tuple."""
+        return tuple(value) if isinstance(value, (tuple, list)) else (value,)
+
+    def match(self, keys):
+        """Return a filter matching the versions of the objects ``keys``."""
+        return _pk_filter(self.pk, [self.key(key) for key in keys])
+
+    def valid_at(self, transaction_id=None, timestamp=None):
+        """Return a filter matching the versions valid at a point in time.
+
+        As of a timestamp, the version of each object is the one of the
+        latest transaction issued up to the timestamp, by ``issued_at`` and
+        not by id, as ids are not guaranteed to follow the issue order.
+        """
+        if (transaction_id is None) == (timestamp is None):
+            raise ValueError("Pass either transaction_id or timestamp.")
+        if timestamp is not None:
+            if timestamp.tzinfo is not None:
+                # Continuum stores naive UTC timestamps.
+                timestamp = _utc(timestamp).replace(tzinfo=None)
+            other = self.table.alias()
+            tx = other.c[self.tx.key]
+            transactions = self.transaction_table
+            condition = self.tx == (
+                sa.select(tx)
+                .join(transactions, transactions.c.id == tx)
+                .where(
+                    *[other.c[c.key] == c for c in self.pk],
+                    transactions.c.issued_at <= timestamp,
+                )
+                .order_by(transactions.c.issued_at.desc(), tx.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+        elif self.end_tx is not None:
+            transaction = sa.literal(transaction_id, sa.BigInteger)
+            condition = sa.and_(
+                self.tx <= transaction,
+                sa.or_(self.end_tx.is_(None), self.end_tx > transaction),
+            )
+        else:
+            # Subquery strategy: the latest version up to the transaction.
+            other = self.table.alias()
+            condition = self.tx == (
+                sa.select(sa.func.max(other.c[self.tx.key]))
+                .where(
+                    *[other.c[c.key] == c for c in self.pk],
+                    other.c[self.tx.key] <= transaction_id,
+                )
+                .scalar_subquery()
+            )
+        return sa.and_(condition, self.operation != _DELETE)
+
+
+def version_history(session, manager, model, pk, limit=50, before=None):
+    """Return a page of versions of an object, newest first.
+
+    :param pk: the primary key of the object (a tuple if composite).
+    :param limit: the page size.
+    :param before: the transaction id of the last version of the previous
+        page.
+    :returns: list of version objects.
+    """
+    history = _History(manager, model)
+    query = (
+        sa.select(history.version_cls)
+        .where(history.match([pk]))
+        .order_by(history.tx.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        query = query.where(history.tx < before)
+    return session.execute(query).scalars().all()
+
+
+def version_at(session, manager, model, pk, transaction_id=None, timestamp=None):
+    """Return the version of an object as of a transaction or a timestamp.
+
+    :returns: the version object, or ``None`` if the object did not exist
+        (or was deleted) at that point.
+    """
+    versions = versions_at(
+        session,
+        manager,
+        model,
+        [pk],
+        transaction_id=transaction_id,
+        timestamp=timestamp,
+    )
+    return next(iter(versions.values()), None)
+
+
+def versions_at(session, manager, model, pks, transaction_id=None, timestamp=None):
+    """Return the versions of many objects as of a transaction or a timestamp.
+
+    :param pks: the primary keys of the objects.
+    :returns: dictionary of version objects by primary key; objects that did
+        not exist at that point are missing.
+    """
+    pks = list(pks)
+    if not pks:
+        return {}
+    history = _History(manager, model)
+    query = sa.select(history.version_cls).where(
+        history.match(pks),
+        history.valid_at(transaction_id=transaction_id, timestamp=timestamp),
+    )
+    mapper = sa.inspect(history.version_cls)
+    keys = [mapper.get_property_by_column(column).key for column in history.pk]
+    versions = {}
+    for version in session.execute(query).scalars():
+        key = tuple(getattr(version, name) for name in keys)
+        versions[key if len(key) > 1 else key[0]] = version
+    return versions
+
+
+CHANGE_LOG_TABLE = "versioning_change_log"
+"""Name of the table queueing the changes of ``DB_VERSIONING_ASYNC``."""
+
+
+def change_log_columns():
+    """Return the columns of the change log table."""
+    return [
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            primary_key=True,
+            autoincrement=True,
+        ),
+        sa.Column("version_class", sa.String(255), nullable=False),
+        sa.Column("transaction_id", sa.BigInteger(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+    ]
+
+
+def change_log_table(metadata):
+    """Return the change log table, defining it in ``metadata`` if needed."""
+    if CHANGE_LOG_TABLE in metadata.tables:
+        return metadata.tables[CHANGE_LOG_TABLE]
+    return sa.Table(CHANGE_LOG_TABLE, metadata, *change_log_columns())
+
+
+_DECODERS = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    time_: time_.fromisoformat,
+    timedelta: lambda value: timedelta(seconds=value),
+    uuid.UUID: uuid.UUID,
+    Decimal: Decimal,
+    bytes: base64.b64decode,
+}
+
+
+def dump_snapshot_value(value):
+    """Return a column value of a snapshot as a JSON value."""
+    if isinstance(value, (datetime, date, time_)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+def load_snapshot_value(type_, value):
+    """Return a column value of a snapshot from its JSON value."""
+    try:
+        python_type = type_.python_type
+    except NotImplementedError:
+        return value
+    if value is None or type(value) is python_type:
+        return value
+    if isinstance(python_type, type) and issubclass(python_type, enum.Enum):
+        return python_type[value]
+    decoder = _DECODERS.get(python_type)
+    return value if decoder is None else decoder(value)
+
+
+def _merge_changes(entries, key_names):
+    """Merge the queued changes of the same object and transaction.
+
+    Like Continuum, the last change of a transaction wins.
+    """
+    return {tuple(data[name] for name in key_names): data for data in entries}
+
+
+def _materialize(session, manager, version_cls, entries):
+    """Write queued changes of a version class into its version table."""
+    model = manager.parent_class_map[version_cls]
+    mapper = sa.inspect(version_cls)
+    types = {prop.key: prop.columns[0].type for prop in mapper.column_attrs}
+    entries = [
+        {key: load_snapshot_value(types[key], value) for key, value in data.items()}
+        for data in entries
+    ]
+    tx_name = manager.option(model, "transaction_column_name")
+    end_tx_name = manager.option(model, "end_transaction_column_name")
+    pk_names = [
+        mapper.get_property_by_column(column).key
+        for column in mapper.primary_key
+        if column.key != tx_name
+    ]
+    changes = _merge_changes(entries, pk_names + [tx_name])
+
+    tx_attr = getattr(version_cls, tx_name)
+    pk_attrs = [getattr(version_cls, name) for name in pk_names]
+    end_tx = getattr(version_cls, end_tx_name, None)
+    if end_tx is not None and manager.option(model, "strategy") == "validity":
+        _close_versions(session, changes, pk_names, tx_name, end_tx, pk_attrs)
+
+    existing = {
+        tuple(row)
+        for row in session.execute(
+            sa.select(*pk_attrs, tx_attr).where(
+                sa.tuple_(*pk_attrs, tx_attr).in_(list(changes))
+            )
+        )
+    }
+    inserts = [data for key, data in changes.items() if key not in existing]
+    updates = [data for key, data in changes.items() if key in existing]
+    if inserts:
+        session.execute(sa.insert(version_cls), inserts)
+    if updates:
+        session.execute(sa.update(version_cls), updates)
+
+
+def _close_versions(session, changes, pk_names, tx_name, end_tx, pk_attrs):
+    """Set the end transactions of the versions of the queued changes.
+
+    The changes of an object are queued in commit order, while the
+    transaction ids are not guaranteed to be: each version ends with the
+    next queued change of its object, the last one stays open, and the
+    first one closes the version left open by the previous batches.
+    """
+    objects = {}
+    for data in changes.values():
+        objects.setdefault(tuple(data[name] for name in pk_names), []).append(data)
+    params = []
+    for versions in objects.values():
+        for data, following in zip(versions, versions[1:] + [None]):
+            data[end_tx.key] = None if following is None else following[tx_name]
+        params.append(
+            dict(
+                {f"b_{name}": versions[0][name] for name in pk_names},
+                b_tx=versions[0][tx_name],
+            )
+        )
+
+    end_tx_column = end_tx.property.columns[0]
+    table = end_tx_column.table
+    tx_column = table.c[sa.inspect(end_tx.class_).attrs[tx_name].columns[0].key]
+    pk_columns = [table.c[attr.property.columns[0].key] for attr in pk_attrs]
+    session.execute(
+        table.update()
+        .where(
+            *[
+                column == sa.bindparam(f"b_{name}")
+                for column, name in zip(pk_columns, pk_names)
+            ],
+            tx_column != sa.bindparam("b_tx"),
+            end_tx_column.is_(None),
+        )
+        .values({end_tx_column.key: sa.bindparam("b_tx")}),
+        params,
+    )
+
+
+def materialize_versions(
+    session,
+    manager,
+    models=None,
+    batch_size=1000,
+    sleep=0,
+    skip_locked=False,
+    commit=True,
+):
+    """Write the changes queued by ``DB_VERSIONING_ASYNC`` to version tables.
+
+    Changes are processed in batches of ``batch_size`` in the order they were
+    queued.
+
+    :param models: only materialize the changes of these models.
+    :param skip_locked: skip changes being materialized concurrently
+        (PostgreSQL), instead of waiting for them.
+    :param commit: commit after each batch.
+    :returns: the number of processed changes.
+    """
+    table = extension_attribute("change_log")
+    if table is None:
+        return 0
+    ensure_versioned_classes(manager)
+    version_classes = {cls.__name__: cls for cls in manager.parent_class_map}
+    query = sa.select(table).order_by(table.c.id).limit(batch_size)
+    if models is not None:
+        names = [manager.version_class_map[model].__name__ for model in models]
+        query = query.where(table.c.version_class.in_(names))
+    query = query.with_for_update(skip_locked=skip_locked)
+
+    processed = 0
+    while True:
+        rows = session.execute(query).all()
+        if not rows:
+            break
+        entries = {}
+        for row in rows:
+            entries.setdefault(row.version_class, []).append(row.data)
+        for name, class_entries in entries.items():
+            _materialize(session, manager, version_classes[name], class_entries)
+        session.execute(table.delete().where(table.c.id.in_([row.id for row in rows])))
+        processed += len(rows)
+        if commit:
+            session.commit()
+        if sleep:
+            time.sleep(sleep)
+    return processed
@@ -12,6 +12,23 @@ from flask import Flask
 from invenio_db.utils import alembic_test_context
 
 
+def pytest_addoption(parser):
+    """Add the option running the benchmarks."""
+    parser.addoption(
+        "--benchmarks", action="store_true", default=False, help="Run the benchmarks."
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the benchmarks unless they are requested."""
+    if config.getoption("--benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmark, run with --benchmarks")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip)
+
+
 @pytest.fixture(name="db")
 def fixture_db():
     """Database fixture with session sharing."""
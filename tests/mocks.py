@@ -43,3 +43,21 @@ def _mock_entry_points(name):
         return data
 
     return fn
+
+
+class FakeRedis:
+    """In-memory stand-in of the Redis client commands used by the cache."""
+
+    def __init__(self):
+        """Initialize the fake."""
+        self.data = {}
+        self.expiries = {}
+
+    def mget(self, keys):
+        """Get the values of the keys."""
+        return [self.data.get(key) for key in keys]
+
+    def set(self, name, value, ex=None):
+        """Set the value of a key."""
+        self.data[name] = value
+        self.expiries[name] = ex
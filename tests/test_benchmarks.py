@@ -0,0 +1,259 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Performance benchmarks, only run with ``pytest --benchmarks --no-cov``.
+
+The timings are written to the terminal; the benchmarks only assert that
+the compared variants give the same results. Coverage tracing slows down
+the Python code much more than the C extensions, so disable it.
+"""
+
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+import sqlalchemy as sa
+from utils import requires_postgresql
+
+from invenio_db import InvenioDB
+from invenio_db.projection import Projection
+from invenio_db.shared import (
+    UUID7,
+    compress_payload,
+    decompress_payload,
+    json_dumps,
+    json_loads,
+    uuid7,
+)
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture()
+def report(capsys):
+    """Return a function writing a result line to the terminal."""
+
+    def write(line):
+        with capsys.disabled():
+            print(f"\n{line}")
+
+    return write
+
+
+def test_change_tracking(db, app, report):
+    """Compare the flush overhead of the change tracking options."""
+    tracker = InvenioDB(app, entry_point_group=False, db=db).change_tracker
+
+    class Item(db.Model):
+        __tablename__ = "item"
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    def run(offset, rows=2000):
+        start = time.perf_counter()
+        db.session.add_all([Item(id=offset + i, name="a") for i in range(rows)])
+        db.session.commit()
+        return time.perf_counter() - start
+
+    with app.app_context():
+        db.create_all()
+        try:
+            untracked = run(0)
+
+            received = []
+            callback = tracker.subscribe(Item, received.append)
+            try:
+                subscribed = run(5000)
+            finally:
+                tracker.unsubscribe(Item, callback)
+            assert len(received) == 1
+
+            from flask_sqlalchemy import track_modifications
+
+            app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = True
+            track_modifications._listen(db.session)
+            try:
+                signals = run(10000)
+            finally:
+                for name, listener in (
+                    ("before_flush", track_modifications._record_ops),
+                    ("before_commit", track_modifications._record_ops),
+                    ("before_commit", track_modifications._before_commit),
+                    ("after_commit", track_modifications._after_commit),
+                    ("after_rollback", track_modifications._after_rollback),
+                ):
+                    sa.event.remove(db.session, name, listener)
+                app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+            report(
+                f"change tracking: untracked {untracked:.3f}s, "
+                f"subscribed {subscribed:.3f}s, modification signals {signals:.3f}s"
+            )
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+
+def test_projection(db, app, report, rows=10000):
+    """Compare loading models to projections."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Entry(db.Model, db.Timestamp):
+        __tablename__ = "entry"
+        id = db.Column(db.Integer, primary_key=True)
+        title = db.Column(db.String(50))
+
+    with app.app_context():
+        db.create_all()
+        try:
+            now = datetime.now(tz=timezone.utc)
+            db.session.execute(
+                sa.insert(Entry),
+                [
+                    {"id": i, "title": str(i), "created": now, "updated": now}
+                    for i in range(rows)
+                ],
+            )
+            db.session.commit()
+
+            start = time.perf_counter()
+            models = [
+                (e.id, e.title, e.updated) for e in db.session.scalars(sa.select(Entry))
+            ]
+            orm = time.perf_counter() - start
+            db.session.expunge_all()
+
+            projection = Projection(Entry, "id", "title", "updated")
+            start = time.perf_counter()
+            records = list(projection.iter(db.session))
+            fast = time.perf_counter() - start
+
+            assert records == models
+            report(
+                f"projection of {rows} rows: models {orm:.3f}s, projection {fast:.3f}s"
+            )
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+
+def _document(i=0):
+    """Return a record-like document."""
+    return {
+        "id": f"abcd-{i}",
+        "metadata": {
+            "title": "A title é",
+            "creators": [{"name": f"Doe, John {j}", "orcid": None} for j in range(20)],
+            "subjects": ["physics"] * 50,
+            "size": 2**40,
+            "open": True,
+        },
+    }
+
+
+@pytest.mark.parametrize("library", ["json", "orjson"])
+def test_json_serialization(report, library, count=2000):
+    """Compare the serialization throughput of the JSON libraries."""
+    dumps, loads = (
+        (json.dumps, json.loads) if library == "json" else (json_dumps, json_loads)
+    )
+    documents = [_document(i) for i in range(count)]
+
+    start = time.perf_counter()
+    serialized = [dumps(document) for document in documents]
+    serialize = time.perf_counter() - start
+    start = time.perf_counter()
+    deserialized = [loads(value) for value in serialized]
+    deserialize = time.perf_counter() - start
+
+    assert deserialized == documents
+    report(
+        f"{library}: serialize {count / serialize:.0f} docs/s, "
+        f"deserialize {count / deserialize:.0f} docs/s"
+    )
+
+
+@pytest.mark.parametrize("algorithm", ["zlib", "zstd"])
+def test_compression(report, algorithm, count=2000):
+    """Measure the size and throughput of the compressed JSON documents."""
+    documents = [json_dumps(_document(i)).encode() for i in range(count)]
+    try:
+        compress_payload(b"", threshold=0, algorithm=algorithm)
+    except RuntimeError:
+        pytest.skip(f"{algorithm} is not available")
+
+    start = time.perf_counter()
+    payloads = [
+        compress_payload(data, threshold=0, algorithm=algorithm) for data in documents
+    ]
+    compress = time.perf_counter() - start
+    start = time.perf_counter()
+    decompressed = [decompress_payload(payload) for payload in payloads]
+    decompress = time.perf_counter() - start
+
+    assert decompressed == documents
+    ratio = sum(map(len, payloads)) / sum(map(len, documents))
+    report(
+        f"{algorithm}: size {ratio:.0%}, compress {count / compress:.0f} docs/s, "
+        f"decompress {count / decompress:.0f} docs/s"
+    )
+
+
+def _insert(engine, generator, rows, batch=1000):
+    """Insert rows with generated keys, returning the elapsed time."""
+    table = sa.Table(
+        "item",
+        sa.MetaData(),
+        sa.Column("id", UUID7, primary_key=True),
+        sa.Column("name", sa.String(50)),
+    )
+    table.create(engine)
+    start = time.perf_counter()
+    for _ in range(rows // batch):
+        with engine.begin() as connection:
+            connection.execute(
+                table.insert(), [{"id": generator(), "name": "x"} for _ in range(batch)]
+            )
+    return time.perf_counter() - start
+
+
+def test_uuid7_sqlite(tmp_path, report, rows=20000):
+    """Compare the insert rate and index size of UUID4 and UUID7 keys."""
+    for name, generator in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+        engine = sa.create_engine(f"sqlite:///{tmp_path / name}.db")
+        elapsed = _insert(engine, generator, rows)
+        with engine.connect() as connection:
+            assert (
+                connection.execute(sa.text("SELECT count(*) FROM item")).scalar()
+                == rows
+            )
+            try:
+                size = connection.execute(
+                    sa.text(
+                        "SELECT sum(pgsize) FROM dbstat "
+                        "WHERE name LIKE 'sqlite_autoindex_item%'"
+                    )
+                ).scalar()
+            except sa.exc.OperationalError:  # SQLite without dbstat
+                size = None
+        engine.dispose()
+        report(f"sqlite {name}: {rows / elapsed:.0f} rows/s, index {size} bytes")
+
+
+@requires_postgresql
+def test_uuid7_postgresql(db, app, report, rows=100000):
+    """Compare the insert rate and index size of UUID4 and UUID7 keys."""
+    InvenioDB(app, entry_point_group=False, db=db)
+    with app.app_context():
+        for name, generator in (("uuid4", uuid.uuid4), ("uuid7", uuid7)):
+            elapsed = _insert(db.engine, generator, rows)
+            with db.engine.begin() as connection:
+                size = connection.execute(
+                    sa.text("SELECT pg_relation_size('pk_item')")
+                ).scalar()
+                connection.execute(sa.text("DROP TABLE item"))
+            report(
+                f"postgresql {name}: {rows / elapsed:.0f} rows/s, index {size} bytes"
+            )
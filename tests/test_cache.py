@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the second-level cache."""
+
+import json
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+from mocks import FakeRedis
+
+from invenio_db import InvenioDB
+from invenio_db.cache import LRUBackend, RedisBackend, remove_listeners
+from invenio_db.uow import ModelCommitOp, UnitOfWork
+
+
+def test_lru_backend():
+    """Test the eviction and expiry of the in-process backend."""
+    backend = LRUBackend(maxsize=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    assert backend.get_many(["a"]) == [b"1"]
+    backend.set("c", b"3")
+    assert backend.get_many(["a", "b", "c"]) == [b"1", None, b"3"]
+
+    backend.set("d", b"4", ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get_many(["d"]) == [None]
+
+
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+def test_query_cache(db, app, backend):
+    """Test cached reads and their invalidation on commit."""
+    redis = FakeRedis()
+    app.config["DB_QUERY_CACHE"] = (
+        "memory" if backend == "memory" else RedisBackend(redis)
+    )
+    app.config["DB_QUERY_CACHE_TTL"] = 60
+
+    class Vocabulary(db.Model):
+        __tablename__ = "vocabulary"
+        __cached__ = True
+        id = db.Column(db.String(20), primary_key=True)
+        title = db.Column(db.String(50))
+        uid = db.Column(db.Uuid, default=uuid.uuid4)
+        created = db.Column(db.DateTime, default=datetime.utcnow)
+
+    class Other(db.Model):
+        __tablename__ = "other"
+        id = db.Column(db.Integer, primary_key=True)
+
+    cache = InvenioDB(app, entry_point_group=False, db=db).query_cache
+
+    with app.app_context():
+        db.create_all()
+        try:
+            db.session.add(Vocabulary(id="licenses", title="Licenses"))
+            db.session.commit()
+            db.session.expunge_all()
+
+            query = sa.select(Vocabulary).where(Vocabulary.id == "licenses")
+            assert cache.get(db.session, Vocabulary, "licenses").title == "Licenses"
+            assert [v.title for v in cache.all(db.session, query)] == ["Licenses"]
+            assert (cache.hits, cache.misses) == (0, 2)
+            db.session.expunge_all()
+
+            vocabulary = cache.get(db.session, Vocabulary, "licenses")
+            assert vocabulary in db.session
+            assert vocabulary.title == "Licenses"
+            results = cache.all(db.session, query)
+            assert results == [vocabulary]
+            assert isinstance(vocabulary.uid, uuid.UUID)
+            assert isinstance(vocabulary.created, datetime)
+            assert cache.get(db.session, Vocabulary, "missing") is None
+            assert cache.get(db.session, Vocabulary, "missing") is None
+            assert (cache.hits, cache.misses) == (3, 3)
+
+            # Pending changes bypass the cache.
+            with UnitOfWork(db.session) as uow:
+                vocabulary.title = "Licences"
+                uow.register(ModelCommitOp(vocabulary))
+                db.session.flush()
+                db.session.expunge_all()
+                vocabulary = cache.get(db.session, Vocabulary, "licenses")
+                assert vocabulary.title == "Licences"
+                assert (cache.hits, cache.misses) == (3, 3)
+                uow.commit()
+            db.session.expunge_all()
+
+            assert cache.get(db.session, Vocabulary, "licenses").title == "Licences"
+            assert cache.misses == 4
+
+            # Bulk updates invalidate too.
+            db.session.query(Vocabulary).update({Vocabulary.title: "L"})
+            db.session.commit()
+            assert [v.title for v in cache.all(db.session, query)] == ["L"]
+
+            # Rolled back changes do not.
+            hits = cache.hits
+            db.session.query(Vocabulary).update({Vocabulary.title: "X"})
+            db.session.rollback()
+            assert [v.title for v in cache.all(db.session, query)] == ["L"]
+            assert cache.hits == hits + 1
+
+            with pytest.raises(ValueError):
+                cache.get(db.session, Other, 1)
+            with pytest.raises(ValueError):
+                cache.all(db.session, sa.select(Other))
+
+            # Column queries are cached too.
+            columns = sa.select(Vocabulary.id, Vocabulary.created)
+            rows = cache.all(db.session, columns)
+            assert cache.all(db.session, columns) == rows
+            assert rows[0].id == "licenses"
+            assert isinstance(rows[0].created, datetime)
+
+            if backend == "redis":
+                assert 60 in redis.expiries.values()
+                # Only JSON is stored in the shared backend.
+                for key, value in redis.data.items():
+                    if ":generation:" not in key:
+                        json.loads(value)
+        finally:
+            db.session.rollback()
+            db.drop_all()
+            remove_listeners(db.session)
@@ -0,0 +1,206 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the tracking of committed changes."""
+
+import json
+from queue import Queue
+
+import sqlalchemy as sa
+
+from invenio_db import InvenioDB
+from invenio_db.changes import UOW_STACK_KEY, Change, merge_changes
+from invenio_db.uow import ModelCommitOp, ModelDeleteOp, UnitOfWork
+
+
+def test_merge_changes():
+    """Test merging the successive changes of a model."""
+    changes = merge_changes(
+        [
+            Change(object, (1,), "insert", frozenset({"a"})),
+            Change(object, (1,), "update", frozenset({"b"})),
+            Change(object, (2,), "update", frozenset({"a"})),
+            Change(object, (2,), "delete", frozenset()),
+            Change(object, (3,), "insert", frozenset({"a"})),
+            Change(object, (3,), "delete", frozenset()),
+            Change(object, (4,), "delete", frozenset()),
+            Change(object, (4,), "insert", frozenset({"a"})),
+        ]
+    )
+    assert changes == [
+        Change(object, (1,), "insert", frozenset({"a", "b"})),
+        Change(object, (2,), "delete", frozenset()),
+        Change(object, (4,), "update", frozenset({"a"})),
+    ]
+
+
+def test_change_tracker(db, app):
+    """Test delivering the changes of subscribed models once per commit."""
+
+    class Base(db.Model):
+        __tablename__ = "base"
+        id = db.Column(db.Integer, primary_key=True)
+        type = db.Column(db.String(20))
+        name = db.Column(db.String(50))
+        __mapper_args__ = {"polymorphic_on": type, "polymorphic_identity": "base"}
+
+    class Child(Base):
+        __mapper_args__ = {"polymorphic_identity": "child"}
+
+    class Other(db.Model):
+        __tablename__ = "other"
+        id = db.Column(db.Integer, primary_key=True)
+
+    tracker = InvenioDB(app, entry_point_group=False, db=db).change_tracker
+    assert not app.config["SQLALCHEMY_TRACK_MODIFICATIONS"]
+
+    received = []
+    tracker.subscribe(Base, received.append)
+    children = tracker.subscribe(Child)(lambda changes: received.append(changes))
+
+    with app.app_context():
+        db.create_all()
+        try:
+            with UnitOfWork(db.session) as uow:
+                base, child = Base(id=1, name="a"), Child(id=2, name="a")
+                uow.register(ModelCommitOp(base))
+                uow.register(ModelCommitOp(child))
+                uow.register(ModelCommitOp(Other(id=1)))
+                db.session.flush()
+                child.name = "b"
+                uow.commit()
+
+            assert received == [
+                [
+                    Change(Base, (1,), "insert", frozenset({"id", "name", "type"})),
+                    Change(Child, (2,), "insert", frozenset({"id", "name", "type"})),
+                ],
+                [Change(Child, (2,), "insert", frozenset({"id", "name", "type"}))],
+            ]
+            received.clear()
+
+            # Rolled back savepoints are discarded.
+            base.name = "b"
+            with db.session.begin_nested():
+                db.session.delete(child)
+            with db.session.begin_nested() as savepoint:
+                db.session.add(Base(id=3))
+                db.session.flush()
+                savepoint.rollback()
+            db.session.commit()
+            assert received == [
+                [
+                    Change(Base, (1,), "update", frozenset({"name"})),
+                    Change(Child, (2,), "delete", frozenset()),
+                ],
+                [Change(Child, (2,), "delete", frozenset())],
+            ]
+            received.clear()
+
+            base.name = "c"
+            db.session.flush()
+            db.session.rollback()
+            db.session.commit()
+            assert received == []
+
+            tracker.unsubscribe(Base, received.append)
+            tracker.unsubscribe(Child, children)
+            base.name = "d"
+            db.session.commit()
+            assert received == []
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+
+def test_change_feed(db, app):
+    """Test publishing the change set of a unit of work once."""
+
+    class Record(db.Model):
+        __tablename__ = "record"
+        id = db.Column(db.Integer, primary_key=True)
+        title = db.Column(db.String(50))
+
+    class Other(db.Model):
+        __tablename__ = "other"
+        id = db.Column(db.Integer, primary_key=True)
+
+    feed = InvenioDB(app, entry_point_group=False, db=db).change_feed
+    published = []
+    queue = Queue()
+
+    with app.app_context():
+        db.create_all()
+        try:
+            # Nothing is collected without subscribers.
+            with UnitOfWork(db.session) as uow:
+                uow.register(ModelCommitOp(Record(id=1, title="a")))
+                db.session.flush()
+                assert uow.changes == []
+                uow.commit()
+
+            feed.subscribe(published.append)
+            feed.subscribe_queue(queue, models=[Other])
+
+            with UnitOfWork(db.session) as uow:
+                record = db.session.get(Record, 1)
+                record.title = "b"
+                uow.register(ModelCommitOp(record))
+                uow.register(ModelCommitOp(Record(id=2, title="a")))
+                db.session.flush()
+                uow.register(ModelCommitOp(Other(id=1)))
+                db.session.flush()
+                record.title = "c"
+                uow.commit()
+
+            assert published == [
+                [
+                    Change(Record, (2,), "insert", frozenset({"id", "title"})),
+                    Change(Record, (1,), "update", frozenset({"title"})),
+                    Change(Other, (1,), "insert", frozenset({"id"})),
+                ]
+            ]
+            assert json.loads(queue.get_nowait()) == [
+                {"table": "other", "pk": [1], "operation": "insert", "columns": ["id"]}
+            ]
+            assert queue.empty()
+
+            published.clear()
+            with UnitOfWork(db.session) as uow:
+                uow.register(ModelDeleteOp(db.session.get(Other, 1)))
+                db.session.flush()
+                uow.rollback()
+            assert published == []
+            assert db.session.info[UOW_STACK_KEY] == []
+        finally:
+            feed.unsubscribe(published.append)
+            db.session.rollback()
+            db.drop_all()
+
+
+def test_track_modifications(db, app):
+    """Test that applications can enable the modification signals again."""
+    from flask_sqlalchemy.track_modifications import models_committed
+
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = True
+    InvenioDB(app, entry_point_group=False, db=db)
+    assert app.config["SQLALCHEMY_TRACK_MODIFICATIONS"]
+
+    class Item(db.Model):
+        __tablename__ = "item"
+        id = db.Column(db.Integer, primary_key=True)
+
+    received = []
+
+    def receiver(sender, changes):
+        received.extend((model.id, operation) for model, operation in changes)
+
+    with app.app_context(), models_committed.connected_to(receiver, app):
+        db.create_all()
+        try:
+            db.session.add(Item(id=1))
+            db.session.commit()
+            assert received == [(1, "insert")]
+        finally:
+            db.session.rollback()
+            db.drop_all()
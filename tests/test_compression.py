@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the compressed column type."""
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from invenio_db import InvenioDB
+from invenio_db.shared import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    Compressed,
+    compress_payload,
+    decompress_payload,
+)
+from invenio_db.utils import compress_column, decompress_column
+
+
+def test_payload():
+    """Test the payload format."""
+    data = b"x" * 100
+    assert compress_payload(data, threshold=101) == bytes([COMPRESSION_NONE]) + data
+    assert compress_payload(data, threshold=100)[0] == COMPRESSION_ZLIB
+    assert decompress_payload(compress_payload(data, threshold=1)) == data
+    with pytest.raises(ValueError):
+        decompress_payload(b"\xff")
+    with pytest.raises(ValueError):
+        compress_payload(data, threshold=1, algorithm="lzma")
+
+
+def test_compressed(db, app):
+    """Test storing compressed values."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Page(db.Model):
+        __tablename__ = "page"
+        id = db.Column(db.Integer, primary_key=True)
+        body = db.Column(db.Compressed(threshold=64))
+        data = db.Column(db.Compressed(threshold=64, binary=True))
+
+    assert Compressed(64)._static_cache_key == Compressed(64)._static_cache_key
+
+    with app.app_context():
+        db.create_all()
+        try:
+            large = "é" * 1000
+            db.session.add_all(
+                [
+                    Page(id=1, body="small", data=b"small"),
+                    Page(id=2, body=large, data=large.encode()),
+                    Page(id=3),
+                ]
+            )
+            db.session.commit()
+            db.session.expunge_all()
+
+            raw = dict(db.session.execute(sa.text("SELECT id, body FROM page")).all())
+            assert raw[1] == b"\x00small"
+            assert raw[2][0] == COMPRESSION_ZLIB and len(raw[2]) < 100
+
+            pages = {page.id: page for page in Page.query}
+            assert (pages[1].body, pages[1].data) == ("small", b"small")
+            assert (pages[2].body, pages[2].data) == (large, large.encode())
+            assert (pages[3].body, pages[3].data) == (None, None)
+            assert Page.query.filter(Page.body == large).one().id == 2
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+
+def test_compress_column():
+    """Test converting an existing column in batches."""
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(sa.text("CREATE TABLE page (id INTEGER, body TEXT)"))
+        values = [{"id": i, "body": str(i) * 500} for i in range(1, 6)]
+        values.append({"id": 6, "body": None})
+        connection.execute(sa.text("INSERT INTO page VALUES (:id, :body)"), values)
+
+        with Operations.context(MigrationContext.configure(connection)):
+            compress_column("page", "body", threshold=100, batch_size=2)
+            columns = sa.inspect(connection).get_columns("page")
+            assert [c["name"] for c in columns] == ["id", "body"]
+            raw = connection.execute(sa.text("SELECT body FROM page ORDER BY id"))
+            payloads = raw.scalars().all()
+            assert payloads[-1] is None
+            assert [decompress_payload(p).decode() for p in payloads[:-1]] == [
+                value["body"] for value in values[:-1]
+            ]
+
+            decompress_column("page", "body", sa.Text(), batch_size=4)
+            result = connection.execute(sa.text("SELECT id, body FROM page"))
+            assert [dict(row._mapping) for row in result] == values
+
+
+def test_compress_column_schema():
+    """Test refusing columns with a schema and decompressing JSON."""
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(
+            sa.text(
+                "CREATE TABLE doc (id INTEGER PRIMARY KEY, data TEXT, "
+                "title TEXT NOT NULL, lang TEXT DEFAULT 'en', ref TEXT)"
+            )
+        )
+        connection.execute(sa.text("CREATE INDEX ix_doc_ref ON doc (ref)"))
+        connection.execute(
+            sa.text("INSERT INTO doc VALUES (1, :data, 'a', 'en', 'r')"),
+            {"data": '{"a": [1, 2]}'},
+        )
+
+        with Operations.context(MigrationContext.configure(connection)):
+            for column, message in (
+                ("title", "NOT NULL"),
+                ("lang", "server default"),
+                ("ref", "index ix_doc_ref"),
+            ):
+                with pytest.raises(ValueError, match=message):
+                    compress_column("doc", column)
+            columns = sa.inspect(connection).get_columns("doc")
+            assert [c["name"] for c in columns] == [
+                "id",
+                "data",
+                "title",
+                "lang",
+                "ref",
+            ]
+
+            compress_column("doc", "data", threshold=1)
+            decompress_column("doc", "data", sa.JSON())
+            data = connection.execute(sa.text("SELECT data FROM doc")).scalar()
+            assert data == '{"a": [1, 2]}'
@@ -7,13 +7,15 @@
 """Test database integration layer."""
 
 import importlib.metadata
-from unittest.mock import patch
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
 
 import pytest
 import sqlalchemy as sa
 from flask import Flask
 from mocks import _mock_entry_points
-from sqlalchemy import inspect
+from sqlalchemy import event, inspect
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy_continuum import VersioningManager, remove_versioning
 from sqlalchemy_utils.functions import create_database, drop_database
@@ -408,3 +410,102 @@ def test_db_create_alembic_upgrade(app, db):
             drop_database(str(db.engine.url.render_as_string(hide_password=False)))
             remove_versioning(manager=ext.versioning_manager)
             create_database(str(db.engine.url.render_as_string(hide_password=False)))
+
+
+def test_create_options(db, app):
+    """Test the DDL script output and parallel table creation."""
+
+    class Parent(db.Model):
+        __tablename__ = "parent"
+        pk = sa.Column(sa.Integer, primary_key=True)
+
+    class Child(db.Model):
+        __tablename__ = "child"
+        pk = sa.Column(sa.Integer, primary_key=True)
+        fk = sa.Column(sa.Integer, sa.ForeignKey(Parent.pk))
+
+    app.config["DB_VERSIONING"] = False
+    InvenioDB(app, entry_point_group=False, db=db)
+    runner = app.test_cli_runner()
+
+    with app.app_context():
+        db.drop_all()
+        drop_alembic_version_table()
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            result = runner.invoke(db_cmd, ["create", "--sql"])
+        assert result.exit_code == 0
+        assert not [w for w in caught if "get_text_stream" in str(w.message)]
+        assert result.output.index("CREATE TABLE parent") < result.output.index(
+            "CREATE TABLE child"
+        )
+        assert "alembic_version" in result.output
+        assert len(inspect(db.engine).get_table_names()) == 0
+
+        if db.engine.name != "postgresql":
+            result = runner.invoke(db_cmd, ["create", "--transactional"])
+            assert result.exit_code == 2
+
+        args = ["create", "-v", "--workers", "4"]
+        if db.engine.name == "postgresql":
+            args.append("--transactional")
+        statements = []
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        result = runner.invoke(db_cmd, args)
+        event.remove(db.engine, "before_cursor_execute", record)
+        assert result.exit_code == 0
+        # The missing tables are found with one query, not one per table.
+        assert not [s for s in statements if "child" in s and "CREATE" not in s]
+        assert {"parent", "child", "alembic_version"} <= set(
+            inspect(db.engine).get_table_names()
+        )
+
+        result = runner.invoke(db_cmd, ["drop", "--yes-i-know"])
+        assert result.exit_code == 0
+
+
+def test_create_tables_in_waves(tmp_path):
+    """Test creating tables in parallel and retrying the failed ones."""
+    from invenio_db.cli import _create_tables_in_waves
+
+    metadata = sa.MetaData()
+    parent = sa.Table("parent", metadata, sa.Column("pk", sa.Integer, primary_key=True))
+    children = [
+        sa.Table(
+            name,
+            metadata,
+            sa.Column("pk", sa.Integer, primary_key=True),
+            sa.Column("fk", sa.Integer, sa.ForeignKey(parent.c.pk)),
+        )
+        for name in ("child_a", "child_b", "child_c")
+    ]
+    attempts = []
+    create = children[0].create
+
+    def flaky_create(bind, checkfirst=False):
+        attempts.append(checkfirst)
+        if len(attempts) == 1:
+            raise sa.exc.OperationalError("CREATE TABLE", {}, Exception("deadlock"))
+        create(bind=bind, checkfirst=checkfirst)
+
+    children[0].create = flaky_create
+    bar = Mock()
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'waves.db'}")
+    with patch("invenio_db.cli.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as pool:
+        _create_tables_in_waves(engine, metadata.sorted_tables, 3, bar, False)
+    pool.assert_called_once_with(max_workers=3)
+    # Created without checking first, retried once checking first.
+    assert attempts == [False, True]
+    assert bar.update.call_count == 4
+    assert set(inspect(engine).get_table_names()) == {
+        "parent",
+        "child_a",
+        "child_b",
+        "child_c",
+    }
+    engine.dispose()
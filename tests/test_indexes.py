@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the index advisor."""
+
+import sqlalchemy as sa
+from utils import requires_postgresql
+
+from invenio_db import InvenioDB
+from invenio_db.cli import db as db_cmd
+from invenio_db.indexes import (
+    REDUNDANT_INDEX,
+    UNINDEXED_FOREIGN_KEY,
+    UNINDEXED_SORT_COLUMN,
+    _index_name,
+    advise_indexes,
+    unused_indexes,
+)
+
+
+def test_advise_indexes(db, app):
+    """Test the static analysis of the metadata."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Owner(db.Model):
+        __tablename__ = "owner"
+        __table_args__ = (db.Index("ix_owner_name", "name"),)
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50), unique=True)
+
+    class Record(db.Model, db.Timestamp):
+        __tablename__ = "record"
+        __table_args__ = (
+            db.Index("ix_record_owner_id_title", "owner_id", "title"),
+            db.Index("ix_record_title", "title"),
+            db.Index("ix_record_title_lower", db.func.lower("title")),
+        )
+        id = db.Column(db.Integer, primary_key=True, index=True)
+        owner_id = db.Column(db.Integer, db.ForeignKey(Owner.id), index=True)
+        parent_id = db.Column(db.Integer, db.ForeignKey("record.id"))
+        title = db.Column(db.String(50))
+
+    class Link(db.Model):
+        __tablename__ = "link"
+        __table_args__ = (
+            db.ForeignKeyConstraint(
+                ["tag_record_id", "tag_name"], ["tag.record_id", "tag.name"]
+            ),
+            db.Index("ix_link_tag_record_id", "tag_record_id"),
+        )
+        id = db.Column(db.Integer, primary_key=True)
+        tag_record_id = db.Column(db.Integer)
+        tag_name = db.Column(db.String(50))
+
+    class Tag(db.Model, db.Timestamp):
+        __tablename__ = "tag"
+        __table_args__ = (db.Index("ix_tag_updated", "updated"),)
+        record_id = db.Column(db.Integer, db.ForeignKey(Record.id), primary_key=True)
+        name = db.Column(db.String(50), primary_key=True)
+
+    advices = {
+        (advice.kind, advice.table, advice.columns)
+        for advice in advise_indexes(db.metadata)
+    }
+    assert advices == {
+        (UNINDEXED_FOREIGN_KEY, "record", ("parent_id",)),
+        (UNINDEXED_FOREIGN_KEY, "link", ("tag_record_id", "tag_name")),
+        (REDUNDANT_INDEX, "owner", ("name",)),
+        (REDUNDANT_INDEX, "record", ("id",)),
+        (REDUNDANT_INDEX, "record", ("owner_id",)),
+        (UNINDEXED_SORT_COLUMN, "record", ("updated",)),
+    }
+
+    runner = app.test_cli_runner()
+    with app.app_context():
+        result = runner.invoke(db_cmd, ["advise-indexes", "--sql"])
+        assert result.exit_code == 0
+        assert (
+            "CREATE INDEX ix_record_parent_id ON record (parent_id);" in result.output
+        )
+        assert "DROP INDEX ix_record_owner_id;" in result.output
+        # The name does not collide with the index on the first column.
+        assert (
+            "CREATE INDEX ix_link_tag_record_id_tag_name "
+            "ON link (tag_record_id, tag_name);" in result.output
+        )
+
+        result = runner.invoke(db_cmd, ["advise-indexes", "-s", "created"])
+        assert result.exit_code == 0
+        assert "record: Sort column created has no index." in result.output
+        assert "tag: Sort column created has no index." in result.output
+        assert "7 index advices." in result.output
+
+        result = runner.invoke(db_cmd, ["advise-indexes", "--usage"])
+        assert result.exit_code == 2
+
+
+@requires_postgresql
+def test_unused_indexes(db, app):
+    """Test reporting the indexes never scanned."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Document(db.Model):
+        __tablename__ = "document"
+        id = db.Column(db.Integer, primary_key=True)
+        title = db.Column(db.String(50), index=True)
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.connect() as connection:
+            advices = unused_indexes(connection, db.metadata)
+        assert [advice.message for advice in advices] == [
+            "Index ix_document_title has never been scanned."
+        ]
+        db.drop_all()
+
+
+def test_index_name():
+    """Test that long index names stay distinct within the length limit."""
+    table = sa.Table("t" * 40, sa.MetaData())
+    first = _index_name(table, ("a" * 20, "b"))
+    second = _index_name(table, ("a" * 20, "c"))
+    assert len(first) == len(second) == 63
+    assert first != second
+    assert _index_name(sa.Table("t", sa.MetaData()), ("a", "b")) == "ix_t_a_b"
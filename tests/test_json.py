@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the JSON serialization and column type."""
+
+import json
+import math
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+from invenio_db import InvenioDB
+from invenio_db.shared import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    CompactJSON,
+    json_dumps,
+    json_loads,
+)
+
+
+def _document(i=0):
+    """Return a record-like document."""
+    return {
+        "id": f"abcd-{i}",
+        "metadata": {
+            "title": "A title é",
+            "creators": [{"name": f"Doe, John {j}", "orcid": None} for j in range(20)],
+            "subjects": ["physics"] * 50,
+            "size": 2**40,
+            "open": True,
+        },
+    }
+
+
+def test_json_serializer():
+    """Test the fast serializer and its fallback."""
+    document = _document()
+    assert json_loads(json_dumps(document)) == document
+    assert json_loads(json_dumps(document).encode()) == document
+    assert json_dumps(2**70) == "1180591620717411303424"
+    assert json_loads(json_dumps({1: "a"})) == {"1": "a"}
+
+    # Non-finite floats are serialized like the standard library does.
+    special = {"a": [float("nan"), float("inf"), -float("inf"), None]}
+    assert json_dumps(special) == json.dumps(special)
+    assert json_dumps({"a": None}) == '{"a":null}'
+    loaded = json_loads(json_dumps(special))
+    assert math.isnan(loaded["a"][0])
+    assert loaded["a"][1:] == [float("inf"), -float("inf"), None]
+    with pytest.raises(json.JSONDecodeError):
+        json_loads("{")
+
+
+def test_compact_json(db, app):
+    """Test storing compressed documents."""
+    InvenioDB(app, entry_point_group=False, db=db)
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["json_serializer"] is json_dumps
+
+    class Document(db.Model):
+        __tablename__ = "document"
+        id = db.Column(db.Integer, primary_key=True)
+        plain = db.Column(db.CompactJSON())
+        compressed = db.Column(db.CompactJSON(compress_threshold=100))
+
+    column = Document.__table__.c.compressed
+    assert isinstance(
+        column.type.dialect_impl(postgresql.dialect()).impl, postgresql.JSONB
+    )
+    assert isinstance(column.type.dialect_impl(sqlite.dialect()).impl, sa.LargeBinary)
+
+    with app.app_context():
+        db.create_all()
+        try:
+            small, large = {"a": 1}, _document()
+            db.session.add_all(
+                [
+                    Document(id=1, plain=small, compressed=small),
+                    Document(id=2, plain=large, compressed=large),
+                    Document(id=3),
+                ]
+            )
+            db.session.commit()
+            db.session.expunge_all()
+
+            raw = dict(
+                db.session.execute(sa.text("SELECT id, compressed FROM document")).all()
+            )
+            assert raw[1][0] == COMPRESSION_NONE
+            assert raw[2][0] == COMPRESSION_ZLIB
+            assert len(raw[2]) < len(json.dumps(large)) / 4
+            assert raw[3] is None
+
+            documents = {d.id: d for d in Document.query}
+            assert documents[1].compressed == documents[1].plain == small
+            assert documents[2].compressed == documents[2].plain == large
+            assert documents[3].compressed is None
+        finally:
+            db.session.rollback()
+            db.drop_all()
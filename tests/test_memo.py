@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the memoization of primary key lookups."""
+
+import sqlalchemy as sa
+
+from invenio_db import InvenioDB
+from invenio_db.proxies import current_lookups
+
+
+def test_lookup_memo(db, app):
+    """Test deduplicated and batched lookups."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Owner(db.Model):
+        __tablename__ = "owner"
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    with app.app_context():
+        db.create_all()
+        try:
+            db.session.add_all([Owner(id=i, name=str(i)) for i in range(1, 6)])
+            db.session.commit()
+            db.session.expunge_all()
+
+            statements = []
+            sa.event.listen(
+                db.engine,
+                "before_cursor_execute",
+                lambda *args: statements.append(args[2]),
+            )
+
+            memo = current_lookups._get_current_object()
+            owners = [current_lookups.defer(Owner, pk) for pk in (1, 2, 2, 9)]
+            assert statements == []
+            assert [o.get() and o.get().name for o in owners] == ["1", "2", "2", None]
+            assert len(statements) == 1
+
+            # Memoized models survive expunges and commits.
+            db.session.expunge_all()
+            db.session.commit()
+            assert [o.name for o in memo.get_many(Owner, [1, 2, 3])] == list("123")
+            assert memo.stats == {"hits": 3, "misses": 4, "queries": 2}
+
+            # Models expired by a commit are reloaded together, and the rows
+            # deleted meanwhile are not returned.
+            db.session.commit()
+            db.session.execute(sa.text("DELETE FROM owner WHERE id = 3"))
+            db.session.commit()
+            del statements[:]
+            owners = memo.get_many(Owner, [1, 2, 3])
+            assert [o and o.name for o in owners] == ["1", "2", None]
+            assert len(statements) == 1
+
+            owner = memo.get(Owner, 1)
+            assert owner in db.session
+            db.session.delete(owner)
+            db.session.commit()
+            assert memo.get(Owner, 1) is None
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+    with app.app_context():
+        assert current_lookups._get_current_object() is not memo
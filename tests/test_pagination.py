@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the iteration over large tables."""
+
+import pytest
+import sqlalchemy as sa
+
+from invenio_db import InvenioDB
+from invenio_db.pagination import (
+    keyset_iter,
+    keyset_pages,
+    parallel_ranges,
+    split_range,
+    stream,
+)
+
+
+@pytest.fixture()
+def rows(db, app):
+    """Create a table with some rows."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Row(db.Model):
+        __tablename__ = "row"
+        id = db.Column(db.Integer, primary_key=True)
+        group = db.Column(db.Integer)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Row(id=i, group=i % 3) for i in range(1, 11)])
+        db.session.commit()
+        try:
+            yield Row
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+
+def test_keyset_pages(db, rows):
+    """Test keyset pagination of model and column queries."""
+    Row = rows
+    query = sa.select(Row).where(Row.id > 1)
+    pages = [
+        [row.id for row in page]
+        for page in keyset_pages(db.session, query, [Row.id], size=4)
+    ]
+    assert pages == [[2, 3, 4, 5], [6, 7, 8, 9], [10]]
+
+    # Composite keys with mixed directions.
+    query = sa.select(Row.group, Row.id)
+    keys = [Row.group.desc(), Row.id]
+    rows = [tuple(row) for row in keyset_iter(db.session, query, keys, size=3)]
+    assert rows == sorted(
+        [(i % 3, i) for i in range(1, 11)], key=lambda row: (-row[0], row[1])
+    )
+
+    # Composite keys in the same direction, resuming after given values.
+    keys = [Row.group, Row.id]
+    rows = list(keyset_iter(db.session, query, keys, size=2, after=(1, 4)))
+    assert [tuple(row) for row in rows] == [(1, 7), (1, 10), (2, 2), (2, 5), (2, 8)]
+
+    with pytest.raises(ValueError):
+        list(keyset_pages(db.session, sa.select(Row.group), [Row.id]))
+
+
+def test_stream(db, rows):
+    """Test streaming the rows of a query."""
+    Row = rows
+    query = sa.select(Row).order_by(Row.id)
+    assert [row.id for row in stream(db.session, query, yield_per=3)] == list(
+        range(1, 11)
+    )
+    query = sa.select(Row.id).where(Row.group == 0).order_by(Row.id)
+    assert [row.id for row in stream(db.session, query)] == [3, 6, 9]
+
+
+def test_parallel_ranges(db, rows):
+    """Test processing ranges of rows in threads with their own sessions."""
+    Row = rows
+    assert split_range(db.session, Row.id, 3) == [(1, 5), (5, 9), (9, 11)]
+    assert split_range(db.session, Row.id, 3, Row.id > 10) == []
+
+    sessions = set()
+
+    def worker(low, high):
+        sessions.add(id(db.session()))
+        query = sa.select(Row).where(Row.id >= low, Row.id < high)
+        return [row.id for row in keyset_iter(db.session, query, [Row.id], size=2)]
+
+    results = parallel_ranges(Row.id, worker, Row.group > 0, parts=3)
+    assert results == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+    assert id(db.session()) not in sessions
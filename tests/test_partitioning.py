@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the table partitioning helpers."""
+
+from datetime import date, datetime, timezone
+
+import pytest
+import sqlalchemy as sa
+from utils import requires_postgresql
+
+from invenio_db import InvenioDB
+from invenio_db.cli import db as db_cmd
+from invenio_db.partitioning import (
+    PARTITIONING_KEY,
+    Partition,
+    _create_initial_partitions,
+    add_periods,
+    create_default_partition_ddl,
+    create_hash_partitions_ddl,
+    create_range_partition_ddl,
+    list_partitions,
+    maintain_partitions,
+    parse_partition_name,
+    partition_by,
+    partitioned_tables,
+    period_start,
+    range_partition,
+)
+
+
+def test_periods():
+    """Test the period computations and partition names."""
+    day = datetime(2026, 11, 30, 23, 59, tzinfo=timezone.utc)
+    assert period_start(day, "day") == date(2026, 11, 30)
+    assert period_start(day, "month") == date(2026, 11, 1)
+    assert period_start(day, "year") == date(2026, 1, 1)
+    assert add_periods(date(2026, 11, 1), "month", 2) == date(2027, 1, 1)
+    assert add_periods(date(2026, 1, 1), "month", -1) == date(2025, 12, 1)
+    assert add_periods(date(2026, 12, 31), "day", 1) == date(2027, 1, 1)
+    assert add_periods(date(2026, 1, 1), "year", -2) == date(2024, 1, 1)
+
+    partition = range_partition("event", date(2026, 12, 1), "month")
+    assert partition == Partition("event_p202612", date(2026, 12, 1), date(2027, 1, 1))
+    assert parse_partition_name("event", "event_p202612", "month") == partition
+    assert parse_partition_name("event", "event_default", "month") is None
+    assert parse_partition_name("event", "other_p202612", "month") is None
+    assert create_range_partition_ddl("event", partition) == (
+        'CREATE TABLE IF NOT EXISTS "event_p202612" PARTITION OF "event" '
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+    assert create_hash_partitions_ddl("event", 2)[1] == (
+        'CREATE TABLE IF NOT EXISTS "event_h1" PARTITION OF "event" '
+        "FOR VALUES WITH (MODULUS 2, REMAINDER 1)"
+    )
+    assert create_default_partition_ddl("event") == (
+        'CREATE TABLE IF NOT EXISTS "event_default" PARTITION OF "event" DEFAULT'
+    )
+
+
+def test_partition_by(db, app):
+    """Test declaring a partitioned model."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Event(db.Model):
+        __tablename__ = "event"
+        __table_args__ = partition_by("range", "created", interval="month")
+        id = db.Column(db.Integer, primary_key=True)
+        created = db.Column(db.UTCDateTime, primary_key=True)
+
+    table = Event.__table__
+    assert table.dialect_options["postgresql"]["partition_by"] == "RANGE (created)"
+    assert table.info[PARTITIONING_KEY]["interval"] == "month"
+    assert partitioned_tables(db.metadata) == [table]
+    # The partitions are created by a listener of the table only.
+    assert sa.event.contains(table, "after_create", _create_initial_partitions)
+    assert not sa.event.contains(sa.Table, "after_create", _create_initial_partitions)
+    with pytest.raises(ValueError):
+        partition_by("range", "created", interval="week")
+
+    # Other databases create the table unpartitioned.
+    with app.app_context():
+        db.create_all()
+        db.session.add(Event(id=1, created=datetime.now(tz=timezone.utc)))
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(db_cmd, ["maintain-partitions"])
+        assert result.exit_code == 2
+        assert "requires PostgreSQL" in result.output
+        db.drop_all()
+
+
+@requires_postgresql
+def test_maintain_partitions(db, app):
+    """Test creating and dropping range partitions."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Event(db.Model):
+        __tablename__ = "event"
+        __table_args__ = partition_by(
+            "range", "created", interval="month", ahead=1, retention=2
+        )
+        id = db.Column(db.Integer, primary_key=True)
+        created = db.Column(db.UTCDateTime, primary_key=True)
+
+    class Shard(db.Model):
+        __tablename__ = "shard"
+        __table_args__ = partition_by("hash", "id", modulus=4)
+        id = db.Column(db.Integer, primary_key=True)
+
+    class Tagged(db.Model):
+        __tablename__ = "tagged"
+        __table_args__ = partition_by("list", "tag")
+        id = db.Column(db.Integer, primary_key=True)
+        tag = db.Column(db.String(10), primary_key=True)
+
+    with app.app_context():
+        db.create_all()
+        current = period_start(datetime.now(tz=timezone.utc), "month")
+        with db.engine.begin() as connection:
+            assert list_partitions(connection, "event") == [
+                range_partition("event", current, "month").name,
+                range_partition(
+                    "event", add_periods(current, "month", 1), "month"
+                ).name,
+            ]
+            assert len(list_partitions(connection, "shard")) == 4
+            assert list_partitions(connection, "tagged") == ["tagged_default"]
+
+        db.session.add(Tagged(id=1, tag="a"))
+        db.session.add(Event(id=1, created=datetime.now(tz=timezone.utc)))
+        db.session.commit()
+
+        # Four months later, the partitions up to the next month are created
+        # and the two first ones have expired.
+        later = add_periods(current, "month", 4)
+        with db.engine.begin() as connection:
+            created, removed = maintain_partitions(
+                connection, Event.__table__, now=later
+            )
+            assert [p.start for p in created] == [
+                add_periods(current, "month", i) for i in (2, 3, 4, 5)
+            ]
+            assert [p.start for p in removed] == [
+                current,
+                add_periods(current, "month", 1),
+            ]
+            assert len(list_partitions(connection, "event")) == 4
+        assert db.session.query(Event).count() == 0
+
+        result = app.test_cli_runner().invoke(
+            db_cmd, ["maintain-partitions", "--dry-run"]
+        )
+        assert result.exit_code == 0
+        assert "Would" not in result.output
+        db.drop_all()
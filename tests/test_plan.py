@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test migration plans and lock analysis."""
+
+import pytest
+from utils import requires_postgresql
+
+from invenio_db import InvenioDB
+from invenio_db.cli import db as db_cmd
+from invenio_db.plan import analyze_statement
+
+
+@pytest.mark.parametrize(
+    "sql,lock,table,rewrite",
+    [
+        ("CREATE INDEX ix_foo_bar ON foo (bar)", "SHARE", "foo", False),
+        (
+            "CREATE UNIQUE INDEX CONCURRENTLY ix_foo_bar ON foo (bar)",
+            "SHARE UPDATE EXCLUSIVE",
+            "foo",
+            False,
+        ),
+        (
+            "ALTER TABLE foo ALTER COLUMN bar TYPE TEXT",
+            "ACCESS EXCLUSIVE",
+            "foo",
+            True,
+        ),
+        ("ALTER TABLE foo ADD COLUMN bar INTEGER", "ACCESS EXCLUSIVE", "foo", False),
+        (
+            "ALTER TABLE foo ADD COLUMN bar UUID DEFAULT gen_random_uuid()",
+            "ACCESS EXCLUSIVE",
+            "foo",
+            True,
+        ),
+        (
+            "ALTER TABLE foo ADD CONSTRAINT fk_foo_bar FOREIGN KEY(bar) "
+            "REFERENCES bar (id)",
+            "SHARE ROW EXCLUSIVE",
+            "foo",
+            False,
+        ),
+        (
+            "ALTER TABLE foo VALIDATE CONSTRAINT fk_foo_bar",
+            "SHARE UPDATE EXCLUSIVE",
+            "foo",
+            False,
+        ),
+        ("ALTER TYPE status ADD VALUE 'new'", "ACCESS EXCLUSIVE", "status", False),
+        ("DROP TABLE foo", "ACCESS EXCLUSIVE", "foo", False),
+        ("UPDATE foo SET bar=1", "ROW EXCLUSIVE", "foo", False),
+        (
+            "LOCK TABLE foo IN SHARE ROW EXCLUSIVE MODE",
+            "SHARE ROW EXCLUSIVE",
+            "foo",
+            False,
+        ),
+        ("CREATE SEQUENCE foo_id_seq", None, None, False),
+        ("COMMIT", None, None, False),
+    ],
+)
+def test_analyze_statement(sql, lock, table, rewrite):
+    """Test the lock analysis of single statements."""
+    assert analyze_statement(sql) == (lock, table, rewrite)
+
+
+def test_plan(db, app):
+    """Test rendering the pending migrations without executing them."""
+    ext = InvenioDB(app, entry_point_group=False, db=db)
+
+    with app.app_context():
+        statements = ext.alembic.plan("96e796392533")
+        assert not ext.alembic.migration_context._has_version_table()
+
+        assert statements[0].sql.startswith("CREATE TABLE alembic_version")
+        assert statements[-1].revision == "96e796392533"
+        assert statements[-1].lock == "ROW EXCLUSIVE"
+        assert statements[-1].table == "alembic_version"
+
+        runner = app.test_cli_runner()
+        result = runner.invoke(db_cmd, ["upgrade-plan", "96e796392533"])
+        assert result.exit_code == 0
+        assert "-- lock: ROW EXCLUSIVE on alembic_version" in result.output
+
+
+@requires_postgresql
+def test_plan_postgresql(db, app):
+    """Test the plan of the invenio-db migrations on PostgreSQL."""
+    ext = InvenioDB(app, entry_point_group=False, db=db)
+
+    with app.app_context():
+        ext.alembic.upgrade("96e796392533")
+        statements = ext.alembic.plan("dbdbc1b19cf2")
+        assert {s.revision for s in statements} == {"dbdbc1b19cf2"}
+        assert any(
+            s.lock == "ACCESS EXCLUSIVE" and s.table == "transaction"
+            for s in statements
+        )
+        ext.alembic.downgrade(target="base")
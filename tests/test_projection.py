@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the column projections."""
+
+from datetime import datetime, timezone
+
+import pytest
+import sqlalchemy as sa
+
+from invenio_db import InvenioDB
+from invenio_db.projection import Projection
+
+
+@pytest.fixture()
+def entries(db, app):
+    """Create a timestamped model with some rows."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Entry(db.Model, db.Timestamp):
+        __tablename__ = "entry"
+        id = db.Column(db.Integer, primary_key=True)
+        title = db.Column("name", db.String(50))
+
+    with app.app_context():
+        db.create_all()
+        try:
+            yield Entry
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+
+def test_projection(db, entries):
+    """Test selecting columns as tuples, dicts and records."""
+    Entry = entries
+    created = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db.session.add_all(
+        [Entry(id=i, title=str(i), created=created, updated=created) for i in (1, 2)]
+    )
+    db.session.commit()
+
+    records = Projection(Entry, Entry.id, "title", "created")
+    query = records.select().where(Entry.id > 1)
+    (record,) = records.all(db.session, query)
+    assert record == (2, "2", created)
+    assert record.title == "2"
+    assert record.created.tzinfo is timezone.utc
+    assert not hasattr(record, "__dict__")
+
+    dicts = Projection(Entry, "id", "title", as_="dict")
+    assert list(dicts.iter(db.session, chunk_size=1)) == [
+        {"id": 1, "title": "1"},
+        {"id": 2, "title": "2"},
+    ]
+
+    rows = Projection(Entry, as_="tuple").all(db.session)
+    orm = [(e.id, e.title, e.created, e.updated) for e in Entry.query.order_by("id")]
+    assert rows == orm
+
+    with pytest.raises(ValueError):
+        Projection(Entry, as_="list")
@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the Alembic revision cache."""
+
+import json
+import os
+
+from invenio_db import InvenioDB
+from invenio_db.revisions import CachedScript
+
+
+def test_revision_cache(db, app, tmp_path):
+    """Test that the revision graph is restored from the cache."""
+    cache_path = str(tmp_path / "revisions.json")
+    app.config["DB_ALEMBIC_REVISION_CACHE"] = cache_path
+    ext = InvenioDB(app, entry_point_group=False, db=db)
+
+    with app.app_context():
+        heads = ext.alembic.script_directory.get_heads()
+        scripts = list(ext.alembic.script_directory.walk_revisions())
+        assert not any(isinstance(s, CachedScript) for s in scripts)
+
+    assert os.path.exists(cache_path)
+
+    # Drop the in-process cache to simulate a new CLI invocation.
+    ext.alembic._cache[app].script = None
+
+    with app.app_context():
+        script_directory = ext.alembic.script_directory
+        assert script_directory.get_heads() == heads
+        assert script_directory.revision_map._real_heads
+        cached = list(script_directory.walk_revisions())
+        assert [s.revision for s in cached] == [s.revision for s in scripts]
+        assert all(isinstance(s, CachedScript) for s in cached)
+        assert all("module" not in s.__dict__ for s in cached)
+        assert [s.doc for s in cached] == [s.doc for s in scripts]
+
+        # The module is imported lazily when it is needed.
+        assert callable(cached[0].module.upgrade)
+
+
+def test_revision_cache_invalidation(db, app, tmp_path):
+    """Test that changed revision files are parsed again."""
+    cache_path = tmp_path / "revisions.json"
+    app.config["DB_ALEMBIC_REVISION_CACHE"] = str(cache_path)
+    ext = InvenioDB(app, entry_point_group=False, db=db)
+
+    with app.app_context():
+        ext.alembic.script_directory.get_heads()
+
+    data = json.loads(cache_path.read_text())
+    for entry in data["files"].values():
+        entry["key"] = [0, 0]
+    cache_path.write_text(json.dumps(data))
+    ext.alembic._cache[app].script = None
+
+    with app.app_context():
+        scripts = list(ext.alembic.script_directory.walk_revisions())
+        assert not any(isinstance(s, CachedScript) for s in scripts)
+
+    data = json.loads(cache_path.read_text())
+    assert all(entry["key"] != [0, 0] for entry in data["files"].values())
+
+
+def test_revision_cache_disabled(db, app, tmp_path):
+    """Test disabling the revision cache."""
+    app.config["DB_ALEMBIC_REVISION_CACHE"] = None
+    ext = InvenioDB(app, entry_point_group=False, db=db)
+
+    with app.app_context():
+        assert ext.alembic.script_directory.get_heads()
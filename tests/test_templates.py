@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test schema templates."""
+
+import os
+from types import SimpleNamespace
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.pool import StaticPool
+
+from invenio_db import InvenioDB
+from invenio_db.cli import db as db_cmd
+from invenio_db.templates import (
+    DatabaseTemplate,
+    clone_from_template,
+    current_template,
+    schema_fingerprint,
+)
+
+
+def test_schema_fingerprint(db):
+    """Test that the fingerprint changes with the schema and the heads."""
+
+    class Demo(db.Model):
+        __tablename__ = "demo"
+        pk = db.Column(db.Integer, primary_key=True)
+
+    dialect = sa.create_engine("sqlite://").dialect
+    fingerprint = schema_fingerprint(db.metadata, dialect)
+    assert fingerprint == schema_fingerprint(db.metadata, dialect)
+    assert fingerprint != schema_fingerprint(db.metadata, dialect, heads=["abc"])
+
+    Demo.__table__.append_column(db.Column("name", db.String(10)))
+    assert fingerprint != schema_fingerprint(db.metadata, dialect)
+
+
+def test_clone_sqlite_file(db, app, tmp_path):
+    """Test cloning the template into a SQLite file."""
+
+    class Demo(db.Model):
+        __tablename__ = "demo"
+        pk = db.Column(db.Integer, primary_key=True)
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path}/test.db"
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    with app.app_context():
+        runner = app.test_cli_runner()
+        result = runner.invoke(db_cmd, ["template"])
+        assert result.exit_code == 0
+        template = current_template()
+        assert os.path.exists(template.name)
+        assert template.name in result.output
+
+        clone_from_template()
+        assert {"demo", "alembic_version"} <= set(inspect(db.engine).get_table_names())
+        db.session.add(Demo(pk=1))
+        db.session.commit()
+
+        # A second clone starts from an empty schema again.
+        db.session.remove()
+        clone_from_template()
+        assert db.session.query(Demo).count() == 0
+
+
+def test_clone_sqlite_memory(db):
+    """Test cloning an in-memory SQLite template."""
+
+    class Demo(db.Model):
+        __tablename__ = "demo"
+        pk = db.Column(db.Integer, primary_key=True)
+
+    source = sa.create_engine("sqlite://")
+    template = DatabaseTemplate(source, db.metadata)
+    assert template.is_memory
+
+    targets = [sa.create_engine("sqlite://", poolclass=StaticPool) for _ in range(2)]
+    for target in targets:
+        template.clone(target)
+        assert inspect(target).get_table_names() == ["demo"]
+
+    with targets[0].begin() as conn:
+        conn.execute(Demo.__table__.insert().values(pk=1))
+    with targets[1].connect() as conn:
+        assert conn.execute(sa.select(Demo.__table__)).all() == []
+
+
+def test_template_name(db):
+    """Test that long database names keep the fingerprint in the name."""
+    engine = SimpleNamespace(
+        url=sa.engine.make_url("postgresql://localhost/" + "x" * 70),
+        dialect=postgresql.dialect(),
+    )
+    template = DatabaseTemplate(engine, db.metadata)
+    other = DatabaseTemplate(engine, db.metadata, heads=["abc"])
+    assert len(template.name) == 63
+    assert template.name.endswith(f"_tpl_{template.fingerprint[:12]}")
+    assert template.name != other.name
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the server-side timestamps."""
+
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from invenio_db import InvenioDB
+from invenio_db.utils import create_timestamp_trigger, drop_timestamp_trigger
+
+
+def test_server_timestamp(db, app):
+    """Test that bulk updates maintain the updated column."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Entry(db.Model, db.ServerTimestamp):
+        __tablename__ = "entry"
+        pk = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    past = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    with app.app_context():
+        db.create_all()
+        try:
+            entry = Entry(pk=1, name="a")
+            db.session.add(entry)
+            db.session.commit()
+            assert entry.created is not None
+            assert entry.updated is not None
+
+            # Explicit values are kept.
+            entry.created = entry.updated = past
+            db.session.commit()
+            assert entry.updated == past
+
+            db.session.query(Entry).update({Entry.name: "b"})
+            db.session.commit()
+            assert entry.created == past
+            assert entry.updated > past + timedelta(days=365)
+            assert entry.updated.tzinfo == timezone.utc
+
+            updated = entry.updated
+            entry.name = "c"
+            db.session.commit()
+            assert entry.updated >= updated
+        finally:
+            db.session.rollback()
+            db.drop_all()
+
+
+def test_create_timestamp_trigger():
+    """Test the migration helpers adding the trigger to an existing table."""
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(
+            sa.text("CREATE TABLE entry (id INTEGER, name TEXT, updated DATETIME)")
+        )
+        connection.execute(
+            sa.text("INSERT INTO entry VALUES (1, 'a', '2020-01-01 00:00:00')")
+        )
+        with Operations.context(MigrationContext.configure(connection)):
+            create_timestamp_trigger("entry", server_defaults=False)
+            connection.execute(sa.text("UPDATE entry SET name = 'b'"))
+            updated = connection.execute(sa.text("SELECT updated FROM entry"))
+            assert updated.scalar() > "2021"
+
+            drop_timestamp_trigger("entry", server_defaults=False)
+            connection.execute(
+                sa.text("UPDATE entry SET updated = '2020-01-01 00:00:00'")
+            )
+            connection.execute(sa.text("UPDATE entry SET name = 'c'"))
+            updated = connection.execute(sa.text("SELECT updated FROM entry"))
+            assert updated.scalar() == "2020-01-01 00:00:00"
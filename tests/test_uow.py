@@ -5,6 +5,9 @@
 
 from unittest.mock import MagicMock
 
+import pytest
+import sqlalchemy as sa
+
 from invenio_db import InvenioDB
 from invenio_db.uow import ModelCommitOp, Operation, UnitOfWork
 
@@ -124,3 +127,79 @@ def test_uow_transactions(db, app):
 
         rollback_side_effect.assert_called_once()
         post_rollback_side_effect.assert_called_once()
+
+
+def test_uow_chunked(db, app):
+    """Test processing a query in committed chunks."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Item(db.Model):
+        __tablename__ = "item"
+        id = db.Column(db.Integer, primary_key=True)
+        value = db.Column(db.String(100))
+
+    with app.app_context():
+        db.create_all()
+        try:
+            db.session.add_all([Item(id=i, value="a") for i in range(1, 11)])
+            db.session.commit()
+            db.session.expunge_all()
+
+            progress = []
+            chunks = UnitOfWork.chunked(
+                sa.select(Item).where(Item.id > 1).order_by(Item.id.desc()),
+                size=4,
+                session=db.session,
+                callback=lambda stats: progress.append(stats.rows),
+            )
+            loaded = []
+            for uow, items in chunks:
+                loaded.append([item.id for item in items])
+                for item in items:
+                    item.value = "b"
+                    uow.register(ModelCommitOp(item))
+                assert len(db.session.identity_map) == len(items)
+
+            assert loaded == [[2, 3, 4, 5], [6, 7, 8, 9], [10]]
+            assert progress == [4, 8, 9]
+            assert chunks.stats.chunks == 3
+            assert chunks.stats.identity_map == 0
+            assert chunks.stats.rows_per_second > 0
+            assert uow._operations == []
+
+            values = db.session.execute(sa.select(Item.value).order_by(Item.id))
+            assert values.scalars().all() == ["a"] + ["b"] * 9
+
+            # Leaving the loop early rolls back the current chunk, unless the
+            # loop body committed it.
+            def leave(value, commit):
+                chunks = UnitOfWork.chunked(sa.select(Item), size=4, session=db.session)
+                for uow, items in chunks:
+                    for item in items:
+                        item.value = value
+                    if commit:
+                        uow.commit()
+                    break
+                assert chunks.stats.chunks == 1
+
+            def values():
+                db.session.expunge_all()
+                result = db.session.execute(sa.select(Item.value).order_by(Item.id))
+                return result.scalars().all()
+
+            leave("c", commit=True)
+            assert values() == ["c"] * 4 + ["b"] * 6
+            leave("d", commit=False)
+            assert values() == ["c"] * 4 + ["b"] * 6
+
+            # So does an exception raised in the middle of a chunk.
+            with pytest.raises(ValueError):
+                for uow, items in UnitOfWork.chunked(
+                    sa.select(Item), size=4, session=db.session
+                ):
+                    items[0].value = "half"
+                    raise ValueError()
+            assert values() == ["c"] * 4 + ["b"] * 6
+        finally:
+            db.session.rollback()
+            db.drop_all()
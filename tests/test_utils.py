@@ -6,15 +6,19 @@
 
 import pytest
 import sqlalchemy as sa
-from sqlalchemy_continuum import remove_versioning
+from sqlalchemy_continuum import VersioningManager, remove_versioning, version_class
 from sqlalchemy_utils.types import StringEncryptedType
 
 from invenio_db import InvenioDB
 from invenio_db.utils import (
+    bulk_update,
+    get_existing_tables,
     rebuild_encrypted_properties,
+    table_creation_waves,
     versioning_model_classname,
     versioning_models_registered,
 )
+from invenio_db.versioning import insert_versions
 
 
 def test_rebuild_encrypted_properties(db, app):
@@ -77,3 +81,124 @@ def test_versioning_model_classname(db, app):
     assert versioning_model_classname(manager, FooClass) == "FooClassVersion"
     assert versioning_models_registered(manager, db.Model)
     remove_versioning(manager=manager)
+
+
+def test_get_existing_tables(db, app):
+    """Test reflecting the existing tables in one pass."""
+
+    class Existing(db.Model):
+        __tablename__ = "existing"
+        pk = db.Column(db.Integer, primary_key=True)
+
+    class Missing(db.Model):
+        __tablename__ = "missing"
+        pk = db.Column(db.Integer, primary_key=True)
+
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    with app.app_context():
+        Existing.__table__.create(bind=db.engine)
+        try:
+            tables = db.metadata.sorted_tables
+            assert get_existing_tables(db.engine, tables) >= {"existing"}
+            assert "missing" not in get_existing_tables(db.engine, tables)
+        finally:
+            Existing.__table__.drop(bind=db.engine)
+
+
+def test_table_creation_waves(db):
+    """Test grouping tables by foreign key dependencies."""
+
+    class A(db.Model):
+        __tablename__ = "a"
+        pk = db.Column(db.Integer, primary_key=True)
+        parent = db.Column(db.Integer, db.ForeignKey("a.pk"))
+
+    class B(db.Model):
+        __tablename__ = "b"
+        pk = db.Column(db.Integer, primary_key=True)
+        a = db.Column(db.Integer, db.ForeignKey(A.pk))
+
+    class C(db.Model):
+        __tablename__ = "c"
+        pk = db.Column(db.Integer, primary_key=True)
+        b = db.Column(db.Integer, db.ForeignKey(B.pk))
+
+    class D(db.Model):
+        __tablename__ = "d"
+        pk = db.Column(db.Integer, primary_key=True)
+
+    waves = table_creation_waves(db.metadata.sorted_tables)
+    assert [sorted(t.name for t in wave) for wave in waves] == [
+        ["a", "d"],
+        ["b"],
+        ["c"],
+    ]
+
+
+def test_bulk_update(db, app):
+    """Test bulk updates writing timestamps and versions."""
+    app.config["DB_VERSIONING"] = True
+
+    class Item(db.Model, db.Timestamp):
+        __tablename__ = "item"
+        __versioned__ = {}
+        pk = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    idb = InvenioDB(
+        app, entry_point_group=None, db=db, versioning_manager=VersioningManager()
+    )
+    manager = idb.versioning_manager
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        try:
+            db.session.add_all([Item(pk=i, name="a") for i in range(1, 6)])
+            db.session.commit()
+            before = {item.pk: item.updated for item in Item.query}
+
+            count = bulk_update(
+                db.session, Item, {"name": "b"}, Item.pk > 1, chunk_size=2
+            )
+            assert count == 4
+
+            items = {item.pk: item for item in Item.query}
+            assert [items[pk].name for pk in sorted(items)] == list("abbbb")
+            assert items[1].updated == before[1]
+            assert all(items[pk].updated > before[pk] for pk in range(2, 6))
+
+            ItemVersion = version_class(Item)
+            Transaction = manager.transaction_cls
+            assert db.session.query(Transaction).count() == 3
+            versions = {
+                (v.pk, v.name): v
+                for v in db.session.query(ItemVersion).order_by(
+                    ItemVersion.transaction_id
+                )
+            }
+            assert len(versions) == 9
+            assert versions[(2, "a")].end_transaction_id == (
+                versions[(2, "b")].transaction_id
+            )
+            assert versions[(2, "b")].end_transaction_id is None
+            assert versions[(2, "b")].operation_type == 1
+            assert [v.name for v in items[5].versions] == ["a", "b"]
+
+            # Open versions with a greater transaction id are closed too.
+            db.session.execute(
+                sa.update(ItemVersion)
+                .where(ItemVersion.pk == 1)
+                .values(transaction_id=10**6)
+            )
+            tx_id = insert_versions(db.session, manager, Item, [1])
+            db.session.commit()
+            open_versions = db.session.query(ItemVersion).filter(
+                ItemVersion.pk == 1, ItemVersion.end_transaction_id.is_(None)
+            )
+            assert [v.transaction_id for v in open_versions] == [tx_id]
+        finally:
+            db.session.rollback()
+            db.drop_all()
+            remove_versioning(manager=manager)
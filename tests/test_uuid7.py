@@ -0,0 +1,50 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the time-ordered UUIDs."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+
+from invenio_db import InvenioDB
+from invenio_db.shared import UUID7, uuid7, uuid7_datetime
+
+
+def test_uuid7():
+    """Test the generated UUIDs are unique and increasing."""
+    before = datetime.now(tz=timezone.utc) - timedelta(milliseconds=1)
+    values = [uuid7() for _ in range(10000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    assert {(value.version, value.variant) for value in values} == {(7, uuid.RFC_4122)}
+    assert before <= uuid7_datetime(values[0]) <= datetime.now(tz=timezone.utc)
+    # The hexadecimal form (stored by SQLite) sorts the same way.
+    assert [value.hex for value in values] == sorted(value.hex for value in values)
+
+
+def test_uuid7_column(db, app):
+    """Test a timestamped model with a time-ordered primary key."""
+    InvenioDB(app, entry_point_group=False, db=db)
+
+    class Item(db.Model, db.Timestamp):
+        __tablename__ = "item"
+        id = db.Column(db.UUID7, primary_key=True, default=db.uuid7)
+        name = db.Column(db.String(50))
+
+    with app.app_context():
+        db.create_all()
+        try:
+            items = [Item(name=str(i)) for i in range(10)]
+            db.session.add_all(items)
+            db.session.commit()
+            ids = [item.id for item in items]
+            db.session.expunge_all()
+
+            ordered = db.session.scalars(sa.select(Item.id).order_by(Item.id)).all()
+            assert ordered == sorted(ids)
+            assert db.session.get(Item, str(ids[0])).name == "0"
+        finally:
+            db.session.rollback()
+            db.drop_all()
@@ -12,6 +12,9 @@ from mocks import _mock_entry_points
 from sqlalchemy_continuum import VersioningManager, remove_versioning
 
 from invenio_db import InvenioDB
+from invenio_db.cli import db as db_cmd
+from invenio_db.uow import ModelCommitOp, UnitOfWork
+from invenio_db.versioning import is_versioning_enabled, versioning_disabled
 
 
 @patch("importlib.metadata.entry_points", _mock_entry_points("invenio_db.models_a"))
@@ -128,3 +131,94 @@ def test_versioning_without_versioned_tables(db, app):
         assert "transaction" in db.metadata.tables
 
     remove_versioning(manager=idb.versioning_manager)
+
+
+def test_versioning_disabled_per_unit_of_work(db, app):
+    """Test disabling versioning for a single unit of work."""
+    app.config["DB_VERSIONING"] = True
+
+    class Document(db.Model):
+        __tablename__ = "document"
+        __versioned__ = {}
+        pk = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    idb = InvenioDB(
+        app, entry_point_group=None, db=db, versioning_manager=VersioningManager()
+    )
+    Transaction = idb.versioning_manager.transaction_cls
+
+    with app.app_context():
+        db.create_all()
+        try:
+            with UnitOfWork(db.session) as uow:
+                uow.register(ModelCommitOp(Document(pk=1, name="a")))
+                uow.commit()
+
+            with UnitOfWork(db.session, versioning=False) as uow:
+                document = db.session.get(Document, 1)
+                document.name = "b"
+                uow.register(ModelCommitOp(document))
+                uow.commit()
+            assert is_versioning_enabled(db.session)
+
+            with versioning_disabled(db.session):
+                document.name = "c"
+                db.session.commit()
+
+            document.name = "d"
+            db.session.commit()
+
+            assert [v.name for v in document.versions] == ["a", "d"]
+            assert db.session.query(Transaction).count() == 2
+        finally:
+            db.session.rollback()
+            db.drop_all()
+            remove_versioning(manager=idb.versioning_manager)
+
+
+@pytest.mark.parametrize("precompute", [True, False])
+def test_lazy_versioning(db, app, precompute):
+    """Test building the version classes on first use."""
+    app.config["DB_VERSIONING"] = True
+    app.config["DB_VERSIONING_LAZY"] = True
+    app.config["DB_VERSIONING_PRECOMPUTE_TABLES"] = precompute
+
+    class Memo(db.Model):
+        __tablename__ = "memo"
+        __versioned__ = {}
+        pk = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    idb = InvenioDB(
+        app, entry_point_group=None, db=db, versioning_manager=VersioningManager()
+    )
+    manager = idb.versioning_manager
+
+    with app.app_context():
+        assert ("memo_version" in db.metadata.tables) == precompute
+        assert Memo not in manager.version_class_map
+
+        runner = app.test_cli_runner()
+        result = runner.invoke(db_cmd, ["create"])
+        assert result.exit_code == 0, result.output
+        assert "memo_version" in db.metadata.tables
+        assert Memo not in manager.version_class_map
+        try:
+            if precompute:
+                # Accessing the relationship builds the version classes.
+                assert Memo.versions is not None
+                assert Memo in manager.version_class_map
+
+            memo = Memo(pk=1, name="a")
+            db.session.add(memo)
+            db.session.commit()
+            assert Memo in manager.version_class_map
+
+            memo.name = "b"
+            db.session.commit()
+            assert [v.name for v in memo.versions] == ["a", "b"]
+        finally:
+            db.session.rollback()
+            db.drop_all()
+            remove_versioning(manager=manager)
@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test asynchronous version writing."""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy_continuum import VersioningManager, remove_versioning, version_class
+
+from invenio_db import InvenioDB
+from invenio_db.cli import db as db_cmd
+from invenio_db.versioning import (
+    materialize_versions,
+    prune_orphan_transactions,
+    version_history,
+)
+
+
+def test_async_versions(db, app):
+    """Test queueing changes and materializing them."""
+    app.config["DB_VERSIONING"] = True
+    app.config["DB_VERSIONING_ASYNC"] = True
+
+    class Post(db.Model):
+        __tablename__ = "post"
+        __versioned__ = {}
+        pk = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+        uid = db.Column(db.Uuid, default=uuid.uuid4)
+        published = db.Column(db.UTCDateTime)
+
+    idb = InvenioDB(
+        app, entry_point_group=None, db=db, versioning_manager=VersioningManager()
+    )
+    manager = idb.versioning_manager
+    change_log = idb.change_log
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        try:
+            PostVersion = version_class(Post)
+            posts = [Post(pk=1, name="a"), Post(pk=2, name="a")]
+            db.session.add_all(posts)
+            db.session.flush()
+            posts[0].name = "b"
+            db.session.commit()
+            posts[0].name = "c"
+            posts[0].published = datetime(2026, 1, 1, tzinfo=timezone.utc)
+            db.session.commit()
+            db.session.delete(posts[1])
+            db.session.commit()
+
+            assert db.session.query(PostVersion).count() == 0
+            assert db.session.query(change_log).count() == 5
+
+            runner = app.test_cli_runner()
+            result = runner.invoke(
+                db_cmd, ["materialize-versions", "--batch-size", "2"]
+            )
+            assert result.exit_code == 0, result.output
+            assert "Materialized 5 changes." in result.output
+            assert db.session.query(change_log).count() == 0
+
+            versions = [
+                (v.pk, v.name, v.operation_type, v.end_transaction_id is None)
+                for v in db.session.query(PostVersion).order_by(
+                    PostVersion.pk, PostVersion.transaction_id
+                )
+            ]
+            assert versions == [
+                (1, "b", 1, False),
+                (1, "c", 1, True),
+                (2, "a", 0, False),
+                (2, "a", 2, True),
+            ]
+            assert [v.name for v in posts[0].versions] == ["b", "c"]
+            assert posts[0].versions[1].uid == posts[0].uid
+            assert posts[0].versions[1].published == posts[0].published
+
+            # Reading the history does not materialize the pending changes.
+            posts[0].name = "d"
+            db.session.commit()
+            history = version_history(db.session, manager, Post, 1)
+            assert [v.name for v in history] == ["c", "b"]
+            assert db.session.query(change_log).count() == 1
+            assert materialize_versions(db.session, manager) == 1
+            history = version_history(db.session, manager, Post, 1)
+            assert [v.name for v in history] == ["d", "c", "b"]
+            assert history[1].end_transaction_id == history[0].transaction_id
+            assert materialize_versions(db.session, manager) == 0
+        finally:
+            db.session.rollback()
+            db.drop_all()
+            remove_versioning(manager=manager)
+
+
+def test_async_versions_batch(db, app):
+    """Test materializing several changes of an object in one batch."""
+    app.config["DB_VERSIONING"] = True
+    app.config["DB_VERSIONING_ASYNC"] = True
+
+    class Post(db.Model):
+        __tablename__ = "post"
+        __versioned__ = {}
+        pk = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    idb = InvenioDB(
+        app, entry_point_group=None, db=db, versioning_manager=VersioningManager()
+    )
+    manager = idb.versioning_manager
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        try:
+            PostVersion = version_class(Post)
+            post = Post(pk=1, name="a")
+            db.session.add(post)
+            db.session.commit()
+            for name in ("b", "c", "d"):
+                post.name = name
+                db.session.commit()
+
+            # The transactions of the queued changes are not orphans.
+            assert prune_orphan_transactions(db.session, manager) == 0
+            assert materialize_versions(db.session, manager) == 4
+            versions = [
+                (v.name, v.transaction_id, v.end_transaction_id)
+                for v in db.session.query(PostVersion).order_by(
+                    PostVersion.transaction_id
+                )
+            ]
+            assert [name for name, _, _ in versions] == ["a", "b", "c", "d"]
+            # Each version ends with the next one, only the newest is open.
+            assert [end for _, _, end in versions] == [
+                tx for _, tx, _ in versions[1:]
+            ] + [None]
+        finally:
+            db.session.rollback()
+            db.drop_all()
+            remove_versioning(manager=manager)
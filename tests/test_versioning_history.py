@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the versioning history queries."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy_continuum import VersioningManager, remove_versioning
+
+from invenio_db import InvenioDB
+from invenio_db.utils import create_history_indexes, drop_history_indexes
+from invenio_db.versioning import version_at, version_history, versions_at
+
+
+def test_history(db, app):
+    """Test listing versions and as-of lookups."""
+    app.config["DB_VERSIONING"] = True
+    app.config["DB_VERSIONING_HISTORY_INDEXES"] = True
+
+    class Page(db.Model):
+        __tablename__ = "page"
+        __versioned__ = {}
+        pk = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    idb = InvenioDB(
+        app, entry_point_group=None, db=db, versioning_manager=VersioningManager()
+    )
+    manager = idb.versioning_manager
+    Transaction = manager.transaction_cls
+
+    with app.app_context():
+        index_names = {
+            index.name for index in db.metadata.tables["page_version"].indexes
+        }
+        assert "ix_page_version_pk_end_transaction_id" in index_names
+
+        db.drop_all()
+        db.create_all()
+        try:
+            pages = [Page(pk=1, name="0"), Page(pk=2, name="0")]
+            db.session.add_all(pages)
+            db.session.commit()
+            for i in range(1, 5):
+                pages[0].name = str(i)
+                db.session.commit()
+            db.session.delete(pages[1])
+            db.session.commit()
+
+            tx_ids = [
+                tx.id for tx in db.session.query(Transaction).order_by(Transaction.id)
+            ]
+
+            page = version_history(db.session, manager, Page, 1, limit=2)
+            assert [v.name for v in page] == ["4", "3"]
+            page = version_history(
+                db.session, manager, Page, 1, limit=2, before=page[-1].transaction_id
+            )
+            assert [v.name for v in page] == ["2", "1"]
+            page = version_history(
+                db.session, manager, Page, 1, limit=2, before=page[-1].transaction_id
+            )
+            assert [v.name for v in page] == ["0"]
+
+            assert version_at(db.session, manager, Page, 1, tx_ids[2]).name == "2"
+            assert version_at(db.session, manager, Page, 1, tx_ids[0] - 1) is None
+            assert version_at(db.session, manager, Page, 2, tx_ids[-1]) is None
+
+            versions = versions_at(db.session, manager, Page, [1, 2], tx_ids[1])
+            assert {pk: v.name for pk, v in versions.items()} == {1: "1", 2: "0"}
+
+            db.session.query(Transaction).update(
+                {Transaction.issued_at: datetime(2026, 1, 1)}
+            )
+            db.session.query(Transaction).filter(Transaction.id > tx_ids[1]).update(
+                {Transaction.issued_at: datetime(2026, 1, 3)}
+            )
+            db.session.commit()
+            versions = versions_at(
+                db.session, manager, Page, [1, 2], timestamp=datetime(2026, 1, 2)
+            )
+            assert {pk: v.name for pk, v in versions.items()} == {1: "1", 2: "0"}
+            versions = versions_at(
+                db.session,
+                manager,
+                Page,
+                [1, 2],
+                timestamp=datetime(2026, 1, 1) - timedelta(days=1),
+            )
+            assert versions == {}
+
+            # Ids are not guaranteed to follow the issue order.
+            db.session.query(Transaction).update(
+                {Transaction.issued_at: datetime(2026, 1, 1)}
+            )
+            db.session.query(Transaction).filter(Transaction.id == tx_ids[4]).update(
+                {Transaction.issued_at: datetime(2026, 1, 3)}
+            )
+            db.session.commit()
+            versions = versions_at(
+                db.session, manager, Page, [1, 2], timestamp=datetime(2026, 1, 2)
+            )
+            assert {pk: v.name for pk, v in versions.items()} == {1: "3"}
+
+            with pytest.raises(ValueError):
+                versions_at(db.session, manager, Page, [1])
+        finally:
+            db.session.rollback()
+            db.drop_all()
+            remove_versioning(manager=manager)
+
+
+def test_create_history_indexes():
+    """Test the migration helpers adding the history indexes."""
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(
+            sa.text('CREATE TABLE "transaction" (id INTEGER, issued_at DATETIME)')
+        )
+        connection.execute(
+            sa.text(
+                "CREATE TABLE page_version (id INTEGER, end_transaction_id INTEGER)"
+            )
+        )
+        with Operations.context(MigrationContext.configure(connection)):
+            create_history_indexes("page_version")
+            indexes = {
+                table: [i["name"] for i in sa.inspect(connection).get_indexes(table)]
+                for table in ("transaction", "page_version")
+            }
+            assert indexes == {
+                "transaction": ["ix_transaction_issued_at"],
+                "page_version": ["ix_page_version_id_end_transaction_id"],
+            }
+            drop_history_indexes("page_version")
+            assert sa.inspect(connection).get_indexes("page_version") == []
@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Test the versioning retention policies."""
+
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+from sqlalchemy_continuum import VersioningManager, remove_versioning, version_class
+
+from invenio_db import InvenioDB
+from invenio_db.cli import db as db_cmd
+from invenio_db.versioning import RetentionPolicy, prune_versions
+
+
+def test_retention_policy_select():
+    """Test selecting the versions to keep."""
+    now = datetime(2026, 1, 31, 12, tzinfo=timezone.utc)
+    versions = [
+        (1, datetime(2026, 1, 1, 8)),
+        (2, datetime(2026, 1, 1, 9)),
+        (3, datetime(2026, 1, 2, 8)),
+        (4, datetime(2026, 1, 30, 8)),
+        (5, datetime(2026, 1, 31, 8)),
+    ]
+
+    assert RetentionPolicy().select(versions, now) == {0, 1, 2, 3, 4}
+    assert RetentionPolicy(keep_last=2).select(versions, now) == {3, 4}
+    assert RetentionPolicy(keep_last=1).select([], now) == set()
+    assert RetentionPolicy(keep_newer_than=timedelta(days=2)).select(versions, now) == {
+        3,
+        4,
+    }
+    assert RetentionPolicy(daily_after=timedelta(days=2)).select(versions, now) == {
+        1,
+        2,
+        3,
+        4,
+    }
+
+
+def test_prune_versions(db, app):
+    """Test pruning the versions of a model."""
+    app.config["DB_VERSIONING"] = True
+
+    class Article(db.Model):
+        __tablename__ = "article"
+        __versioned__ = {}
+        pk = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(50))
+
+    idb = InvenioDB(
+        app, entry_point_group=None, db=db, versioning_manager=VersioningManager()
+    )
+    manager = idb.versioning_manager
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        try:
+            articles = [Article(pk=1, name="0"), Article(pk=2, name="0")]
+            db.session.add_all(articles)
+            db.session.commit()
+            for i in range(1, 5):
+                articles[0].name = str(i)
+                db.session.commit()
+
+            ArticleVersion = version_class(Article)
+            assert db.session.query(ArticleVersion).count() == 6
+
+            deleted = prune_versions(
+                db.session, manager, Article, {"keep_last": 2}, dry_run=True
+            )
+            assert deleted == 3
+            assert db.session.query(ArticleVersion).count() == 6
+
+            app.config["DB_VERSIONING_RETENTION"] = {"article": {"keep_last": 2}}
+            runner = app.test_cli_runner()
+            result = runner.invoke(db_cmd, ["prune-versions", "--batch-size", "1"])
+            assert result.exit_code == 0, result.output
+            assert "Deleted 3 versions of article." in result.output
+            assert "Deleted 2 orphaned transactions." in result.output
+
+            db.session.expire_all()
+            article = db.session.get(Article, 1)
+            assert [v.name for v in article.versions] == ["3", "4"]
+            assert [v.name for v in db.session.get(Article, 2).versions] == ["0"]
+            assert article.versions[0].next.name == "4"
+
+            Transaction = manager.transaction_cls
+            assert db.session.query(Transaction).count() == 3
+
+            # Thinning keeps the chain of end transactions contiguous.
+            article = Article(pk=3, name="a")
+            db.session.add(article)
+            db.session.commit()
+            for name in ("b", "c"):
+                article.name = name
+                db.session.commit()
+            tx_ids = [v.transaction_id for v in article.versions]
+            for tx_id, issued_at in zip(
+                tx_ids,
+                [
+                    datetime(2026, 1, 1, 9),
+                    datetime(2026, 1, 2, 8),
+                    datetime(2026, 1, 2, 9),
+                ],
+            ):
+                db.session.execute(
+                    sa.update(Transaction.__table__)
+                    .where(Transaction.__table__.c.id == tx_id)
+                    .values(issued_at=issued_at)
+                )
+            db.session.commit()
+
+            deleted = prune_versions(
+                db.session,
+                manager,
+                Article,
+                RetentionPolicy(daily_after=timedelta(days=1)),
+                now=datetime(2026, 2, 1, tzinfo=timezone.utc),
+            )
+            assert deleted == 1
+            rows = db.session.execute(
+                sa.select(ArticleVersion.__table__)
+                .where(ArticleVersion.__table__.c.pk == 3)
+                .order_by("transaction_id")
+            ).all()
+            assert [(r.name, r.end_transaction_id) for r in rows] == [
+                ("a", tx_ids[2]),
+                ("c", None),
+            ]
+        finally:
+            db.session.rollback()
+            db.drop_all()
+            remove_versioning(manager=manager)